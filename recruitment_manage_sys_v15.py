@@ -1,34 +1,206 @@
 import os
+import sys
+import argparse
 import re
 import logging
+import logging.handlers
 import pandas as pd
-from datetime import datetime
-from docx import Document
-from pdf2image import convert_from_path
+import numpy as np
+from datetime import datetime, date, timedelta
+from pdf2image import convert_from_path, pdfinfo_from_path
 import pytesseract
 from PIL import Image
 import PyPDF2
 import configparser
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
+from tkinter import filedialog, messagebox, simpledialog, ttk
 from openai import OpenAI
 import json
 import time
 import subprocess
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+import queue
+import itertools
+import math
+import random
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict, deque
+from typing import Dict, List, Optional, Tuple, Any, Iterable, Iterator
 import shutil
+import sqlite3
+import csv
+import hashlib
+import uuid
+import errno
+import zipfile
+import io
+import gzip
+import zlib
+import atexit
+import multiprocessing
+import socket
+import signal
+import ctypes
+import ctypes.util
+import glob
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from types import SimpleNamespace
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing.connection import wait as wait_connections
 from typing import List, Dict
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
 
-# 配置日志
-logging.basicConfig(
-    filename='recruitment_system.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filemode='a'
-)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet输出为可选功能
+    pa = None
+    pq = None
+
+try:
+    import resource
+except ImportError:  # Windows没有resource模块，解析进程只受超时限制
+    resource = None
+
+try:
+    import tesserocr
+except ImportError:  # 常驻OCR引擎的可选绑定，缺失时改用C API或pytesseract
+    tesserocr = None
+
+# 配置日志：由 setup_logging 在程序入口处启用异步文件日志
+DEFAULT_LOG_FILE = 'recruitment_system.log'
+
+_log_context = threading.local()
+
+def correlation_id_for(filename: str) -> str:
+    """简历的日志关联ID：由文件名确定，解析进程和API线程中一致"""
+    return hashlib.sha1(filename.encode('utf-8')).hexdigest()[:10]
+
+@contextmanager
+def log_context(correlation_id: str):
+    """在当前线程内为日志记录附加关联ID"""
+    previous = getattr(_log_context, 'correlation_id', '')
+    _log_context.correlation_id = correlation_id
+    try:
+        yield
+    finally:
+        _log_context.correlation_id = previous
+
+class CorrelationFilter(logging.Filter):
+    """在记录产生的线程中写入关联ID（经队列转发后保持不变）"""
+
+    def filter(self, record):
+        if not hasattr(record, 'correlation_id'):
+            record.correlation_id = getattr(_log_context, 'correlation_id', '')
+        record.correlation_tag = f"[{record.correlation_id}] " if record.correlation_id else ''
+        return True
+
+class JsonLinesFormatter(logging.Formatter):
+    """JSON Lines日志格式，每行一条记录，便于按 correlation_id 过滤"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'correlation_id': getattr(record, 'correlation_id', ''),
+            'process': record.process,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+class LoggingRuntime:
+    """异步文件日志：调用线程只把记录放入队列，由后台监听线程写文件；
+    支持按大小或按时间轮转、gzip压缩旧日志，以及文本 / JSON Lines 两种格式。
+    解析子进程通过 worker_queue 把日志汇总到同一个文件。
+    """
+
+    def __init__(self, config: 'ConfigManager'):
+        self.log_file = config.get('LOGGING', 'log_file') or DEFAULT_LOG_FILE
+        self.file_format = (config.get('LOGGING', 'file_format') or 'text').lower()
+        self.rotate_when = config.get('LOGGING', 'rotate_when').strip()
+        self.compress = (config.get('LOGGING', 'compress') or 'true').lower() in ('1', 'true', 'yes', 'on')
+        try:
+            self.max_bytes = int(float(config.get('LOGGING', 'max_mb') or 20) * 1024 * 1024)
+            self.backup_count = int(config.get('LOGGING', 'backup_count') or 10)
+        except ValueError:
+            self.max_bytes, self.backup_count = 20 * 1024 * 1024, 10
+        self.file_handler = None
+        self._queue = queue.Queue(-1)
+        self._listener = None
+        self._worker_queue = None
+        self._worker_listener = None
+
+    def _build_file_handler(self) -> logging.Handler:
+        log_dir = os.path.dirname(self.log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        if self.rotate_when:
+            handler = logging.handlers.TimedRotatingFileHandler(
+                self.log_file, when=self.rotate_when, backupCount=self.backup_count, encoding='utf-8')
+        else:
+            handler = logging.handlers.RotatingFileHandler(
+                self.log_file, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8')
+        if self.compress:
+            handler.namer = lambda name: name + '.gz'
+            handler.rotator = _gzip_rotator
+        if self.file_format == 'json':
+            handler.setFormatter(JsonLinesFormatter())
+        else:
+            handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(correlation_tag)s%(message)s'))
+        handler.addFilter(CorrelationFilter())
+        return handler
+
+    def start(self):
+        self.file_handler = self._build_file_handler()
+        self._listener = logging.handlers.QueueListener(self._queue, self.file_handler, respect_handler_level=True)
+        self._listener.start()
+        queue_handler = logging.handlers.QueueHandler(self._queue)
+        queue_handler.addFilter(CorrelationFilter())
+        root = logging.getLogger()
+        root.setLevel(logging.INFO)
+        root.addHandler(queue_handler)
+        atexit.register(self.stop)
+
+    def worker_queue(self):
+        """解析子进程使用的跨进程日志队列（首次使用时创建）"""
+        if self._worker_queue is None and self.file_handler is not None:
+            self._worker_queue = multiprocessing.Queue(-1)
+            self._worker_listener = logging.handlers.QueueListener(
+                self._worker_queue, self.file_handler, respect_handler_level=True)
+            self._worker_listener.start()
+        return self._worker_queue
+
+    def stop(self):
+        for listener in (self._worker_listener, self._listener):
+            if listener is not None:
+                listener.stop()
+        self._worker_listener = self._listener = None
+        if self.file_handler is not None:
+            self.file_handler.close()
+
+_logging_runtime = None  # type: Optional[LoggingRuntime]
+
+def setup_logging(config: 'ConfigManager') -> LoggingRuntime:
+    global _logging_runtime
+    if _logging_runtime is None:
+        _logging_runtime = LoggingRuntime(config)
+        _logging_runtime.start()
+    return _logging_runtime
+
+def _worker_log_queue():
+    return _logging_runtime.worker_queue() if _logging_runtime is not None else None
 
 class ConfigManager:
     """配置管理器"""
@@ -55,6 +227,96 @@ class ConfigManager:
             'job_desc_dir': '',
             'output_excel': '简历信息一览表.xlsx'
         }
+        self.config['EVALUATION'] = {
+            'multi_jd_top_k': '0'
+        }
+        self.config['PDF'] = {
+            'bounded_mode': 'true',
+            'max_pages': '20',
+            'max_text_bytes': '60000',
+            'early_stop_chars': '4000',
+            'ocr_dpi': '200',
+            'ocr_grayscale': 'true'
+        }
+        self.config['OCR'] = {
+            'preprocess': 'true',
+            'target_text_height': '32',
+            'min_dpi': '150',
+            'max_dpi': '300',
+            'target_long_side_px': '2500',
+            'max_skew_degrees': '5',
+            'engine': 'auto',
+            'lang': 'chi_sim+eng',
+            'tessdata_dir': '',
+            'tesseract_library': ''
+        }
+        self.config['PARSING'] = {
+            'workers': '0',
+            'chunk_size': '4',
+            'isolate': 'true',
+            'file_timeout': '180',
+            'memory_limit_mb': '2048',
+            'max_files_per_worker': '200',
+            'quarantine_dir': '',
+            'archives': 'true',
+            'max_member_mb': '50'
+        }
+        self.config['EXTRACTION'] = {
+            'template_fast_path': 'true',
+            'template_min_confidence': '0.8'
+        }
+        self.config['SCHEDULING'] = {
+            'api_concurrency': '4',
+            'default_priority': '5'
+        }
+        self.config['BUDGET'] = {
+            'max_run_tokens': '0',
+            'input_price_per_mtok': '2.0',
+            'cache_hit_price_per_mtok': '0.5',
+            'output_price_per_mtok': '8.0',
+            'seconds_per_call': '8',
+            'extraction_output_tokens': '900',
+            'evaluation_output_tokens': '110'
+        }
+        self.config['DISTRIBUTED'] = {
+            'queue_path': '',
+            'lease_seconds': '300',
+            'max_attempts': '3',
+            'poll_seconds': '5',
+            'aggregate_interval': '30'
+        }
+        self.config['LLM'] = {
+            'endpoints': 'default',
+            'route_extraction': 'default',
+            'route_evaluation': 'default',
+            'route_job_description': 'default',
+            'extraction_timeout': '60',
+            'evaluation_timeout': '30',
+            'job_description_timeout': '90',
+            'hedge': 'true',
+            'hedge_percentile': '95',
+            'hedge_min_samples': '20',
+            'hedge_min_delay': '2',
+            'replay_mode': 'off',
+            'replay_store': ''
+        }
+        self.config['LOGGING'] = {
+            'log_file': DEFAULT_LOG_FILE,
+            'file_format': 'text',
+            'max_mb': '20',
+            'backup_count': '10',
+            'rotate_when': '',
+            'compress': 'true',
+            'gui_level': 'INFO',
+            'gui_max_lines': '2000',
+            'gui_flush_ms': '200'
+        }
+        self.config['OUTPUT'] = {
+            'extra_formats': '',
+            'csv_chunk_mb': '64',
+            'ranking_top_n': '20',
+            'ranking_export': 'true'
+        }
         with open(self.config_file, 'w', encoding='utf-8') as f:
             self.config.write(f)
 
@@ -76,20 +338,408 @@ class ConfigManager:
         with open(self.config_file, 'w', encoding='utf-8') as f:
             self.config.write(f)
 
+class RunMetrics:
+    """运行指标：按调用类型统计API调用次数与token用量（含DeepSeek上下文缓存命中）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+            self.counters = Counter()
+
+    def increment(self, name: str, amount: int = 1):
+        """记录不产生API调用的事件（如本地提取命中）"""
+        with self._lock:
+            self.counters[name] += amount
+
+    def record(self, kind: str, response: Any):
+        """记录一次API响应中的usage信息，缺失字段按0计"""
+        usage = getattr(response, 'usage', None)
+        with self._lock:
+            stat = self.stats.setdefault(kind, {
+                'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                'cache_hit_tokens': 0, 'cache_miss_tokens': 0
+            })
+            stat['calls'] += 1
+            if usage is None:
+                return
+            stat['prompt_tokens'] += getattr(usage, 'prompt_tokens', 0) or 0
+            stat['completion_tokens'] += getattr(usage, 'completion_tokens', 0) or 0
+            stat['cache_hit_tokens'] += getattr(usage, 'prompt_cache_hit_tokens', 0) or 0
+            stat['cache_miss_tokens'] += getattr(usage, 'prompt_cache_miss_tokens', 0) or 0
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            totals = {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                      'cache_hit_tokens': 0, 'cache_miss_tokens': 0}
+            for stat in self.stats.values():
+                for key in totals:
+                    totals[key] += stat[key]
+            return totals
+
+    def summary(self) -> str:
+        totals = self.totals()
+        hit_rate = totals['cache_hit_tokens'] / totals['prompt_tokens'] * 100 if totals['prompt_tokens'] else 0.0
+        summary = (f"API调用 {totals['calls']} 次, 输入 {totals['prompt_tokens']} tokens "
+                   f"(缓存命中 {totals['cache_hit_tokens']}, 命中率 {hit_rate:.1f}%), "
+                   f"输出 {totals['completion_tokens']} tokens")
+        with self._lock:
+            fast_path = self.counters.get('template_fast_path', 0)
+        if fast_path:
+            summary += f", 模板简历本地提取 {fast_path} 份"
+        with self._lock:
+            replayed = self.counters.get('llm_replayed', 0)
+        if replayed:
+            summary += f", 回放已录制响应 {replayed} 次（未调用API）"
+        return summary
+
+    def log_summary(self):
+        with self._lock:
+            stats = {kind: dict(stat) for kind, stat in self.stats.items()}
+        for kind, stat in stats.items():
+            logging.info(f"API指标 [{kind}]: 调用 {stat['calls']} 次, 输入 {stat['prompt_tokens']} tokens, "
+                         f"缓存命中 {stat['cache_hit_tokens']}, 未命中 {stat['cache_miss_tokens']}, "
+                         f"输出 {stat['completion_tokens']} tokens")
+        with self._lock:
+            counters = dict(self.counters)
+        for name, count in counters.items():
+            logging.info(f"运行计数 [{name}]: {count}")
+        logging.info(f"本次运行API汇总: {self.summary()}")
+
+class LLMError(Exception):
+    """所有端点调用失败或超出单次调用时限"""
+
+class LLMEndpoint:
+    """一个OpenAI兼容的API端点及其模型"""
+
+    def __init__(self, name: str, base_url: str, api_key: str, model: str):
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.model = model
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> OpenAI:
+        with self._lock:
+            if self._client is None:
+                # 重试与超时由 LLMBackend 统一控制
+                self._client = OpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+            return self._client
+
+    def create(self, messages: List[Dict], timeout: float, **params):
+        return self.client.chat.completions.create(model=self.model, messages=messages, timeout=timeout, **params)
+
+def _to_namespace(value: Any) -> Any:
+    """JSON数据转换为可按属性访问的对象（回放的响应与SDK响应对象用法一致）"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: _to_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(item) for item in value]
+    return value
+
+class LLMReplayStore:
+    """LLM请求录制/回放库（SQLite）：按规范化请求哈希保存请求与原始响应（zlib压缩的JSON）。
+
+    record 模式调用API并录制；replay 模式只从库中读取，未录制的请求直接报错，不访问网络；
+    auto 模式命中时回放、未命中时调用API并录制。请求哈希由模型、规范化后的消息和生成参数决定，
+    Prompt内容变化即视为新请求，因此只适合在不改动Prompt的代码修改后复跑。
+    """
+    DEFAULT_FILENAME = 'llm_replay.db'
+    MODES = ('off', 'record', 'replay', 'auto')
+
+    def __init__(self, db_path: str, mode: str):
+        self.db_path = db_path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    request_hash TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    request BLOB NOT NULL,
+                    response BLOB NOT NULL,
+                    recorded_at TEXT NOT NULL
+                )
+            """)
+
+    @classmethod
+    def from_config(cls, config: ConfigManager) -> Optional['LLMReplayStore']:
+        mode = (config.get('LLM', 'replay_mode') or 'off').lower()
+        if mode not in cls.MODES:
+            logging.warning(f"配置项 [LLM] replay_mode 无效: {mode}，已关闭录制/回放")
+            return None
+        if mode == 'off':
+            return None
+        db_path = config.get('LLM', 'replay_store') or cls.DEFAULT_FILENAME
+        logging.info(f"LLM录制/回放已启用: {mode} ({db_path})")
+        return cls(db_path, mode)
+
+    @property
+    def replays(self) -> bool:
+        return self.mode in ('replay', 'auto')
+
+    @property
+    def records(self) -> bool:
+        return self.mode in ('record', 'auto')
+
+    @staticmethod
+    def _normalize_text(text: Any) -> Any:
+        """统一换行并去除行尾空白，排版差异不影响请求哈希"""
+        if not isinstance(text, str):
+            return text
+        return '\n'.join(line.rstrip() for line in text.replace('\r\n', '\n').replace('\r', '\n').split('\n')).strip()
+
+    @classmethod
+    def normalize_request(cls, model: str, messages: List[Dict], params: Dict) -> Dict:
+        return {
+            'model': model,
+            'messages': [{'role': message.get('role'), 'content': cls._normalize_text(message.get('content'))}
+                         for message in messages],
+            'params': {key: value for key, value in params.items() if value is not None},
+        }
+
+    @staticmethod
+    def request_hash(request: Dict) -> str:
+        canonical = json.dumps(request, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _response_dict(response: Any) -> Dict:
+        if isinstance(response, dict):
+            return response
+        if hasattr(response, 'model_dump'):
+            return response.model_dump(mode='json')
+        return json.loads(json.dumps(response, ensure_ascii=False, default=lambda value: vars(value)))
+
+    @staticmethod
+    def _pack(data: Dict) -> bytes:
+        return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    def get(self, request_hash: str) -> Optional[Any]:
+        with self._lock:
+            row = self.conn.execute("SELECT response FROM responses WHERE request_hash = ?",
+                                    (request_hash,)).fetchone()
+        if row is None:
+            return None
+        return _to_namespace(json.loads(zlib.decompress(row[0]).decode('utf-8')))
+
+    def put(self, request_hash: str, kind: str, request: Dict, response: Any):
+        try:
+            response_blob = self._pack(self._response_dict(response))
+        except (TypeError, ValueError) as e:
+            logging.warning(f"LLM响应无法序列化，未录制 ({kind}): {str(e)}")
+            return
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (request_hash, kind, model, request, response, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (request_hash, kind, request['model'], self._pack(request), response_blob,
+                 datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+class LLMBackend:
+    """LLM调用后端：按调用类型路由到多个端点，严格的单次调用时限，
+    超过近期P95耗时仍未返回时发送对冲请求（取先返回者），出错时切换到下一个端点。
+
+    端点在 config.ini 的 [LLM:<名称>] 中配置（base_url、api_key、model），未配置时使用 [DEFAULT] 的API设置；
+    [LLM] 中的 route_<类型> 为按优先顺序排列的端点名称。
+    同步客户端无法中断已发出的HTTP请求，落选请求由其自身的时限兜底，返回后仍计入token统计。
+    配置了 [LLM] replay_mode 时先经过 LLMReplayStore 录制或回放。
+    """
+
+    ROUTES = {'extraction': 'extraction', 'evaluation': 'evaluation',
+              'multi_evaluation': 'evaluation', 'job_description': 'job_description'}
+    DEFAULT_TIMEOUTS = {'extraction': 60.0, 'evaluation': 30.0, 'job_description': 90.0}
+    DEFAULT_MODEL = 'deepseek-chat'
+    LATENCY_WINDOW = 200
+
+    def __init__(self, endpoints: Dict[str, LLMEndpoint], routes: Dict[str, List[str]],
+                 timeouts: Optional[Dict[str, float]] = None, hedge: bool = True, hedge_percentile: float = 95.0,
+                 hedge_min_samples: int = 20, hedge_min_delay: float = 2.0,
+                 metrics: Optional['RunMetrics'] = None, replay: Optional[LLMReplayStore] = None):
+        self.endpoints = endpoints
+        self.replay = replay
+        self.routes = routes
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.metrics = metrics or RunMetrics()
+        self._latencies = {route: deque(maxlen=self.LATENCY_WINDOW) for route in self.DEFAULT_TIMEOUTS}
+        self._latency_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='llm')
+
+    @classmethod
+    def from_config(cls, config: ConfigManager, metrics: Optional['RunMetrics'] = None) -> 'LLMBackend':
+        names = [n.strip() for n in (config.get('LLM', 'endpoints') or 'default').split(',') if n.strip()]
+        endpoints = {}
+        for name in names:
+            section = f'LLM:{name}'
+            endpoints[name] = LLMEndpoint(
+                name,
+                config.get(section, 'base_url') or config.get('API', 'base_url'),
+                config.get(section, 'api_key') or config.get('API', 'api_key'),
+                config.get(section, 'model') or cls.DEFAULT_MODEL,
+            )
+        routes, timeouts = {}, {}
+        for route, default_timeout in cls.DEFAULT_TIMEOUTS.items():
+            route_names = [n.strip() for n in config.get('LLM', f'route_{route}').split(',') if n.strip()]
+            unknown = [n for n in route_names if n not in endpoints]
+            if unknown:
+                logging.warning(f"LLM路由 {route} 引用了未配置的端点 {unknown}，已忽略")
+            routes[route] = [n for n in route_names if n in endpoints] or names
+            try:
+                timeouts[route] = float(config.get('LLM', f'{route}_timeout') or default_timeout)
+            except ValueError:
+                timeouts[route] = default_timeout
+        try:
+            hedge_percentile = float(config.get('LLM', 'hedge_percentile') or 95)
+            hedge_min_samples = int(config.get('LLM', 'hedge_min_samples') or 20)
+            hedge_min_delay = float(config.get('LLM', 'hedge_min_delay') or 2)
+        except ValueError:
+            hedge_percentile, hedge_min_samples, hedge_min_delay = 95.0, 20, 2.0
+        hedge = (config.get('LLM', 'hedge') or 'true').lower() in ('1', 'true', 'yes', 'on')
+        return cls(endpoints, routes, timeouts, hedge, hedge_percentile, hedge_min_samples, hedge_min_delay, metrics,
+                   LLMReplayStore.from_config(config))
+
+    def close(self):
+        """关闭请求线程池与录制/回放库（进行中的落选请求不再等待）"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.replay is not None:
+            self.replay.close()
+
+    def hedge_delay(self, route: str) -> Optional[float]:
+        """近期耗时的P95（样本不足时不对冲）；路由只有一个端点时不对冲，避免向同一端点重复请求、成倍计费"""
+        if not self.hedge or len(self.routes[route]) < 2:
+            return None
+        with self._latency_lock:
+            samples = sorted(self._latencies[route])
+        if len(samples) < self.hedge_min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))
+        return max(self.hedge_min_delay, samples[index])
+
+    def _on_done(self, kind: str, route: str, started: float, future):
+        # 包括落选的对冲请求在内，所有成功返回的响应都计入耗时样本和token统计
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._latency_lock:
+            self._latencies[route].append(time.monotonic() - started)
+        self.metrics.record(kind, future.result())
+
+    def chat(self, kind: str, messages: List[Dict], **params):
+        """发送一次对话请求并返回响应；kind 为 extraction / evaluation / multi_evaluation / job_description"""
+        if self.replay is None:
+            return self._chat_live(kind, messages, **params)
+        route = self.ROUTES.get(kind, 'evaluation')
+        # 按路由首选端点的模型计算哈希：切换到备用端点得到的响应也记在首选模型名下
+        request = LLMReplayStore.normalize_request(self.endpoints[self.routes[route][0]].model, messages, params)
+        request_hash = LLMReplayStore.request_hash(request)
+        if self.replay.replays:
+            response = self.replay.get(request_hash)
+            if response is not None:
+                self.metrics.increment('llm_replayed')
+                return response
+            if not self.replay.records:
+                self.metrics.increment('llm_replay_misses')
+                raise LLMError(f"回放库中没有该请求 ({kind}, {request_hash[:12]})")
+        response = self._chat_live(kind, messages, **params)
+        self.replay.put(request_hash, kind, request, response)
+        return response
+
+    def _chat_live(self, kind: str, messages: List[Dict], **params):
+        route = self.ROUTES.get(kind, 'evaluation')
+        endpoints = [self.endpoints[name] for name in self.routes[route]]
+        deadline = time.monotonic() + self.timeouts[route]
+        hedge_delay = self.hedge_delay(route)
+        pending = {}  # future -> (端点, 是否为对冲请求)
+        launched = [0]
+        errors = []
+
+        def launch(is_hedge: bool = False):
+            endpoint = endpoints[launched[0] % len(endpoints)]
+            launched[0] += 1
+            started = time.monotonic()
+            future = self._executor.submit(endpoint.create, messages, max(0.5, deadline - started), **params)
+            future.add_done_callback(lambda f: self._on_done(kind, route, started, f))
+            pending[future] = (endpoint, is_hedge)
+
+        first_started = time.monotonic()
+        launch()
+        hedged = False
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                timeout = deadline - now
+                if hedge_delay is not None and not hedged:
+                    timeout = min(timeout, max(0.0, first_started + hedge_delay - now))
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    endpoint, is_hedge = pending.pop(future)
+                    try:
+                        response = future.result()
+                    except Exception as e:
+                        errors.append(f"{endpoint.name}: {str(e)}")
+                        logging.warning(f"LLM端点 {endpoint.name} 调用失败 ({kind}): {str(e)}")
+                        if launched[0] < len(endpoints) and time.monotonic() < deadline:
+                            self.metrics.increment('llm_failover')
+                            launch()
+                        continue
+                    if is_hedge:
+                        self.metrics.increment('llm_hedge_wins')
+                    return response
+                if not done and hedge_delay is not None and not hedged and time.monotonic() < deadline:
+                    hedged = True
+                    self.metrics.increment('llm_hedged_requests')
+                    logging.info(f"LLM请求超过P95耗时 {hedge_delay:.1f}s，发送对冲请求 ({kind})")
+                    launch(is_hedge=True)
+        finally:
+            for future in pending:
+                future.cancel()
+        if pending or not errors:
+            self.metrics.increment('llm_timeouts')
+            raise LLMError(f"LLM调用超时 ({kind}, {self.timeouts[route]:g}s)")
+        raise LLMError(f"LLM调用失败 ({kind}): " + "; ".join(errors))
+
 class JobDescriptionProcessor:
     """职位说明书处理器：负责提取岗位名称和完整内容"""
     
-    def __init__(self):
+    def __init__(self, metrics: Optional['RunMetrics'] = None, llm: Optional[LLMBackend] = None):
         self.config = ConfigManager()
-        self.client = OpenAI(
-            api_key=self.config.get('API', 'api_key'),
-            base_url=self.config.get('API', 'base_url')
-        )
+        self.metrics = metrics or RunMetrics()
+        # 传入 llm 时与评估器共用同一个后端（线程池与对冲耗时样本），由创建方负责关闭
+        self._owns_llm = llm is None
+        self.llm = llm or LLMBackend.from_config(self.config, self.metrics)
         self.job_cache = {}  # 缓存职位说明书信息 {文件名: {position, content}}
         self.resume_processor = ResumeProcessor()
 
+    def close(self):
+        if self._owns_llm:
+            self.llm.close()
+        self.resume_processor.close()
+
     def extract_job_position_and_content(self, jd_text: str, jd_filename: str) -> Tuple[str, str]:
         """从职位说明书中提取岗位名称和完整内容"""
+        # 静态指令与示例在前，职位说明书内容在后，以便命中上下文缓存
         prompt = """请从以下职位说明书中提取招聘岗位名称和完整内容。
 要求：
 1. 从"职位名称"、"岗位名称"、"招聘岗位"等字段中提取岗位名称。
@@ -99,17 +749,17 @@ class JobDescriptionProcessor:
    岗位名称：[提取的岗位名称]
    完整内容：[完整的职位说明书内容]
 
-职位说明书内容：
-{j}
-
 示例返回：
 岗位名称：软件工程师
 完整内容：岗位名称：软件工程师\n任职资格：本科及以上，3年开发经验，熟悉Python...
+
+职位说明书内容：
+{j}
 """.format(j=jd_text)
 
         try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
+            response = self.llm.chat(
+                'job_description',
                 messages=[
                     {"role": "system", "content": "你是一个专业的职位说明书分析专家。"},
                     {"role": "user", "content": prompt}
@@ -143,8 +793,33 @@ class JobDescriptionProcessor:
         position = re.sub(r'职位说明书$|岗位说明书$', '', jd_filename).strip()
         return position, content
 
-    def process_job_descriptions(self, job_desc_files: List[str]) -> Dict[str, Dict[str, str]]:
-        """处理所有职位说明书并缓存"""
+    @staticmethod
+    def content_version(jd_text: str) -> str:
+        """职位说明书版本号：规范化空白后的原文内容哈希"""
+        normalized = re.sub(r'\s+', ' ', jd_text).strip()
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+    def load_job_descriptions_locally(self, job_desc_files: List[str]) -> Dict[str, Dict[str, str]]:
+        """仅读取职位说明书原文，岗位名称按文件名推断（不调用API，供费用预估使用）"""
+        job_cache = {}
+        for jd_file in job_desc_files:
+            try:
+                jd_text = self.resume_processor.extract_text_from_docx(jd_file)
+            except Exception as e:
+                logging.error(f"读取职位说明书失败: {jd_file} - {str(e)}")
+                continue
+            if jd_text.strip():
+                stem = os.path.splitext(os.path.basename(jd_file))[0]
+                job_cache[jd_file] = {
+                    'position': re.sub(r'职位说明书$|岗位说明书$', '', stem).strip(),
+                    'content': jd_text,
+                    'version': self.content_version(jd_text)
+                }
+        return job_cache
+
+    def process_job_descriptions(self, job_desc_files: List[str],
+                                 store: Optional['ResultStore'] = None) -> Dict[str, Dict[str, str]]:
+        """处理所有职位说明书并缓存；提供结果库时按内容版本复用已提取的岗位信息"""
         self.job_cache.clear()
 
         for jd_file in job_desc_files:
@@ -154,13 +829,22 @@ class JobDescriptionProcessor:
                     logging.warning(f"职位说明书内容为空: {jd_file}")
                     continue
 
-                position, full_content = self.extract_job_position_and_content(jd_text, os.path.basename(jd_file))
+                version = self.content_version(jd_text)
+                stored = store.get_job_description(version) if store is not None else None
+                if stored is not None:
+                    position, full_content = stored['position'], stored['content']
+                    logging.info(f"职位说明书未变更，复用版本 {version}: {jd_file}")
+                else:
+                    position, full_content = self.extract_job_position_and_content(jd_text, os.path.basename(jd_file))
+                    if position and store is not None:
+                        store.record_job_description(version, os.path.basename(jd_file), position, full_content)
                 if position:
                     self.job_cache[jd_file] = {
                         'position': position,
-                        'content': full_content
+                        'content': full_content,
+                        'version': version
                     }
-                    logging.info(f"成功缓存职位说明书: {jd_file}")
+                    logging.info(f"成功缓存职位说明书: {jd_file} (版本 {version})")
                 else:
                     logging.warning(f"跳过无有效岗位名称的职位说明书: {jd_file}")
             except Exception as e:
@@ -169,11 +853,339 @@ class JobDescriptionProcessor:
 
         return self.job_cache
     
+_WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_DOCX_PARAGRAPH = _WORD_NS + 'p'
+_DOCX_CELL = _WORD_NS + 'tc'
+_DOCX_TEXT = _WORD_NS + 't'
+_DOCX_TAB = _WORD_NS + 'tab'
+_DOCX_BREAKS = (_WORD_NS + 'br', _WORD_NS + 'cr')
+
+def _iter_docx_blocks(xml_file) -> Iterator[str]:
+    """按文档顺序产出段落和表格单元格文本。
+
+    合并单元格在XML中只出现一次（gridSpan/vMerge续接单元格为空），
+    因此不会像 python-docx 的 row.cells 那样重复输出合并单元格的文本。
+    """
+    paragraph_stack = []  # 文本框内的段落可嵌套在段落中
+    cell_stack = []       # 嵌套表格的单元格
+    for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            if tag == _DOCX_PARAGRAPH:
+                paragraph_stack.append([])
+            elif tag == _DOCX_CELL:
+                cell_stack.append([])
+            continue
+
+        if tag == _DOCX_TEXT:
+            if paragraph_stack:
+                paragraph_stack[-1].append(elem.text or '')
+        elif tag == _DOCX_TAB:
+            if paragraph_stack:
+                paragraph_stack[-1].append('\t')
+        elif tag in _DOCX_BREAKS:
+            if paragraph_stack:
+                paragraph_stack[-1].append('\n')
+        elif tag == _DOCX_PARAGRAPH:
+            text = ''.join(paragraph_stack.pop())
+            if paragraph_stack:
+                paragraph_stack[-1].append('\n' + text)
+            elif cell_stack:
+                cell_stack[-1].append(text)
+            elif text.strip():
+                yield text
+            elem.clear()
+        elif tag == _DOCX_CELL:
+            cell_text = '\n'.join(part for part in cell_stack.pop() if part.strip())
+            if cell_stack:
+                cell_stack[-1].append(cell_text)
+            elif cell_text.strip():
+                yield cell_text
+            elem.clear()
+
+# 简历主要板块关键词，用于判断PDF是否已读取到足够的简历内容
+RESUME_SECTION_KEYWORDS = (
+    ('教育经历', '教育背景', '学历'),
+    ('工作经历', '工作经验', '职业经历'),
+    ('项目经历', '项目经验'),
+    ('技能', '自我评价', '个人优势'),
+)
+
+class OcrEngine(ABC):
+    """OCR引擎接口：recognize 接收内存中的PIL图像并返回文本"""
+
+    name = 'base'
+
+    @abstractmethod
+    def recognize(self, image: 'Image.Image') -> str:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class PytesseractEngine(OcrEngine):
+    """后备引擎：每次调用启动一个tesseract进程并重新加载语言模型"""
+
+    name = 'pytesseract'
+
+    def __init__(self, lang: str = 'chi_sim+eng'):
+        self.lang = lang
+
+    def recognize(self, image: 'Image.Image') -> str:
+        return pytesseract.image_to_string(image, lang=self.lang)
+
+class TesserocrEngine(OcrEngine):
+    """通过 tesserocr 绑定常驻进程内的 Tesseract 实例，语言模型只加载一次"""
+
+    name = 'tesserocr'
+
+    def __init__(self, lang: str = 'chi_sim+eng', tessdata_dir: str = ''):
+        if tesserocr is None:
+            raise RuntimeError("未安装tesserocr")
+        kwargs = {'lang': lang, 'psm': tesserocr.PSM.AUTO}
+        if tessdata_dir:
+            kwargs['path'] = tessdata_dir
+        self._api = tesserocr.PyTessBaseAPI(**kwargs)
+        self._lock = threading.Lock()
+
+    def recognize(self, image: 'Image.Image') -> str:
+        with self._lock:
+            self._api.SetImage(image)
+            return self._api.GetUTF8Text()
+
+    def close(self):
+        self._api.End()
+
+class TesseractCApiEngine(OcrEngine):
+    """通过ctypes直接调用 libtesseract 的C API：常驻实例，灰度像素直接传入内存，无临时文件"""
+
+    name = 'capi'
+    PSM_AUTO = 3
+
+    def __init__(self, lang: str = 'chi_sim+eng', tessdata_dir: str = '', library_path: str = ''):
+        library_path = library_path or self.find_library()
+        if not library_path:
+            raise RuntimeError("未找到libtesseract")
+        if os.name == 'nt' and os.path.dirname(library_path):
+            # 依赖的leptonica等DLL与libtesseract在同一目录
+            os.add_dll_directory(os.path.dirname(library_path))
+        lib = ctypes.CDLL(library_path)
+        lib.TessBaseAPICreate.restype = ctypes.c_void_p
+        lib.TessBaseAPIInit3.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p]
+        lib.TessBaseAPIInit3.restype = ctypes.c_int
+        lib.TessBaseAPISetPageSegMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.TessBaseAPISetImage.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int,
+                                            ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        lib.TessBaseAPISetSourceResolution.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.TessBaseAPIGetUTF8Text.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+        lib.TessDeleteText.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIEnd.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIDelete.argtypes = [ctypes.c_void_p]
+        self._lib = lib
+        self._handle = lib.TessBaseAPICreate()
+        datapath = tessdata_dir.encode('utf-8') if tessdata_dir else None
+        if lib.TessBaseAPIInit3(self._handle, datapath, lang.encode('utf-8')) != 0:
+            lib.TessBaseAPIDelete(self._handle)
+            self._handle = None
+            raise RuntimeError(f"Tesseract初始化失败: lang={lang}, tessdata={tessdata_dir or '默认'}")
+        lib.TessBaseAPISetPageSegMode(self._handle, self.PSM_AUTO)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def find_library(tesseract_cmd: str = '') -> str:
+        """在tesseract可执行文件所在目录（Windows安装包）或系统库路径中查找libtesseract"""
+        search_dir = os.path.dirname(tesseract_cmd or pytesseract.pytesseract.tesseract_cmd)
+        if search_dir:
+            for pattern in ('libtesseract*.dll', 'libtesseract*.so*', 'libtesseract*.dylib'):
+                matches = sorted(glob.glob(os.path.join(search_dir, pattern)))
+                if matches:
+                    return matches[-1]
+        return ctypes.util.find_library('tesseract') or ''
+
+    def recognize(self, image: 'Image.Image') -> str:
+        if image.mode != 'L':
+            image = image.convert('L')
+        pixels = image.tobytes()
+        # 预处理后的图像不带DPI信息，未设置时tesseract会按70dpi处理
+        resolution = int((image.info.get('dpi') or (300,))[0]) or 300
+        with self._lock:
+            self._lib.TessBaseAPISetImage(self._handle, pixels, image.width, image.height, 1, image.width)
+            self._lib.TessBaseAPISetSourceResolution(self._handle, resolution)
+            text_ptr = self._lib.TessBaseAPIGetUTF8Text(self._handle)
+            if not text_ptr:
+                return ""
+            try:
+                return ctypes.string_at(text_ptr).decode('utf-8', errors='replace')
+            finally:
+                self._lib.TessDeleteText(text_ptr)
+
+    def close(self):
+        if self._handle:
+            self._lib.TessBaseAPIEnd(self._handle)
+            self._lib.TessBaseAPIDelete(self._handle)
+            self._handle = None
+
+def create_ocr_engine(config: ConfigManager) -> OcrEngine:
+    """按 [OCR] engine 创建OCR引擎；auto 依次尝试 tesserocr、C API，均不可用时退回 pytesseract"""
+    engine = (config.get('OCR', 'engine') or 'auto').strip().lower()
+    lang = config.get('OCR', 'lang') or 'chi_sim+eng'
+    tessdata_dir = config.get('OCR', 'tessdata_dir') or ''
+    if not tessdata_dir:
+        # Windows安装包的语言模型位于可执行文件旁的tessdata目录
+        bundled = os.path.join(os.path.dirname(config.get('PATHS', 'tesseract_path') or ''), 'tessdata')
+        if os.path.isdir(bundled):
+            tessdata_dir = bundled
+    candidates = {
+        'auto': ('tesserocr', 'capi'),
+        'tesserocr': ('tesserocr',),
+        'capi': ('capi',),
+        'pytesseract': (),
+    }.get(engine)
+    if candidates is None:
+        logging.warning(f"未知的OCR引擎: {engine}，使用auto")
+        candidates = ('tesserocr', 'capi')
+    for name in candidates:
+        try:
+            if name == 'tesserocr':
+                instance = TesserocrEngine(lang, tessdata_dir)
+            else:
+                library_path = config.get('OCR', 'tesseract_library') or TesseractCApiEngine.find_library(
+                    config.get('PATHS', 'tesseract_path') or '')
+                instance = TesseractCApiEngine(lang, tessdata_dir, library_path)
+            logging.info(f"OCR引擎已加载: {instance.name} (进程 {os.getpid()})")
+            return instance
+        except Exception as e:
+            if engine != 'auto':
+                logging.warning(f"OCR引擎 {name} 不可用，改用pytesseract: {str(e)}")
+    if engine != 'pytesseract':
+        logging.info("未找到常驻OCR引擎（tesserocr或libtesseract），使用pytesseract逐页调用")
+    return PytesseractEngine(lang)
+
+class OcrPreprocessor:
+    """OCR前的页面图像预处理（NumPy向量化）：Otsu自适应二值化、裁剪边框、纠偏，
+    并按文字行高缩放到 tesseract 最合适的尺寸；渲染DPI按页面尺寸逐页选择。
+    """
+
+    def __init__(self, target_text_height: int = 32, min_dpi: int = 150, max_dpi: int = 300,
+                 target_long_side_px: int = 2500, max_skew_degrees: float = 5.0):
+        self.target_text_height = target_text_height
+        self.min_dpi = min_dpi
+        self.max_dpi = max_dpi
+        self.target_long_side_px = target_long_side_px
+        self.max_skew_degrees = max_skew_degrees
+
+    @classmethod
+    def from_config(cls, config: ConfigManager) -> 'OcrPreprocessor':
+        try:
+            return cls(
+                int(config.get('OCR', 'target_text_height') or 32),
+                int(config.get('OCR', 'min_dpi') or 150),
+                int(config.get('OCR', 'max_dpi') or 300),
+                int(config.get('OCR', 'target_long_side_px') or 2500),
+                float(config.get('OCR', 'max_skew_degrees') or 5),
+            )
+        except ValueError:
+            logging.warning("OCR预处理配置无效，使用默认值")
+            return cls()
+
+    def choose_dpi(self, width_pt: float, height_pt: float) -> int:
+        """按页面尺寸（磅）选择渲染DPI，使长边约为 target_long_side_px 像素"""
+        long_side_inches = max(width_pt, height_pt) / 72.0
+        if long_side_inches <= 0:
+            return self.min_dpi
+        return int(min(self.max_dpi, max(self.min_dpi, self.target_long_side_px / long_side_inches)))
+
+    @staticmethod
+    def otsu_threshold(gray: 'np.ndarray') -> int:
+        """Otsu阈值：使前景/背景类间方差最大的灰度值"""
+        hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+        total = hist.sum()
+        if total == 0:
+            return 128
+        levels = np.arange(256, dtype=np.float64)
+        weight_bg = np.cumsum(hist)
+        weight_fg = total - weight_bg
+        cum_mean = np.cumsum(hist * levels)
+        mean_bg = cum_mean / np.maximum(weight_bg, 1)
+        mean_fg = (cum_mean[-1] - cum_mean) / np.maximum(weight_fg, 1)
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        return int(np.argmax(between))
+
+    @staticmethod
+    def crop_box(ink: 'np.ndarray', margin: int = 12) -> Optional[Tuple[int, int, int, int]]:
+        """文字区域包围盒；几乎全黑的行列视为扫描黑边，不计入"""
+        height, width = ink.shape
+        row_ink = ink.sum(axis=1)
+        col_ink = ink.sum(axis=0)
+        rows = np.nonzero((row_ink > 0) & (row_ink < width * 0.9))[0]
+        cols = np.nonzero((col_ink > 0) & (col_ink < height * 0.9))[0]
+        if rows.size == 0 or cols.size == 0:
+            return None
+        return (max(0, int(cols[0]) - margin), max(0, int(rows[0]) - margin),
+                min(width, int(cols[-1]) + 1 + margin), min(height, int(rows[-1]) + 1 + margin))
+
+    def estimate_skew(self, ink: 'np.ndarray', max_points: int = 40000) -> float:
+        """投影轮廓法估计倾斜角：旋转墨迹点坐标，行直方图越集中（平方和越大）越接近水平"""
+        ys, xs = np.nonzero(ink)
+        if ys.size < 100:
+            return 0.0
+        if ys.size > max_points:
+            step = ys.size // max_points + 1
+            ys, xs = ys[::step], xs[::step]
+        ys = ys.astype(np.float64)
+        xs = xs.astype(np.float64)
+        best_angle, best_score = 0.0, -1.0
+        for angle in np.arange(-self.max_skew_degrees, self.max_skew_degrees + 0.01, 0.25):
+            theta = np.deg2rad(angle)
+            projected = (ys * np.cos(theta) - xs * np.sin(theta)).astype(np.int64)
+            counts = np.bincount(projected - projected.min())
+            score = float(np.dot(counts, counts))
+            if score > best_score:
+                best_angle, best_score = float(angle), score
+        return best_angle
+
+    @staticmethod
+    def estimate_text_height(ink: 'np.ndarray') -> float:
+        """以连续有墨迹的行段高度中位数估计文字行高"""
+        has_ink = ink.sum(axis=1) > max(2, ink.shape[1] * 0.002)
+        edges = np.diff(np.concatenate(([0], has_ink.astype(np.int8), [0])))
+        starts = np.nonzero(edges == 1)[0]
+        ends = np.nonzero(edges == -1)[0]
+        heights = ends - starts
+        heights = heights[heights >= 4]
+        return float(np.median(heights)) if heights.size else 0.0
+
+    def process(self, image: 'Image.Image') -> Tuple['Image.Image', float]:
+        """返回 (预处理后的二值图像, 文字行高估计)"""
+        gray = np.asarray(image.convert('L') if image.mode != 'L' else image, dtype=np.uint8)
+        threshold = self.otsu_threshold(gray)
+        ink = gray <= threshold
+        box = self.crop_box(ink)
+        if box is not None:
+            left, top, right, bottom = box
+            ink = ink[top:bottom, left:right]
+        angle = self.estimate_skew(ink)
+        binary = Image.fromarray(np.where(ink, 0, 255).astype(np.uint8), mode='L')
+        if abs(angle) >= 0.25:
+            # 角度为负表示文字右端上翘，PIL的rotate正角度为逆时针
+            binary = binary.rotate(angle, resample=Image.BILINEAR, expand=True, fillcolor=255)
+            ink = np.asarray(binary, dtype=np.uint8) < 128
+        text_height = self.estimate_text_height(ink)
+        # 行高超过页高1/10多半是表格或大块图形，不据此缩放
+        if self.target_text_height * 1.2 < text_height < binary.height / 10:
+            scale = self.target_text_height / text_height
+            binary = binary.resize((max(1, int(binary.width * scale)), max(1, int(binary.height * scale))),
+                                   Image.BOX)
+            text_height *= scale
+        return binary, text_height
+
 class ResumeProcessor:
     """简历处理器"""
     def __init__(self):
         self.config = ConfigManager()
         self._setup_environment()
+        self._load_pdf_limits()
 
     def _setup_environment(self):
         tesseract_path = self.config.get('PATHS', 'tesseract_path')
@@ -184,41 +1196,209 @@ class ResumeProcessor:
         if os.path.exists(poppler_path):
             os.environ["PATH"] += os.pathsep + poppler_path
 
+    def _load_pdf_limits(self):
+        """读取PDF有界处理参数；bounded_mode 关闭时不限制页数与字节数"""
+        def read_int(key: str, default: int) -> int:
+            try:
+                return int(self.config.get('PDF', key) or default)
+            except ValueError:
+                logging.warning(f"PDF配置项无效，使用默认值: {key}={self.config.get('PDF', key)}")
+                return default
+
+        self.pdf_bounded = (self.config.get('PDF', 'bounded_mode') or 'true').lower() in ('1', 'true', 'yes', 'on')
+        self.pdf_max_pages = read_int('max_pages', 20)
+        self.pdf_max_text_bytes = read_int('max_text_bytes', 60000)
+        self.pdf_early_stop_chars = read_int('early_stop_chars', 4000)
+        self.ocr_dpi = read_int('ocr_dpi', 200)
+        self.ocr_grayscale = (self.config.get('PDF', 'ocr_grayscale') or 'true').lower() in ('1', 'true', 'yes', 'on')
+        self.ocr_preprocess = (self.config.get('OCR', 'preprocess') or 'true').lower() in ('1', 'true', 'yes', 'on')
+        self.ocr_preprocessor = OcrPreprocessor.from_config(self.config)
+        self._ocr_engine = None
+        self._archive = None
+        try:
+            self.max_member_bytes = int(float(self.config.get('PARSING', 'max_member_mb') or 50) * 1024 * 1024)
+        except ValueError:
+            self.max_member_bytes = 50 * 1024 * 1024
+        try:
+            # pdftoppm渲染单页的超时，Windows上无法按进程组终止时也不会遗留卡死的poppler进程
+            self.render_timeout = float(self.config.get('PARSING', 'file_timeout') or 180) or None
+        except ValueError:
+            self.render_timeout = 180.0
+
+    def _iter_pdf_text_pages(self, reader) -> Iterator[str]:
+        """逐页产出PDF文本层内容，超过页数上限即停止"""
+        for page_no, page in enumerate(reader.pages, start=1):
+            if self.pdf_bounded and page_no > self.pdf_max_pages:
+                return
+            yield page.extract_text() or ""
+
+    @property
+    def ocr_engine(self) -> OcrEngine:
+        """首次OCR时创建引擎，此后同一进程内复用（纯文本PDF和DOCX不加载语言模型）"""
+        if self._ocr_engine is None:
+            self._ocr_engine = create_ocr_engine(self.config)
+        return self._ocr_engine
+
+    def close(self):
+        if self._ocr_engine is not None:
+            self._ocr_engine.close()
+            self._ocr_engine = None
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def _render_page(self, pdf_source, page_no: int, dpi: int):
+        """渲染单页；pdf_source 为文件路径或内存中的PDF内容（压缩包成员）"""
+        if isinstance(pdf_source, bytes):
+            return self._render_page_from_bytes(pdf_source, page_no, dpi)
+        images = convert_from_path(
+            pdf_source, dpi=dpi, grayscale=self.ocr_grayscale,
+            first_page=page_no, last_page=page_no, timeout=self.render_timeout
+        )
+        return images[0] if images else None
+
+    def _render_page_from_bytes(self, data: bytes, page_no: int, dpi: int):
+        """经标准输入把PDF交给pdftoppm、从标准输出读取PNG，不落临时文件（convert_from_bytes 会写临时文件）"""
+        command = ['pdftoppm', '-r', str(dpi), '-f', str(page_no), '-l', str(page_no), '-png']
+        if self.ocr_grayscale:
+            command.append('-gray')
+        command.append('-')
+        result = subprocess.run(command, input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                timeout=self.render_timeout)
+        if result.returncode != 0 or not result.stdout:
+            # 页码超出范围时pdftoppm返回非零，用于页数未知时结束逐页渲染
+            return None
+        return Image.open(io.BytesIO(result.stdout))
+
+    def _prepare_ocr_image(self, pdf_path, page_no: int, page_size: Optional[Tuple[float, float]]):
+        """按页面尺寸选择DPI渲染并预处理；文字过小时提高DPI重新渲染一次"""
+        preprocessor = self.ocr_preprocessor
+        dpi = preprocessor.choose_dpi(*page_size) if page_size else self.ocr_dpi
+        image = self._render_page(pdf_path, page_no, dpi)
+        if image is None:
+            return None
+        processed, text_height = preprocessor.process(image)
+        if 0 < text_height < preprocessor.target_text_height * 0.6 and dpi < preprocessor.max_dpi:
+            better_dpi = min(preprocessor.max_dpi, int(dpi * preprocessor.target_text_height / text_height))
+            image = self._render_page(pdf_path, page_no, better_dpi)
+            if image is not None:
+                processed, _ = preprocessor.process(image)
+        return processed
+
+    def _iter_ocr_pages(self, pdf_path, page_count: int,
+                        page_sizes: Optional[List[Tuple[float, float]]] = None) -> Iterator[str]:
+        """逐页光栅化并OCR，每次只在内存中保留一页图像"""
+        if self.pdf_bounded:
+            page_count = min(page_count, self.pdf_max_pages)
+        for page_no in range(1, page_count + 1):
+            if self.ocr_preprocess:
+                page_size = page_sizes[page_no - 1] if page_sizes and page_no <= len(page_sizes) else None
+                image = self._prepare_ocr_image(pdf_path, page_no, page_size)
+            else:
+                image = self._render_page(pdf_path, page_no, self.ocr_dpi)
+                if image is not None:
+                    if image.mode != 'L':
+                        image = image.convert('L')
+                    image = image.point(lambda x: 0 if x < 140 else 255)
+            if image is None:
+                return
+            yield self.ocr_engine.recognize(image)
+
+    def _collect_pages(self, pages: Iterable[str], pdf_path: str) -> str:
+        """汇总逐页文本；有界模式下达到字节上限或已获得足够简历相关内容时提前停止"""
+        parts = []
+        total_bytes = 0
+        total_chars = 0
+        for page_no, page_text in enumerate(pages, start=1):
+            if not self.pdf_bounded:
+                parts.append(page_text)
+                continue
+            page_bytes = len(page_text.encode('utf-8'))
+            if total_bytes + page_bytes > self.pdf_max_text_bytes:
+                remaining = self.pdf_max_text_bytes - total_bytes
+                parts.append(page_text.encode('utf-8')[:remaining].decode('utf-8', errors='ignore'))
+                logging.info(f"PDF文本达到字节上限 {self.pdf_max_text_bytes}，停止于第 {page_no} 页: {pdf_path}")
+                break
+            parts.append(page_text)
+            total_bytes += page_bytes
+            total_chars += len(page_text)
+            if total_chars >= self.pdf_early_stop_chars and self._has_enough_resume_sections(parts):
+                logging.info(f"已获取足够简历内容，提前停止于第 {page_no} 页: {pdf_path}")
+                break
+        return "\n".join(parts).strip()
+
+    @staticmethod
+    def _has_enough_resume_sections(parts: List[str]) -> bool:
+        text = "".join(parts)
+        hits = sum(1 for keywords in RESUME_SECTION_KEYWORDS if any(keyword in text for keyword in keywords))
+        return hits >= len(RESUME_SECTION_KEYWORDS) - 1
+
+    def _page_sizes(self, reader) -> List[Tuple[float, float]]:
+        """各页尺寸（磅），供OCR逐页选择渲染DPI"""
+        sizes = []
+        for page_no, page in enumerate(reader.pages, start=1):
+            if self.pdf_bounded and page_no > self.pdf_max_pages:
+                break
+            try:
+                sizes.append((float(page.mediabox.width), float(page.mediabox.height)))
+            except Exception:
+                sizes.append(None)
+        return sizes
+
+    def _read_member(self, file_path: str) -> Optional[bytes]:
+        """读取压缩包成员到内存（受 max_member_mb 限制）；同一进程连续读取同一压缩包时复用已打开的ZipFile"""
+        archive_path, member = split_archive_member(file_path)
+        if self._archive is None or self._archive.filename != archive_path:
+            if self._archive is not None:
+                self._archive.close()
+            self._archive = zipfile.ZipFile(archive_path)
+        return _read_zip_member(self._archive, member, self.max_member_bytes)
+
     def extract_text_from_pdf(self, pdf_path: str) -> Optional[str]:
         text = ""
+        page_count = 0
+        page_sizes = []
+        data = None
+        if is_archive_member(pdf_path):
+            data = self._read_member(pdf_path)
+            if data is None:
+                return ""
         try:
-            with open(pdf_path, 'rb') as file:
+            with (io.BytesIO(data) if data is not None else open(pdf_path, 'rb')) as file:
                 reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += (page.extract_text() or "") + "\n"
-            text = text.strip()
+                page_count = len(reader.pages)
+                text = self._collect_pages(self._iter_pdf_text_pages(reader), pdf_path)
+                if not text:
+                    page_sizes = self._page_sizes(reader)
             if text:
                 return text
         except Exception as e:
             logging.warning(f"PyPDF2提取失败: {pdf_path} - {str(e)}")
 
         try:
-            images = convert_from_path(pdf_path)
-            ocr_text = ""
-            for image in images:
-                image = image.convert('L')
-                image = image.point(lambda x: 0 if x < 140 else 255)
-                ocr_text += pytesseract.image_to_string(image, lang='chi_sim+eng')
-            return ocr_text.strip() or text
+            if not page_count:
+                # 内存中的PDF页数未知时逐页渲染到pdftoppm报错为止（仍受 max_pages 限制）
+                page_count = self.pdf_max_pages if data is not None else int(pdfinfo_from_path(pdf_path).get('Pages', 0))
+            ocr_text = self._collect_pages(
+                self._iter_ocr_pages(data if data is not None else pdf_path, page_count, page_sizes), pdf_path)
+            return ocr_text or text
         except Exception as e:
             logging.error(f"OCR提取失败: {pdf_path} - {str(e)}")
             return text
 
     def extract_text_from_docx(self, docx_path: str) -> str:
+        """直接流式解析 word/document.xml，不构建完整的python-docx对象树"""
         try:
-            doc = Document(docx_path)
-            text = [para.text for para in doc.paragraphs if para.text.strip()]
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            text.append(cell.text)
-            return '\n'.join(text)
+            if is_archive_member(docx_path):
+                data = self._read_member(docx_path)
+                if data is None:
+                    return ""
+                docx_source = io.BytesIO(data)
+            else:
+                docx_source = docx_path
+            with zipfile.ZipFile(docx_source) as archive:
+                with archive.open('word/document.xml') as xml_file:
+                    return '\n'.join(_iter_docx_blocks(xml_file))
         except Exception as e:
             logging.error(f"DOCX提取失败: {docx_path} - {str(e)}")
             return ""
@@ -231,113 +1411,1143 @@ class ResumeProcessor:
         return ""
 
 
-class DeepSeekEvaluator:
-    """评估器：负责简历信息提取和候选人评估"""
-    
-    def __init__(self):
-        self.config = ConfigManager()
-        self.client = OpenAI(
-            api_key=self.config.get('API', 'api_key'),
-            base_url=self.config.get('API', 'base_url')
-        )
-        self.retry_count = 3
-        self.retry_delay = 2
-    
-    def _build_extraction_prompt(self, resume_text: str, filename: str) -> str:
-        """构建简历信息提取的Prompt，age 返回字符串"""
-        return f"""分析简历，提取以下信息：
+# 解析进程内的ResumeProcessor，由进程池initializer创建，避免每个任务重复加载配置
+_worker_resume_processor = None
 
-基本信息：
-- 姓名：中文，从简历标题、个人信息、文件名提取。
-- 性别：男/女，未明确返回""。
-- 应聘职位：从简历标题、求职意向、文件名提取，未找到返回""。
-- 年龄：从出生年份或年龄提取（如“30岁”），返回字符串，未找到返回""。
-- 居住地：从联系方式、地址提取，未找到返回""。
+def _init_parse_worker(log_queue=None):
+    global _worker_resume_processor
+    if log_queue is not None:
+        # 替换继承自主进程的处理器，日志经队列交给主进程统一写入
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(CorrelationFilter())
+        root.addHandler(queue_handler)
+        root.setLevel(logging.INFO)
+    _worker_resume_processor = ResumeProcessor()
+    # 进程退出时释放常驻的OCR引擎
+    atexit.register(_worker_resume_processor.close)
 
-教育背景：
-- 原始学历：最早学历（学位、学校、专业、毕业年份），未找到返回空对象。
-- 最高学历：最后学历（学位、学校、专业、毕业年份），未找到返回空对象。
+def _apply_memory_limit(memory_limit_mb: int):
+    """限制解析进程的地址空间（RLIMIT_AS），子进程（如pdftoppm）继承该限制；Windows不支持时仅依赖超时"""
+    if memory_limit_mb <= 0:
+        return
+    if resource is None:
+        logging.debug("当前平台不支持RLIMIT_AS，解析进程不限制内存")
+        return
+    limit = memory_limit_mb * 1024 * 1024
+    try:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError) as e:
+        logging.warning(f"设置解析进程内存上限失败: {str(e)}")
 
-工作经历：
-- 按时间倒序，每段包含：
-  - 时间段：YYYY年MM月-YYYY年MM月，非标准（如“2018-2020”）转为标准，至今转为“YYYY年MM月-2025年04月”，缺失标记“未知”。
-  - 公司：名称，移除部门（如“腾讯技术部” -> “腾讯”）。
-  - 性质：国企/民营/外企/合资/事业单位/其他，未明确返回“其他”。  
-  - 规模：少于50人/50-100人/100-500人/500-1000人/1000人以上/未知，未明确返回“未知”。
-  - 行业：互联网/软件/制造业/金融服务/教育培训/医疗健康/快消品/零售/物流/房地产/耐用消费品/进出口贸易/电子商务/其他，未明确返回“其他”。
-  - 职位：名称，移除修饰（如“高级商务经理” -> “商务经理”）。
-  - 描述：职责，限60字，超长截断。
-- 优先从“工作经历”“职业经历”段落或表格提取，排除项目或实习经历。
-- 推断规则：
-  - 性质：如“中国石油” -> 国企，“腾讯” -> 民营。
-  - 规模：如“初创” -> 少于50人，“上市公司” -> 1000人以上。
-  - 行业：如“腾讯” -> 互联网，“宝洁” -> 快消品，“顺丰” -> 物流，“万达” -> 房地产，“美的” -> 耐用消费品，“中远海运” -> 进出口贸易，“京东” -> 电子商务。
-- 未找到返回空列表。
+def _sandboxed_parse_worker(conn, log_queue, memory_limit_mb: int):
+    """沙箱解析进程：逐批接收文件，每个文件先报告开始再回传文本，父进程据此计时"""
+    if hasattr(os, 'setsid'):
+        # 独立进程组：超时时连同poppler等子进程一起终止
+        os.setsid()
+    _init_parse_worker(log_queue)
+    _apply_memory_limit(memory_limit_mb)
+    try:
+        while True:
+            try:
+                chunk = conn.recv()
+            except EOFError:
+                return
+            if chunk is None:
+                return
+            for file_path in chunk:
+                conn.send(('start', file_path))
+                with log_context(correlation_id_for(os.path.basename(file_path))):
+                    try:
+                        text = _worker_resume_processor.extract_resume_text(file_path) or ""
+                    except MemoryError:
+                        # 内存已接近上限，进程状态不可靠：报告后退出，由父进程隔离文件并重启进程
+                        conn.send(('memory', file_path))
+                        return
+                    except Exception as e:
+                        logging.error(f"解析简历失败: {file_path} - {str(e)}")
+                        text = ""
+                conn.send(('done', file_path, text))
+    finally:
+        _worker_resume_processor.close()
 
-项目经验：
-- 仅从标有“项目经历”或“项目经验”的段落或表格提取，按时间倒序，每段包含：
-  - 时间段：YYYY年MM月-YYYY年MM月，非标准转为标准，缺失标记“未知”。
-  - 项目名称：如“商务平台开发”。
-  - 角色：如“商务经理”“项目负责人”。
-  - 技术栈：技术或工具，如“Excel, CRM”，未明确返回“”。
-  - 项目成果：成果或影响，限60字，如“提升20%客户转化率”，未明确返回“”。
-  - 描述：职责，限60字，超长截断。
-- 未找到返回空列表。
+class _SandboxWorker:
+    """父进程中对一个沙箱解析进程的记录：已分配未完成的文件、当前文件及开始时间"""
+    __slots__ = ('process', 'conn', 'pending', 'current', 'started_at', 'files_done')
 
-技能及优势：
-- 硬技能、软技能、个人优势列表，如“商务谈判”“团队协作”“抗压能力”。
-- 硬技能可选掌握程度（精通/熟练/了解），软技能/优势留空。
-- 从“技能”“自我评价”“工作经历”段落或表格提取。
-- 未找到返回空列表。
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.pending = deque()
+        self.current = None
+        self.started_at = 0.0
+        self.files_done = 0
 
-简历文件名：{filename}
-简历内容：{resume_text}
+    @property
+    def busy(self) -> bool:
+        return bool(self.pending)
 
-返回JSON：
-{{
-    "name": "",
-    "gender": "",
-    "position": "",
-    "age": "",
-    "location": "",
-    "education": {{
-        "original": {{"degree": "", "school": "", "major": "", "graduation_year": ""}},
-        "highest": {{"degree": "", "school": "", "major": "", "graduation_year": ""}}
-    }},
-    "experience": {{
-        "work_history": [
-            {{
-                "period": "",
-                "company": "",
-                "company_nature": "",                
-                "company_scale": "",
+class ParsingStage:
+    """文档解析阶段：将PDF/DOCX解析分发到隔离的解析进程，绕开GIL并利用全部CPU核心。
+
+    每个文件有墙钟超时，解析进程有地址空间上限（RLIMIT_AS）；超时、内存超限或崩溃的进程
+    被终止并重启，对应文件移入隔离目录并记录原因，单个异常文件的代价有上限。
+    解析进程每处理 max_files_per_worker 个文件后主动重启，避免内存缓慢增长。
+    """
+
+    def __init__(self, max_workers: int = 0, chunk_size: int = 4, isolate: bool = True, file_timeout: float = 180,
+                 memory_limit_mb: int = 2048, max_files_per_worker: int = 200, quarantine_dir: Optional[str] = None):
+        self.max_workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+        self.isolate = isolate
+        self.file_timeout = file_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_files_per_worker = max_files_per_worker
+        self.quarantine_dir = quarantine_dir
+        self._quarantine = None
+        # 文件路径 -> 原因；调用方据此区分“解析被中止”和“内容为空”
+        self.quarantined = {}
+        self.workers = []
+        self._spawn_failures = 0
+        self._inline_processor = None
+        self._log_queue = None
+
+    @classmethod
+    def from_config(cls, config: ConfigManager, quarantine_dir: Optional[str] = None) -> 'ParsingStage':
+        """quarantine_dir 为空时异常文件只跳过不移动（如试运行）；[PARSING] quarantine_dir 优先"""
+        # 升级前生成的config.ini没有这些键（get返回空字符串），按默认值启用；只有显式写 0 才关闭
+        try:
+            max_workers = int(config.get('PARSING', 'workers') or 0)
+            chunk_size = int(config.get('PARSING', 'chunk_size') or 4)
+            file_timeout = float(config.get('PARSING', 'file_timeout') or 180)
+            memory_limit_mb = int(config.get('PARSING', 'memory_limit_mb') or 2048)
+            max_files_per_worker = int(config.get('PARSING', 'max_files_per_worker') or 200)
+        except ValueError:
+            logging.warning("解析阶段配置无效，使用默认值")
+            max_workers, chunk_size, file_timeout, memory_limit_mb, max_files_per_worker = 0, 4, 180, 2048, 200
+        isolate = (config.get('PARSING', 'isolate') or 'true').lower() in ('1', 'true', 'yes', 'on')
+        if quarantine_dir is not None:
+            quarantine_dir = config.get('PARSING', 'quarantine_dir') or quarantine_dir
+        return cls(max_workers, chunk_size, isolate, file_timeout, memory_limit_mb, max_files_per_worker,
+                   quarantine_dir)
+
+    def __enter__(self) -> 'ParsingStage':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    def start(self):
+        """启动解析进程；isolate 关闭且只有一个进程时在主进程内解析"""
+        if self.max_workers == 1 and not self.isolate:
+            self._inline_processor = ResumeProcessor()
+            return
+        self._log_queue = _worker_log_queue()
+        self.workers = [self._spawn_worker() for _ in range(self.max_workers)]
+        limits = []
+        if self.file_timeout > 0:
+            limits.append(f"单文件超时 {self.file_timeout:g}s")
+        if self.memory_limit_mb > 0 and resource is not None:
+            limits.append(f"内存上限 {self.memory_limit_mb} MB")
+        logging.info(f"解析进程已启动: {len(self.workers)} 个进程, 每批 {self.chunk_size} 个文件"
+                     + (f", {', '.join(limits)}" if limits else ""))
+
+    def _spawn_worker(self) -> _SandboxWorker:
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_sandboxed_parse_worker,
+                                          args=(child_conn, self._log_queue, self.memory_limit_mb), daemon=True)
+        process.start()
+        child_conn.close()
+        return _SandboxWorker(process, parent_conn)
+
+    @staticmethod
+    def _kill(worker: _SandboxWorker):
+        if worker.process.is_alive():
+            try:
+                if hasattr(os, 'killpg'):
+                    os.killpg(worker.process.pid, signal.SIGKILL)
+                else:
+                    worker.process.kill()
+            except OSError:
+                worker.process.kill()
+        worker.process.join(timeout=5)
+        worker.conn.close()
+
+    def shutdown(self):
+        for worker in self.workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for worker in self.workers:
+            worker.process.join(timeout=2)
+            self._kill(worker)
+        self.workers = []
+        if self._inline_processor is not None:
+            self._inline_processor.close()
+            self._inline_processor = None
+
+    def _abort(self, index: int, reason: str, chunks: deque) -> Tuple[str, str]:
+        """终止并替换一个解析进程：当前文件隔离，其余已分配的文件放回队首；返回 (当前文件, 原因)"""
+        worker = self.workers[index]
+        self._kill(worker)
+        file_path = worker.current
+        remaining = [path for path in worker.pending if path != file_path]
+        if remaining:
+            chunks.appendleft(remaining)
+        if file_path is None:
+            # 尚未开始处理任何文件就退出，多半是进程本身无法启动（如内存上限过低），不归咎于文件
+            self._spawn_failures += 1
+            if self._spawn_failures >= 3:
+                raise RuntimeError(f"解析进程无法启动: {reason}")
+        self.workers[index] = self._spawn_worker()
+        if file_path is not None:
+            self.quarantined[file_path] = reason
+            if self.quarantine_dir:
+                if self._quarantine is None:
+                    self._quarantine = ResumeQuarantine(self.quarantine_dir)
+                self._quarantine.quarantine(file_path, reason)
+            else:
+                logging.warning(f"跳过简历: {os.path.basename(file_path)} - {reason}")
+        return file_path, reason
+
+    def _handle_message(self, index: int, chunks: deque) -> List[Tuple[str, str]]:
+        worker = self.workers[index]
+        parsed = []
+        while True:
+            try:
+                if not worker.conn.poll():
+                    return parsed
+                message = worker.conn.recv()
+            except (EOFError, OSError):
+                # 管道断开时进程可能尚未被回收，先等待其退出才能取得退出码
+                worker.process.join(timeout=5)
+                exitcode = worker.process.exitcode
+                file_path, _ = self._abort(index, f"解析进程异常退出 (exitcode={exitcode})", chunks)
+                if file_path is not None:
+                    parsed.append((file_path, ''))
+                return parsed
+            kind, file_path = message[0], message[1]
+            if kind == 'start':
+                worker.current, worker.started_at = file_path, time.monotonic()
+                self._spawn_failures = 0
+            elif kind == 'done':
+                worker.pending.remove(file_path)
+                worker.current = None
+                worker.files_done += 1
+                parsed.append((file_path, message[2]))
+            elif kind == 'memory':
+                worker.current = file_path
+                self._abort(index, f"内存超过上限 {self.memory_limit_mb} MB", chunks)
+                parsed.append((file_path, ''))
+                return parsed
+
+    def parse(self, file_paths: List[str], on_idle=None) -> Iterator[Tuple[str, str]]:
+        """按完成顺序产出 (文件路径, 文本)；被中止的文件产出空文本并记入 quarantined，等待期间调用 on_idle（如刷新GUI）"""
+        if self._inline_processor is not None:
+            for file_path in file_paths:
+                with log_context(correlation_id_for(os.path.basename(file_path))):
+                    text = self._inline_processor.extract_resume_text(file_path) or ""
+                yield file_path, text
+                if on_idle:
+                    on_idle()
+            return
+
+        chunks = deque(file_paths[i:i + self.chunk_size] for i in range(0, len(file_paths), self.chunk_size))
+        while chunks or any(worker.busy for worker in self.workers):
+            for index, worker in enumerate(self.workers):
+                if worker.busy:
+                    continue
+                if self.max_files_per_worker > 0 and worker.files_done >= self.max_files_per_worker:
+                    worker.conn.send(None)
+                    worker.process.join(timeout=5)
+                    self._kill(worker)
+                    worker = self.workers[index] = self._spawn_worker()
+                if chunks:
+                    chunk = chunks.popleft()
+                    worker.pending.extend(chunk)
+                    worker.conn.send(chunk)
+            busy = {worker.conn: index for index, worker in enumerate(self.workers) if worker.busy}
+            for conn in wait_connections(list(busy), timeout=0.1):
+                yield from self._handle_message(busy[conn], chunks)
+            if self.file_timeout > 0:
+                now = time.monotonic()
+                for index, worker in enumerate(self.workers):
+                    if worker.current is not None and now - worker.started_at > self.file_timeout:
+                        file_path, _ = self._abort(index, f"解析超时（超过 {self.file_timeout:g} 秒）", chunks)
+                        yield file_path, ''
+            if on_idle:
+                on_idle()
+
+def _char_bigram_vector(text: str) -> Counter:
+    """将文本转换为字符二元组词频向量（忽略空白），用于中文文本的轻量相似度计算"""
+    chars = [ch for ch in text.lower() if not ch.isspace()]
+    return Counter(a + b for a, b in zip(chars, chars[1:]))
+
+def _cosine_similarity(vec1: Counter, vec2: Counter) -> float:
+    if not vec1 or not vec2:
+        return 0.0
+    if len(vec1) > len(vec2):
+        vec1, vec2 = vec2, vec1
+    dot = sum(count * vec2.get(gram, 0) for gram, count in vec1.items())
+    norm = math.sqrt(sum(v * v for v in vec1.values())) * math.sqrt(sum(v * v for v in vec2.values()))
+    return dot / norm if norm else 0.0
+
+def _is_chinese_text(text: str) -> bool:
+    return bool(text) and all('\u4e00' <= char <= '\u9fff' for char in text)
+
+def _as_str(value: Any, default: str = '') -> str:
+    return default if value is None else str(value)
+
+class Education:
+    """学历记录（原始学历/最高学历各一条）"""
+    __slots__ = ('degree', 'school', 'major', 'graduation_year')
+
+    def __init__(self, degree: str = '', school: str = '', major: str = '', graduation_year: str = ''):
+        self.degree = degree
+        self.school = school
+        self.major = major
+        self.graduation_year = graduation_year
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Education':
+        return cls(_as_str(data.get('degree')), _as_str(data.get('school')),
+                   _as_str(data.get('major')), _as_str(data.get('graduation_year')))
+
+    def to_dict(self) -> Dict[str, str]:
+        return {'degree': self.degree, 'school': self.school, 'major': self.major,
+                'graduation_year': self.graduation_year}
+
+    def format(self) -> str:
+        return f"{self.degree} - {self.school} - {self.major} ({self.graduation_year})"
+
+class WorkItem:
+    """工作经历条目"""
+    __slots__ = ('period', 'company', 'company_nature', 'company_scale', 'company_industry', 'position', 'description')
+
+    VALID_INDUSTRIES = frozenset([
+        "互联网", "软件", "制造业", "金融服务", "教育培训", "医疗健康",
+        "快消品", "零售", "物流", "房地产", "耐用消费品", "进出口贸易",
+        "电子商务", "其他"
+    ])
+
+    def __init__(self, period: str = '', company: str = '', company_nature: str = '其他', company_scale: str = '未知',
+                 company_industry: str = '其他', position: str = '', description: str = ''):
+        self.period = period
+        self.company = company
+        self.company_nature = company_nature
+        self.company_scale = company_scale
+        self.company_industry = company_industry
+        self.position = position
+        self.description = description
+
+    @classmethod
+    def from_api(cls, data: Dict) -> 'WorkItem':
+        industry = _as_str(data.get('company_industry'), '其他')
+        return cls(
+            period=_as_str(data.get('period')),
+            company=_as_str(data.get('company')),
+            company_nature=_as_str(data.get('company_nature'), '其他'),
+            company_scale=_as_str(data.get('company_scale'), '未知'),
+            company_industry=industry if industry in cls.VALID_INDUSTRIES else '其他',
+            position=_as_str(data.get('position')),
+            description=_as_str(data.get('description'))[:60]
+        )
+
+    def to_dict(self) -> Dict[str, str]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+class ProjectItem:
+    """项目经验条目"""
+    __slots__ = ('period', 'project_name', 'role', 'tech_stack', 'outcomes', 'description')
+
+    def __init__(self, period: str = '', project_name: str = '', role: str = '', tech_stack: str = '',
+                 outcomes: str = '', description: str = ''):
+        self.period = period
+        self.project_name = project_name
+        self.role = role
+        self.tech_stack = tech_stack
+        self.outcomes = outcomes
+        self.description = description
+
+    @classmethod
+    def from_api(cls, data: Dict) -> 'ProjectItem':
+        return cls(
+            period=_as_str(data.get('period')),
+            project_name=_as_str(data.get('project_name')),
+            role=_as_str(data.get('role')),
+            tech_stack=_as_str(data.get('tech_stack')),
+            outcomes=_as_str(data.get('outcomes'))[:60],
+            description=_as_str(data.get('description'))[:60]
+        )
+
+    def to_dict(self) -> Dict[str, str]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+class SkillSet:
+    """技能及优势：技能列表与可选的掌握程度"""
+    __slots__ = ('skills', 'proficiency')
+
+    def __init__(self, skills: Optional[List[str]] = None, proficiency: Optional[Dict[str, str]] = None):
+        self.skills = skills if skills is not None else []
+        self.proficiency = proficiency if proficiency is not None else {}
+
+    def to_dict(self) -> Dict:
+        return {'list': list(self.skills), 'proficiency': dict(self.proficiency)}
+
+    def format(self) -> str:
+        return "; ".join(
+            f"{skill} ({self.proficiency[skill]})" if self.proficiency.get(skill) else skill
+            for skill in self.skills
+        )
+
+class Candidate:
+    """候选人结构化信息。
+
+    from_api_json 是API响应的唯一校验入口；to_dict/from_dict 与原有嵌套字典格式互转，
+    用于缓存、日志等持久化场景（from_dict 信任输入，不再重复校验）。
+    """
+    __slots__ = ('name', 'gender', 'position', 'age', 'location', 'education_original', 'education_highest',
+                 'work_history', 'project_history', 'skills')
+
+    def __init__(self, name: str = '', gender: str = '', position: str = '', age: str = '', location: str = '',
+                 education_original: Optional[Education] = None, education_highest: Optional[Education] = None,
+                 work_history: Optional[List[WorkItem]] = None, project_history: Optional[List[ProjectItem]] = None,
+                 skills: Optional[SkillSet] = None):
+        self.name = name
+        self.gender = gender
+        self.position = position
+        self.age = age
+        self.location = location
+        self.education_original = education_original or Education()
+        self.education_highest = education_highest or Education()
+        self.work_history = work_history if work_history is not None else []
+        self.project_history = project_history if project_history is not None else []
+        self.skills = skills or SkillSet()
+
+    @classmethod
+    def from_api_json(cls, data: Dict, filename: str) -> 'Candidate':
+        """校验并构建候选人记录，问题字段置为默认值，所有问题汇总为一条日志"""
+        issues = []
+
+        name = _as_str(data.get('name')).strip()
+        if not _is_chinese_text(name):
+            issues.append(f"姓名无效或非中文: {name}")
+            name = ''
+
+        gender = _as_str(data.get('gender')).strip()
+        if gender not in ('男', '女', ''):
+            issues.append(f"性别值无效: {gender}")
+            gender = ''
+
+        position = _as_str(data.get('position')).strip()
+        if not position:
+            issues.append("未提取到应聘职位")
+
+        age = data.get('age', '')
+        if isinstance(age, dict):
+            age = age.get('summary', '')
+        if not isinstance(age, str):
+            issues.append(f"年龄格式错误: {age}")
+            age = ''
+
+        education = data.get('education', {})
+        if not isinstance(education, dict):
+            issues.append("教育背景格式错误")
+            education = {}
+        educations = []
+        for edu_type in ('original', 'highest'):
+            edu = education.get(edu_type)
+            if not isinstance(edu, dict):
+                issues.append(f"教育背景子项格式错误: {edu_type}")
+                edu = {}
+            educations.append(Education.from_dict(edu))
+
+        work_history = cls._extract_list(data, 'experience', 'work_history', issues, "工作经历")
+        project_history = cls._extract_list(data, 'projects', 'project_history', issues, "项目经验")
+
+        skills = data.get('skills_and_strengths', {})
+        if not isinstance(skills, dict):
+            issues.append("技能及优势格式错误")
+            skills = {}
+        skills_list = skills.get('list', [])
+        if not isinstance(skills_list, list):
+            issues.append("技能列表格式错误")
+            skills_list = []
+        proficiency = skills.get('proficiency', {})
+        if not isinstance(proficiency, dict):
+            issues.append("技能熟练度格式错误")
+            proficiency = {}
+
+        if issues:
+            logging.warning(f"简历信息校验 ({filename}): {'; '.join(issues)}")
+
+        return cls(
+            name=name,
+            gender=gender,
+            position=position,
+            age=age,
+            location=_as_str(data.get('location')),
+            education_original=educations[0],
+            education_highest=educations[1],
+            work_history=[WorkItem.from_api(item) for item in work_history],
+            project_history=[ProjectItem.from_api(item) for item in project_history],
+            skills=SkillSet(
+                [skill for skill in skills_list if isinstance(skill, str)],
+                {k: v for k, v in proficiency.items() if isinstance(k, str) and isinstance(v, str)}
+            )
+        )
+
+    @staticmethod
+    def _extract_list(data: Dict, section: str, key: str, issues: List[str], label: str) -> List[Dict]:
+        container = data.get(section, {})
+        if not isinstance(container, dict):
+            issues.append(f"{label}格式错误")
+            return []
+        items = container.get(key, [])
+        if not isinstance(items, list):
+            issues.append(f"{label}列表格式错误")
+            return []
+        valid = [item for item in items if isinstance(item, dict)]
+        if len(valid) != len(items):
+            issues.append(f"{label}中有 {len(items) - len(valid)} 项格式错误")
+        return valid
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Candidate':
+        """从缓存/日志中的嵌套字典恢复（数据由 to_dict 生成，不再校验）"""
+        education = data.get('education', {})
+        skills = data.get('skills_and_strengths', {})
+        return cls(
+            name=data.get('name', ''),
+            gender=data.get('gender', ''),
+            position=data.get('position', ''),
+            age=data.get('age', ''),
+            location=data.get('location', ''),
+            education_original=Education(**education.get('original', {})),
+            education_highest=Education(**education.get('highest', {})),
+            work_history=[WorkItem(**item) for item in data.get('experience', {}).get('work_history', [])],
+            project_history=[ProjectItem(**item) for item in data.get('projects', {}).get('project_history', [])],
+            skills=SkillSet(list(skills.get('list', [])), dict(skills.get('proficiency', {})))
+        )
+
+    def to_dict(self) -> Dict:
+        """转换为与API响应一致的嵌套字典格式"""
+        return {
+            'name': self.name,
+            'gender': self.gender,
+            'position': self.position,
+            'age': self.age,
+            'location': self.location,
+            'education': {
+                'original': self.education_original.to_dict(),
+                'highest': self.education_highest.to_dict()
+            },
+            'experience': {'work_history': [item.to_dict() for item in self.work_history]},
+            'projects': {'project_history': [item.to_dict() for item in self.project_history]},
+            'skills_and_strengths': self.skills.to_dict()
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text: str) -> 'Candidate':
+        return cls.from_dict(json.loads(text))
+
+class ParsedFilename:
+    """简历文件名解析结果"""
+    __slots__ = ('platform', 'name', 'position', 'suffix', 'clean')
+
+    def __init__(self, platform: str, name: str, position: str, suffix: str, clean: str):
+        self.platform = platform
+        self.name = name
+        self.position = position
+        self.suffix = suffix
+        self.clean = clean
+
+    def __repr__(self) -> str:
+        return (f"ParsedFilename(platform={self.platform!r}, name={self.name!r}, position={self.position!r}, "
+                f"suffix={self.suffix!r}, clean={self.clean!r})")
+
+class FilenameParser:
+    """简历文件名解析器：预编译规则，按文件名缓存结果，一次解析出平台、姓名、职位和后缀。
+
+    招聘平台前缀与城市后缀可在 config.ini 的 [FILENAME] 中扩展，
+    例如 platforms = 51job,BOSS,zhilian,liepin；city_suffixes = 南宁,桂林,昆明,柳州。
+    城市后缀只在作为完整的 _ 分段位于末尾（可带重复下载序号，如 _南宁(2)）时移除；
+    greedy_city_suffixes 中的城市则连同其后的全部内容一起移除（如 _昆明xxx）。
+    """
+
+    DEFAULT_PLATFORMS = ('51job', 'BOSS', 'zhilian')
+    DEFAULT_CITY_SUFFIXES = ('南宁', '桂林', '昆明')
+    DEFAULT_GREEDY_CITY_SUFFIXES = ('昆明',)
+    # 与城市无关的后缀规则（按顺序尝试，匹配到即移除）
+    GENERIC_SUFFIX_PATTERNS = (
+        r'_\d+',             # 平台编号，如 _20240501
+        r'_[^_]*\(\d+\)',     # 重复下载序号，如 _xxx(2)
+    )
+    NOISE_PATTERN = r'^【|】$|\d+年以上|\d+-\d+K'
+    NAME_PATTERN = r'^[\u4e00-\u9fff]{2,4}$'
+
+    def __init__(self, platforms: Iterable[str] = DEFAULT_PLATFORMS,
+                 city_suffixes: Iterable[str] = DEFAULT_CITY_SUFFIXES,
+                 greedy_city_suffixes: Iterable[str] = DEFAULT_GREEDY_CITY_SUFFIXES, cache_size: int = 65536):
+        platforms = [p for p in platforms if p]
+        greedy = [c for c in greedy_city_suffixes if c]
+        cities = [c for c in city_suffixes if c and c not in greedy]
+        self._leading_id = re.compile(r'^\d+_')
+        self._platform = re.compile(
+            r'^(' + '|'.join(re.escape(p) for p in platforms) + r')_' if platforms else r'(?!)'
+        )
+        suffix_patterns = [r'_(?:' + '|'.join(re.escape(c) for c in cities) + r')(?:\(\d+\))?'] if cities else []
+        if greedy:
+            suffix_patterns.append(r'_(?:' + '|'.join(re.escape(c) for c in greedy) + r').*')
+        suffix_patterns += list(self.GENERIC_SUFFIX_PATTERNS)
+        self._suffix = re.compile(r'(?:' + '|'.join(suffix_patterns) + r')$')
+        self._noise = re.compile(self.NOISE_PATTERN)
+        self._name = re.compile(self.NAME_PATTERN)
+        self.parse = lru_cache(maxsize=cache_size)(self._parse)
+
+    @classmethod
+    def from_config(cls, config: ConfigManager) -> 'FilenameParser':
+        def read_list(key: str, default: Tuple[str, ...]) -> List[str]:
+            value = config.get('FILENAME', key)
+            return [item.strip() for item in value.split(',')] if value else list(default)
+
+        return cls(read_list('platforms', cls.DEFAULT_PLATFORMS), read_list('city_suffixes', cls.DEFAULT_CITY_SUFFIXES),
+                   read_list('greedy_city_suffixes', cls.DEFAULT_GREEDY_CITY_SUFFIXES))
+
+    def _parse(self, filename: str) -> ParsedFilename:
+        stem = os.path.splitext(os.path.basename(filename))[0].strip()
+        stem = self._leading_id.sub('', stem)
+
+        platform = ''
+        match = self._platform.match(stem)
+        if match:
+            platform = match.group(1)
+            stem = stem[match.end():]
+
+        # 后缀可能叠加（如 _副本(1)_7），从右向左逐个剥离
+        suffixes = []
+        match = self._suffix.search(stem)
+        while match and match.start() > 0:
+            suffixes.insert(0, match.group(0).lstrip('_'))
+            stem = stem[:match.start()]
+            match = self._suffix.search(stem)
+        suffix = '_'.join(suffixes)
+
+        clean = self._noise.sub('', stem).strip().strip('_')
+        parts = [part.strip() for part in clean.split('_') if part.strip()]
+        name, position = '', clean
+        if len(parts) >= 2:
+            name, position = parts[0], parts[1]
+            if not self._name.match(name) and self._name.match(position):
+                name, position = position, name
+        return ParsedFilename(platform, name, position, suffix, clean)
+
+class TemplateResumeExtractor:
+    """招聘网站模板简历的本地规则提取器。
+
+    根据文件名中的平台前缀（51job_/BOSS_/zhilian_，见 FilenameParser）和正文中的板块标题识别模板，
+    按标注字段与板块提取 Candidate，并给出各字段置信度；调用方只需对
+    缺失或低置信度的字段借助API补全。
+    """
+
+    PLATFORM_MARKERS = (('前程无忧', '51job'), ('51job', '51job'), ('BOSS直聘', 'BOSS'), ('智联招聘', 'zhilian'))
+
+    SECTION_HEADERS = {
+        'education': ('教育经历', '教育背景'),
+        'work': ('工作经历', '工作经验', '职业经历'),
+        'projects': ('项目经历', '项目经验'),
+        'skills': ('专业技能', '技能特长', '技能证书', '技能', '个人优势', '自我评价'),
+        'other': ('培训经历', '证书', '语言能力', '实习经历', '在校经历', '求职意向', '个人信息', '基本信息'),
+    }
+
+    # 判断是否跳过API所需的字段
+    REQUIRED_FIELDS = ('name', 'gender', 'age', 'location', 'position', 'education', 'work_history', 'skills')
+
+    DEGREE_RANK = (('博士', 6), ('硕士', 5), ('研究生', 5), ('MBA', 5), ('本科', 4), ('学士', 4),
+                   ('大专', 3), ('专科', 3), ('高职', 3), ('中专', 2), ('高中', 1))
+    COMPANY_NATURES = ('国企', '民营', '外企', '合资', '事业单位')
+    COMPANY_SCALES = ('少于50人', '50-100人', '100-500人', '500-1000人', '1000人以上')
+
+    _FIELD_PATTERNS = {
+        # 姓名须以下一个标签或分隔符结尾：PDF文本层常丢失空格，如“姓名：李四性别：女”
+        'name': re.compile(r'姓\s*名\s*[:：]\s*([\u4e00-\u9fff]{2,4}?)'
+                           r'(?=性\s*别|年\s*龄|民\s*族|出\s*生|籍\s*贯|电\s*话|手\s*机|邮\s*箱|学\s*历|婚\s*姻|'
+                           r'政治面貌|现居|居住地|工作年限|求职意向|[\s|｜,，;；/]|$)'),
+        'gender': re.compile(r'性\s*别\s*[:：]\s*(男|女)'),
+        'age': re.compile(r'年\s*龄\s*[:：]\s*(\d{2})\s*岁?'),
+        'location': re.compile(r'(?:现居住地|居住地|现居|所在地|现住址)\s*[:：]\s*([^\s|｜,，;；]+)'),
+        'position': re.compile(r'(?:期望职位|期望岗位|应聘职位|应聘岗位|意向岗位|求职意向)\s*[:：]\s*([^\s|｜,，;；]+)'),
+    }
+    # 姓名后无分隔符时的兜底匹配，可能多截取后续文字，仅给低置信度，以API结果为准
+    _NAME_UNBOUNDED = re.compile(r'姓\s*名\s*[:：]\s*([\u4e00-\u9fff]{2,4})')
+    _INLINE_GENDER_AGE = re.compile(r'(男|女)\s*[|｜/,，]\s*(\d{2})\s*岁')
+    _PERIOD = re.compile(
+        r'(\d{4})\s*[./年-]\s*(\d{1,2})\s*月?\s*[-–—~～至到]+\s*'
+        r'(?:(\d{4})\s*[./年-]\s*(\d{1,2})\s*月?|(至今|今|现在))'
+    )
+    _YEAR = re.compile(r'(19|20)\d{2}')
+    _SCHOOL = re.compile(r'([\u4e00-\u9fffA-Za-z（）()]{2,30}(?:大学|学院|学校|分校|党校))')
+    _ATTR_NATURE = re.compile(r'(?:公司|企业)性质\s*[:：]\s*([^\s|｜]+)')
+    _ATTR_SCALE = re.compile(r'(?:公司|企业)?规模\s*[:：]\s*([^\s|｜]+)')
+    _ATTR_INDUSTRY = re.compile(r'(?:所属)?行业\s*[:：]\s*([^\s|｜]+)')
+    _ATTR_ROLE = re.compile(r'(?:项目)?(?:角色|职务|担任)\s*[:：]\s*([^\s|｜]+)')
+    _SKILL_SPLIT = re.compile(r'[，,、;；\n。]+')
+    _COMPANY_HINT = re.compile(r'(公司|集团|有限|银行|医院|研究院|事务所|中心|厂|局|店)')
+
+    def __init__(self, filename_parser: Optional[FilenameParser] = None):
+        self.filename_parser = filename_parser or FilenameParser()
+
+    def detect_platform(self, resume_text: str, filename: str) -> str:
+        platform = self.filename_parser.parse(filename).platform
+        if platform:
+            return platform
+        head = resume_text[:500]
+        for marker, platform in self.PLATFORM_MARKERS:
+            if marker in head:
+                return platform
+        return ''
+
+    def _split_sections(self, resume_text: str) -> Dict[str, List[str]]:
+        """按板块标题行切分正文，返回 {板块: 行列表}；标题前的内容归入 header"""
+        sections = {'header': []}
+        current = 'header'
+        for raw_line in resume_text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+            header = self._match_section_header(line)
+            if header:
+                current = header
+                sections.setdefault(current, [])
+                continue
+            sections.setdefault(current, []).append(line)
+        return sections
+
+    def _match_section_header(self, line: str) -> str:
+        compact = re.sub(r'[\s:：|｜■●◆【】\[\]]', '', line)
+        if len(compact) > 8:
+            return ''
+        for section, headers in self.SECTION_HEADERS.items():
+            if compact in headers:
+                return section
+        return ''
+
+    def extract(self, resume_text: str, filename: str) -> Tuple[Optional[Candidate], Dict[str, float]]:
+        """识别模板并提取；非模板简历返回 (None, {})"""
+        platform = self.detect_platform(resume_text, filename)
+        sections = self._split_sections(resume_text)
+        recognized = sum(1 for key in ('education', 'work', 'projects', 'skills') if key in sections)
+        if not platform and recognized < 3:
+            return None, {}
+
+        confidence = {}
+        candidate = Candidate()
+        header_text = '\n'.join(sections.get('header', []))
+        full_head = resume_text[:2000]
+
+        for field in ('name', 'gender', 'age', 'location', 'position'):
+            match = self._FIELD_PATTERNS[field].search(header_text) or self._FIELD_PATTERNS[field].search(full_head)
+            if match:
+                value = match.group(1)
+                setattr(candidate, field, f"{value}岁" if field == 'age' else value)
+                confidence[field] = 0.95
+        if 'name' not in confidence:
+            match = self._NAME_UNBOUNDED.search(header_text) or self._NAME_UNBOUNDED.search(full_head)
+            if match:
+                candidate.name, confidence['name'] = match.group(1), 0.5
+        if 'gender' not in confidence or 'age' not in confidence:
+            match = self._INLINE_GENDER_AGE.search(full_head)
+            if match:
+                if 'gender' not in confidence:
+                    candidate.gender, confidence['gender'] = match.group(1), 0.9
+                if 'age' not in confidence:
+                    candidate.age, confidence['age'] = f"{match.group(2)}岁", 0.9
+
+        educations = self._parse_education(sections.get('education', []))
+        if educations:
+            candidate.education_original = min(educations, key=lambda e: e.graduation_year or '9999')
+            candidate.education_highest = max(educations, key=lambda e: (self._degree_rank(e.degree), e.graduation_year))
+            complete = all(e.degree and e.school for e in (candidate.education_original, candidate.education_highest))
+            confidence['education'] = 0.9 if complete else 0.5
+
+        if 'work' in sections:
+            candidate.work_history = self._parse_work(sections['work'])
+            complete = candidate.work_history and all(w.company and w.position for w in candidate.work_history)
+            confidence['work_history'] = 0.85 if complete else 0.4
+        if 'projects' in sections:
+            candidate.project_history = self._parse_projects(sections['projects'])
+            confidence['projects'] = 0.8 if candidate.project_history else 0.4
+        if 'skills' in sections:
+            candidate.skills = self._parse_skills(sections['skills'])
+            confidence['skills'] = 0.8 if candidate.skills.skills else 0.4
+
+        logging.info(f"模板简历识别 ({platform or '通用板块'}): {filename} - 字段置信度: {confidence}")
+        return candidate, confidence
+
+    def _degree_rank(self, degree: str) -> int:
+        for keyword, rank in self.DEGREE_RANK:
+            if keyword in degree:
+                return rank
+        return 0
+
+    def _parse_education(self, lines: List[str]) -> List[Education]:
+        educations = []
+        for line in lines:
+            school = self._SCHOOL.search(line)
+            degree = next((keyword for keyword, _ in self.DEGREE_RANK if keyword in line), '')
+            if not school and not degree:
+                continue
+            years = [m.group(0) for m in self._YEAR.finditer(line)]
+            major = line
+            for token in (school.group(1) if school else '', degree):
+                if token:
+                    major = major.replace(token, ' ')
+            major = self._PERIOD.sub(' ', major)
+            major_tokens = [t for t in re.split(r'[\s|｜/,，]+', major) if t and not self._YEAR.search(t)]
+            educations.append(Education(
+                degree=degree,
+                school=school.group(1) if school else '',
+                major=major_tokens[0] if major_tokens else '',
+                graduation_year=years[-1] if years else ''
+            ))
+        return educations
+
+    def _normalize_period(self, match) -> str:
+        start = f"{match.group(1)}年{int(match.group(2)):02d}月"
+        if match.group(5):
+            end = datetime.now().strftime('%Y年%m月')
+        else:
+            end = f"{match.group(3)}年{int(match.group(4)):02d}月"
+        return f"{start}-{end}"
+
+    def _split_entries(self, lines: List[str]) -> List[Tuple[Any, str, List[str]]]:
+        """以时间段开头的行为界切分经历条目，返回 [(时间段匹配, 同行剩余文本, 后续行)]"""
+        entries = []
+        for line in lines:
+            match = self._PERIOD.search(line)
+            if match:
+                rest = (line[:match.start()] + ' ' + line[match.end():]).strip()
+                entries.append((match, rest, []))
+            elif entries:
+                entries[-1][2].append(line)
+        return entries
+
+    def _parse_work(self, lines: List[str]) -> List[WorkItem]:
+        items = []
+        for match, rest, body in self._split_entries(lines):
+            tokens = [t for t in re.split(r'[\s|｜/]+', rest) if t]
+            body_text = ' '.join(body)
+            if len(tokens) < 2 and body:
+                tokens += [t for t in re.split(r'[\s|｜/]+', body[0]) if t]
+                body_text = ' '.join(body[1:])
+            company = next((t for t in tokens if self._COMPANY_HINT.search(t)), tokens[0] if tokens else '')
+            position = next((t for t in tokens if t != company and '：' not in t and ':' not in t), '')
+            nature = self._ATTR_NATURE.search(body_text)
+            scale = self._ATTR_SCALE.search(body_text)
+            industry = self._ATTR_INDUSTRY.search(body_text)
+            description = ' '.join(
+                line for line in body
+                if not (self._ATTR_NATURE.search(line) or self._ATTR_SCALE.search(line) or self._ATTR_INDUSTRY.search(line))
+            )
+            items.append(WorkItem(
+                period=self._normalize_period(match),
+                company=company,
+                company_nature=self._pick(nature, self.COMPANY_NATURES, '其他'),
+                company_scale=self._pick(scale, self.COMPANY_SCALES, '未知'),
+                company_industry=self._pick(industry, WorkItem.VALID_INDUSTRIES, '其他'),
+                position=position,
+                description=re.sub(r'^(工作描述|工作内容|职责)\s*[:：]\s*', '', description.strip())[:60]
+            ))
+        return items
+
+    def _parse_projects(self, lines: List[str]) -> List[ProjectItem]:
+        items = []
+        for match, rest, body in self._split_entries(lines):
+            tokens = [t for t in re.split(r'[\s|｜/]+', rest) if t]
+            body_text = ' '.join(body)
+            role = self._ATTR_ROLE.search(body_text)
+            description = ' '.join(line for line in body if not self._ATTR_ROLE.search(line))
+            items.append(ProjectItem(
+                period=self._normalize_period(match),
+                project_name=tokens[0] if tokens else '',
+                role=role.group(1) if role else (tokens[1] if len(tokens) > 1 else ''),
+                description=re.sub(r'^(项目描述|项目内容|责任描述)\s*[:：]\s*', '', description.strip())[:60]
+            ))
+        return items
+
+    def _parse_skills(self, lines: List[str]) -> SkillSet:
+        skills, proficiency = [], {}
+        for item in self._SKILL_SPLIT.split('\n'.join(lines)):
+            item = item.strip(' -•·*')
+            if not item or len(item) > 15:
+                continue
+            level = next((lv for lv in ('精通', '熟练', '了解') if lv in item), '')
+            name = re.sub(r'(精通|熟练掌握|熟练|了解|掌握)', '', item).strip(' ：:') or item
+            if name not in proficiency and name not in skills:
+                skills.append(name)
+                if level:
+                    proficiency[name] = level
+        return SkillSet(skills, proficiency)
+
+    @staticmethod
+    def _pick(match, allowed, default: str) -> str:
+        if not match:
+            return default
+        value = match.group(1)
+        return next((option for option in allowed if option in value or value in option), default)
+
+    @staticmethod
+    def merge(local: Candidate, remote: Candidate, confidence: Dict[str, float], threshold: float) -> Candidate:
+        """合并本地与API提取结果：本地高置信度字段优先，其余取API结果"""
+        def confident(field: str) -> bool:
+            return confidence.get(field, 0.0) >= threshold
+
+        for field in ('name', 'gender', 'age', 'location', 'position'):
+            if confident(field):
+                setattr(remote, field, getattr(local, field))
+        if confident('education'):
+            remote.education_original = local.education_original
+            remote.education_highest = local.education_highest
+        if confident('work_history'):
+            remote.work_history = local.work_history
+        if confident('projects') and local.project_history:
+            remote.project_history = local.project_history
+        if confident('skills'):
+            remote.skills = local.skills
+        return remote
+
+def _clamp_score(value) -> Optional[int]:
+    """评分规整为0-100的整数，缺失或无法解析时返回None"""
+    if value is None or value == '':
+        return None
+    try:
+        return max(0, min(100, int(round(float(value)))))
+    except (TypeError, ValueError):
+        return None
+
+class Evaluation:
+    """单岗位评估结果：评估结论及0-100的综合评分和学历/经验/技能分项评分（未给出时为None）"""
+    __slots__ = ('conclusion', 'score', 'education', 'experience', 'skills')
+
+    FAILED = '评估失败'
+    INVALID = '评估结论无效'
+    # 结果字典中的评分键，与 __slots__ 中的评分字段一一对应
+    SCORE_KEYS = (('score', '综合评分'), ('education', '学历评分'), ('experience', '经验评分'), ('skills', '技能评分'))
+
+    def __init__(self, conclusion: str, score: Optional[int] = None, education: Optional[int] = None,
+                 experience: Optional[int] = None, skills: Optional[int] = None):
+        self.conclusion = conclusion
+        self.score = score
+        self.education = education
+        self.experience = experience
+        self.skills = skills
+
+    @property
+    def ok(self) -> bool:
+        return self.conclusion not in (self.FAILED, self.INVALID)
+
+    def score_fields(self) -> Dict[str, int]:
+        """评分写入结果字典的字段，未给出的分项不写入"""
+        return {key: getattr(self, slot) for slot, key in self.SCORE_KEYS if getattr(self, slot) is not None}
+
+    def __repr__(self) -> str:
+        return (f"Evaluation(score={self.score!r}, education={self.education!r}, experience={self.experience!r}, "
+                f"skills={self.skills!r}, conclusion={self.conclusion!r})")
+
+class DeepSeekEvaluator:
+    """评估器：负责简历信息提取和候选人评估"""
+
+    # Prompt版本：调整静态前缀内容时需递增，便于比对缓存命中与评估结果
+    EXTRACTION_PROMPT_VERSION = 2
+    EVALUATION_PROMPT_VERSION = 3
+
+    # 静态前缀：DeepSeek上下文缓存仅对完全相同的前缀生效，因此所有可变内容必须放在末尾
+    EXTRACTION_PROMPT_PREFIX = """分析简历，提取以下信息：
+
+基本信息：
+- 姓名：中文，从简历标题、个人信息、文件名提取。
+- 性别：男/女，未明确返回""。
+- 应聘职位：从简历标题、求职意向、文件名提取，未找到返回""。
+- 年龄：从出生年份或年龄提取（如“30岁”），返回字符串，未找到返回""。
+- 居住地：从联系方式、地址提取，未找到返回""。
+
+教育背景：
+- 原始学历：最早学历（学位、学校、专业、毕业年份），未找到返回空对象。
+- 最高学历：最后学历（学位、学校、专业、毕业年份），未找到返回空对象。
+
+工作经历：
+- 按时间倒序，每段包含：
+  - 时间段：YYYY年MM月-YYYY年MM月，非标准（如“2018-2020”）转为标准，至今转为“YYYY年MM月-2025年04月”，缺失标记“未知”。
+  - 公司：名称，移除部门（如“腾讯技术部” -> “腾讯”）。
+  - 性质：国企/民营/外企/合资/事业单位/其他，未明确返回“其他”。  
+  - 规模：少于50人/50-100人/100-500人/500-1000人/1000人以上/未知，未明确返回“未知”。
+  - 行业：互联网/软件/制造业/金融服务/教育培训/医疗健康/快消品/零售/物流/房地产/耐用消费品/进出口贸易/电子商务/其他，未明确返回“其他”。
+  - 职位：名称，移除修饰（如“高级商务经理” -> “商务经理”）。
+  - 描述：职责，限60字，超长截断。
+- 优先从“工作经历”“职业经历”段落或表格提取，排除项目或实习经历。
+- 推断规则：
+  - 性质：如“中国石油” -> 国企，“腾讯” -> 民营。
+  - 规模：如“初创” -> 少于50人，“上市公司” -> 1000人以上。
+  - 行业：如“腾讯” -> 互联网，“宝洁” -> 快消品，“顺丰” -> 物流，“万达” -> 房地产，“美的” -> 耐用消费品，“中远海运” -> 进出口贸易，“京东” -> 电子商务。
+- 未找到返回空列表。
+
+项目经验：
+- 仅从标有“项目经历”或“项目经验”的段落或表格提取，按时间倒序，每段包含：
+  - 时间段：YYYY年MM月-YYYY年MM月，非标准转为标准，缺失标记“未知”。
+  - 项目名称：如“商务平台开发”。
+  - 角色：如“商务经理”“项目负责人”。
+  - 技术栈：技术或工具，如“Excel, CRM”，未明确返回“”。
+  - 项目成果：成果或影响，限60字，如“提升20%客户转化率”，未明确返回“”。
+  - 描述：职责，限60字，超长截断。
+- 未找到返回空列表。
+
+技能及优势：
+- 硬技能、软技能、个人优势列表，如“商务谈判”“团队协作”“抗压能力”。
+- 硬技能可选掌握程度（精通/熟练/了解），软技能/优势留空。
+- 从“技能”“自我评价”“工作经历”段落或表格提取。
+- 未找到返回空列表。
+
+返回JSON：
+{
+    "name": "",
+    "gender": "",
+    "position": "",
+    "age": "",
+    "location": "",
+    "education": {
+        "original": {"degree": "", "school": "", "major": "", "graduation_year": ""},
+        "highest": {"degree": "", "school": "", "major": "", "graduation_year": ""}
+    },
+    "experience": {
+        "work_history": [
+            {
+                "period": "",
+                "company": "",
+                "company_nature": "",                
+                "company_scale": "",
                 "company_industry": "",
                 "position": "",
                 "description": ""
-            }}
+            }
         ]
-    }},
-    "projects": {{
+    },
+    "projects": {
         "project_history": [
-            {{
+            {
                 "period": "",
                 "project_name": "",
                 "role": "",
                 "tech_stack": "",
                 "outcomes": "",
                 "description": ""
-            }}
+            }
         ]
-    }},
-    "skills_and_strengths": {{
+    },
+    "skills_and_strengths": {
         "list": [],
-        "proficiency": {{}}
-    }}
-}}
+        "proficiency": {}
+    }
+}
+
+以下为待分析的简历：
+"""
+
+    EVALUATION_PROMPT_PREFIX = """根据职位说明书和候选人简历信息，评估候选人是否适合该岗位。
+要求：
+1. 比较教育背景、工作经历、项目经验和技能与岗位要求。
+2. 输出简洁的评估结论（不超过100字）。
+3. 结论需明确指出匹配度及主要优劣势。
+4. 给出0-100的整数评分：综合评分，以及学历、经验、技能三个分项评分。
+
+返回格式：
+评估结论：[具体结论]
+综合评分：[0-100]
+学历评分：[0-100]
+经验评分：[0-100]
+技能评分：[0-100]
+
+示例返回：
+评估结论：候选人技能匹配度高，10年商务经验符合要求，但学历略低于预期。
+综合评分：82
+学历评分：65
+经验评分：90
+技能评分：85
+
+以下依次为职位说明书和候选人信息：
+"""
+
+    MULTI_EVALUATION_PROMPT_PREFIX = """根据多个职位说明书和候选人简历信息，分别评估候选人与每个岗位的匹配程度。
+要求：
+1. 对每个岗位，比较教育背景、工作经历、项目经验和技能与岗位要求。
+2. 每个岗位给出0-100的匹配度评分（整数）和简洁的评估结论（不超过60字）。
+3. 每个岗位另给出学历、经验、技能三个0-100的分项评分（整数）。
+4. 结论需明确指出匹配度及主要优劣势。
+5. 按岗位编号逐一返回，不得遗漏或新增岗位。
+
+返回JSON：
+{"evaluations": [{"index": 1, "score": 0, "education": 0, "experience": 0, "skills": 0, "conclusion": ""}]}
+
+示例返回：
+{"evaluations": [{"index": 1, "score": 85, "education": 65, "experience": 90, "skills": 88, "conclusion": "10年商务经验符合要求，技能匹配度高，学历略低于预期。"}, {"index": 2, "score": 40, "education": 70, "experience": 30, "skills": 35, "conclusion": "缺少技术开发经验，与岗位要求差距较大。"}]}
+
+以下依次为候选岗位和候选人信息：
 """
+    
+    def __init__(self, metrics: Optional['RunMetrics'] = None):
+        self.config = ConfigManager()
+        self.metrics = metrics or RunMetrics()
+        self.llm = LLMBackend.from_config(self.config, self.metrics)
+        self.filename_parser = FilenameParser.from_config(self.config)
+        self.template_extractor = TemplateResumeExtractor(self.filename_parser)
+        self.template_fast_path = (
+            (self.config.get('EXTRACTION', 'template_fast_path') or 'true').lower() in ('1', 'true', 'yes', 'on')
+        )
+        try:
+            self.template_min_confidence = float(self.config.get('EXTRACTION', 'template_min_confidence') or 0.8)
+        except ValueError:
+            self.template_min_confidence = 0.8
+        self.retry_count = 3
+        self.retry_delay = 2
+        self._jd_vectors = {}  # 职位说明书内容 -> 字符二元组向量，供多岗位预筛选复用
+
+    def close(self):
+        self.llm.close()
+    
+    def _build_extraction_prompt(self, resume_text: str, filename: str) -> str:
+        """构建简历信息提取的Prompt：静态指令与JSON结构在前，简历文件名和内容在后，age 返回字符串"""
+        return f"{self.EXTRACTION_PROMPT_PREFIX}简历文件名：{filename}\n简历内容：\n{resume_text}\n"
 
-    def _extract_resume_info(self, resume_text: str, filename: str) -> Dict:
-        """从简历中提取信息"""
+    def _extract_resume_info(self, resume_text: str, filename: str) -> Optional[Candidate]:
+        """从简历中提取信息；模板简历优先本地提取，仅在必需字段缺失或置信度不足时调用API"""
+        local, confidence = (None, {})
+        if self.template_fast_path:
+            local, confidence = self.template_extractor.extract(resume_text, filename)
+        if local is not None:
+            weak_fields = [field for field in TemplateResumeExtractor.REQUIRED_FIELDS
+                           if confidence.get(field, 0.0) < self.template_min_confidence]
+            if not weak_fields:
+                self.metrics.increment('template_fast_path')
+                logging.info(f"模板简历本地提取完成，跳过API调用: {filename}")
+                return self._ensure_required_fields(local, filename)
+            logging.info(f"模板提取字段置信度不足 {weak_fields}，调用API补全: {filename}")
+
+        candidate = self._extract_resume_info_via_api(resume_text, filename)
+        if candidate is not None and local is not None:
+            candidate = TemplateResumeExtractor.merge(local, candidate, confidence, self.template_min_confidence)
+        return candidate
+
+    def _extract_resume_info_via_api(self, resume_text: str, filename: str) -> Optional[Candidate]:
+        """调用API提取简历信息"""
         prompt = self._build_extraction_prompt(resume_text, filename)
         last_error = None
         
@@ -346,8 +2556,8 @@ class DeepSeekEvaluator:
                 if attempt > 0:
                     time.sleep(self.retry_delay * (attempt + 1))
                 
-                response = self.client.chat.completions.create(
-                    model="deepseek-chat",
+                response = self.llm.chat(
+                    'extraction',
                     messages=[
                         {
                             "role": "system",
@@ -361,339 +2571,100 @@ class DeepSeekEvaluator:
                 )
                 
                 content = response.choices[0].message.content
-                extracted_info = self._parse_api_response(content, filename)
-                return self._ensure_required_fields(extracted_info, filename)
+                candidate = self._parse_api_response(content, filename)
+                return self._ensure_required_fields(candidate or Candidate(), filename)
             except Exception as e:
                 last_error = str(e)
                 logging.warning(f"API调用失败 (尝试 {attempt+1}/{self.retry_count}): {str(e)}")
                 if attempt < self.retry_count - 1:
                     continue
                 logging.error(f"所有提取尝试均失败: {filename} - {last_error}")
-                return {}
+                return None
             
-        return {}
+        return None
 
-    def _parse_api_response(self, content: str, filename: str) -> Dict:
-        """解析API响应内容，确保 age 是字符串"""
+    def _parse_api_response(self, content: str, filename: str) -> Optional[Candidate]:
+        """解析API响应内容并构建候选人记录，age 为字符串"""
         try:
+            if isinstance(content, bytes):
+                content = content.decode('utf-8')
             content = content.strip()
             if content.startswith("```json"):
                 content = content[7:-3].strip()
             elif content.startswith("```"):
                 content = content[3:-3].strip()
             
-            if isinstance(content, bytes):
-                content = content.decode('utf-8')
-            
             try:
                 result = json.loads(content)
                 if not isinstance(result, dict):
                     logging.error(f"API响应非字典: {filename} - 类型: {type(result)}, 内容: {content[:500]}...")
-                    return {}
+                    return None
             except json.JSONDecodeError as e:
                 logging.error(f"JSON解析失败 ({filename}): {str(e)}\n原始内容: {content[:500]}...")
-                return {}
-            
-            # 验证基本信息
-            name = result.get('name', '').strip()
-            if not name or not all('\u4e00' <= char <= '\u9fff' for char in name):
-                logging.warning(f"提取的姓名无效或非中文 ({filename}): {name}")
-                result['name'] = ''
-            
-            gender = result.get('gender', '').strip()
-            if gender not in ['男', '女', '']:
-                logging.warning(f"提取的性别值无效 ({filename}): {gender}")
-                result['gender'] = ''
-            
-            position = result.get('position', '').strip()
-            if not position:
-                logging.warning(f"未提取到应聘职位 ({filename})")
-            
-            # 验证年龄
-            age = result.get('age', '')
-            if isinstance(age, dict):
-                logging.info(f"年龄字段为字典，提取 summary ({filename}): {age}")
-                age = age.get('summary', '')
-            if not isinstance(age, str):
-                logging.warning(f"年龄字段格式错误 ({filename}): {age}")
-                age = ''
-            result['age'] = age
-            
-            # 验证教育背景
-            education = result.get('education', {})
-            if not isinstance(education, dict):
-                logging.warning(f"教育背景格式错误 ({filename}): {education}")
-                education = {
-                    'original': {'degree': '', 'school': '', 'major': '', 'graduation_year': ''},
-                    'highest': {'degree': '', 'school': '', 'major': '', 'graduation_year': ''}
-                }
-            for edu_type in ['original', 'highest']:
-                if not isinstance(education.get(edu_type), dict):
-                    logging.warning(f"教育背景子项格式错误 ({filename}, {edu_type}): {education.get(edu_type)}")
-                    education[edu_type] = {'degree': '', 'school': '', 'major': '', 'graduation_year': ''}
-            
-            # 验证工作经历
-            experience = result.get('experience', {})
-            if not isinstance(experience, dict):
-                logging.warning(f"工作经历格式错误 ({filename}): {experience}")
-                experience = {'work_history': []}
-            work_history = experience.get('work_history', [])
-            if not isinstance(work_history, list):
-                logging.warning(f"工作经历列表格式错误 ({filename}): {work_history}")
-                work_history = []
-                experience['work_history'] = work_history
-            valid_industries = [
-                "互联网", "软件", "制造业", "金融服务", "教育培训", "医疗健康",
-                "快消品", "零售", "物流", "房地产", "耐用消费品", "进出口贸易",
-                "电子商务", "其他"
-            ]
-            valid_work_history = []
-            for work in work_history:
-                if not isinstance(work, dict):
-                    logging.warning(f"工作经历项格式错误 ({filename}): {work}")
-                    continue
-                work["company_nature"] = str(work.get("company_nature", "其他"))             
-                work["company_scale"] = str(work.get("company_scale", "未知"))
-                work["company_industry"] = str(work.get("company_industry", "其他"))
-                if work["company_industry"] not in valid_industries:
-                    work["company_industry"] = "其他"
-                work["period"] = str(work.get("period", ""))
-                work["company"] = str(work.get("company", ""))
-                work["position"] = str(work.get("position", ""))
-                work["description"] = str(work.get("description", ""))[:60]
-                valid_work_history.append(work)
-            experience['work_history'] = valid_work_history
-            
-            # 验证项目经验
-            projects = result.get('projects', {})
-            if not isinstance(projects, dict):
-                logging.warning(f"项目经验格式错误 ({filename}): {projects}")
-                projects = {'project_history': []}
-            project_history = projects.get('project_history', [])
-            if not isinstance(project_history, list):
-                logging.warning(f"项目经验列表格式错误 ({filename}): {project_history}")
-                project_history = []
-                projects['project_history'] = project_history
-            valid_project_history = []
-            for project in project_history:
-                if not isinstance(project, dict):
-                    logging.warning(f"项目经验项格式错误 ({filename}): {project}")
-                    continue
-                project["period"] = str(project.get("period", ""))
-                project["project_name"] = str(project.get("project_name", ""))
-                project["role"] = str(project.get("role", ""))
-                project["tech_stack"] = str(project.get("tech_stack", ""))
-                project["outcomes"] = str(project.get("outcomes", ""))[:60]
-                project["description"] = str(project.get("description", ""))[:60]
-                valid_project_history.append(project)
-            projects['project_history'] = valid_project_history
-            
-            # 验证技能及优势
-            skills = result.get('skills_and_strengths', {"list": [], "proficiency": {}})
-            if not isinstance(skills, dict):
-                logging.warning(f"技能及优势格式错误 ({filename}): {skills}")
-                skills = {"list": [], "proficiency": {}}
-            skills_list = skills.get('list', [])
-            if not isinstance(skills_list, list):
-                logging.warning(f"技能列表格式错误 ({filename}): {skills_list}")
-                skills['list'] = []
-            valid_skills_list = [str(skill) for skill in skills_list if isinstance(skill, str)]
-            skills['list'] = valid_skills_list
-            proficiency = skills.get('proficiency', {})
-            if not isinstance(proficiency, dict):
-                logging.warning(f"技能熟练度格式错误 ({filename}): {proficiency}")
-                proficiency = {}
-            valid_proficiency = {str(k): str(v) for k, v in proficiency.items() if isinstance(k, str) and isinstance(v, str)}
-            skills['proficiency'] = valid_proficiency
-            
-            result['education'] = education
-            result['experience'] = experience
-            result['projects'] = projects
-            result['skills_and_strengths'] = skills
-            
-            return result
+                return None
+
+            return Candidate.from_api_json(result, filename)
         except Exception as e:
-            logging.error(f"解析API响应失败 ({filename}): {str(e)}\n原始内容: {content[:500]}...")
-            return {}
+            logging.error(f"解析API响应失败 ({filename}): {str(e)}\n原始内容: {str(content)[:500]}...")
+            return None
     
-    def _ensure_required_fields(self, info: Dict, filename: str) -> Dict:
-        """确保必要字段存在，age 为字符串"""
+    def _ensure_required_fields(self, candidate: Candidate, filename: str) -> Candidate:
+        """用文件名补充缺失的姓名、职位，并从姓名推断性别"""
         try:
-            filename_no_ext = os.path.splitext(filename)[0]
-            filename_parts = filename_no_ext.split('_')
-        
-            platform = filename_parts[0] if len(filename_parts) > 0 else ""
-            name_from_file = filename_parts[1] if len(filename_parts) > 1 else ""
-            position_from_file = filename_parts[2] if len(filename_parts) >= 3 else filename_no_ext
+            parsed = self.filename_parser.parse(filename)
+            name_from_file = parsed.name
+            position_from_file = parsed.position or os.path.splitext(filename)[0]
         
-            name_from_content = info.get('name', '').strip()
-            final_name = ''
-            if name_from_content and all('\u4e00' <= char <= '\u9fff' for char in name_from_content):
-                final_name = name_from_content
-            elif name_from_file and all('\u4e00' <= char <= '\u9fff' for char in name_from_file):
-                final_name = name_from_file
-                logging.info(f"使用文件名中的姓名: {final_name} ({filename})")
+            if not _is_chinese_text(candidate.name):
+                candidate.name = name_from_file if _is_chinese_text(name_from_file) else ''
+                if candidate.name:
+                    logging.info(f"使用文件名中的姓名: {candidate.name} ({filename})")
         
-            position_from_content = info.get('position', '').strip()
-            final_position = position_from_content or position_from_file
-            if not position_from_content and position_from_file:
-                logging.info(f"使用文件名中的职位: {final_position} ({filename})")
+            if not candidate.position and position_from_file:
+                candidate.position = position_from_file
+                logging.info(f"使用文件名中的职位: {candidate.position} ({filename})")
         
-            gender_from_content = info.get('gender', '').strip()
-            final_gender = ''
-            if gender_from_content in ['男', '女']:
-                final_gender = gender_from_content
-            elif final_name:
-                final_gender = self._infer_gender_from_name(final_name)
-                if final_gender:
-                    logging.info(f"从姓名推断性别: {final_gender} ({filename})")
-         
-            return {
-                'name': final_name,
-                'position': final_position,
-                'gender': final_gender,
-                'location': info.get('location', ''),
-                'age': info.get('age', ''),
-                'education': info.get('education', {
-                    'original': {'degree': '', 'school': '', 'major': '', 'graduation_year': ''},
-                    'highest': {'degree': '', 'school': '', 'major': '', 'graduation_year': ''}
-                }),
-                'experience': info.get('experience', {
-                    'work_history': []
-                }),
-                'projects': info.get('projects', {
-                    'project_history': []
-                }),
-                'skills_and_strengths': info.get('skills_and_strengths', {
-                    'list': [],
-                    'proficiency': {}
-                })
-            }
+            if candidate.gender not in ('男', '女'):
+                candidate.gender = self._infer_gender_from_name(candidate.name) if candidate.name else ''
+                if candidate.gender:
+                    logging.info(f"从姓名推断性别: {candidate.gender} ({filename})")
+            return candidate
         except Exception as e:
             logging.error(f"处理字段补充失败 ({filename}): {str(e)}")
-            return info
+            return candidate
         
-    def _build_result_dict(self, info: Dict, conclusion: str, filename: str) -> Dict:
-        """构建最终结果字典，age 为字符串"""
+    def _build_result_dict(self, info: Candidate, conclusion: str, filename: str) -> Dict:
+        """构建最终结果字典（记录已在构造时校验，此处仅做格式化）"""
         try:
-            # 验证 info 结构
-            if not isinstance(info, dict):
-                logging.error(f"info 不是字典 ({filename}): {info}")
-                return {}
-
-            # 技能及优势
-            skills = info.get('skills_and_strengths', {'list': [], 'proficiency': {}})
-            if not isinstance(skills, dict):
-                logging.warning(f"技能及优势格式错误 ({filename}): {skills}")
-                skills = {'list': [], 'proficiency': {}}
-            skills_list = skills.get('list', [])
-            if not isinstance(skills_list, list):
-                logging.warning(f"技能列表格式错误 ({filename}): {skills_list}")
-                skills_list = []
-            proficiency = skills.get('proficiency', {})
-            if not isinstance(proficiency, dict):
-                logging.warning(f"技能熟练度格式错误 ({filename}): {proficiency}")
-                proficiency = {}
-            skills_str = "; ".join([
-                f"{skill} ({proficiency.get(skill, '')})" if proficiency.get(skill) else skill
-                for skill in skills_list if isinstance(skill, str)
-            ]) if skills_list else ""
-
-            # 工作经历
-            experience = info.get('experience', {'work_history': []})
-            if not isinstance(experience, dict):
-                logging.warning(f"工作经历格式错误 ({filename}): {experience}")
-                experience = {'work_history': []}
-            work_history = experience.get('work_history', [])
-            if not isinstance(work_history, list):
-                logging.warning(f"工作经历列表格式错误 ({filename}): {work_history}")
-                work_history = []
-            valid_work_history = []
-            for exp in work_history:
-                if not isinstance(exp, dict):
-                    logging.warning(f"工作经历项格式错误 ({filename}): {exp}")
-                    continue
-                valid_exp = {
-                    'period': str(exp.get('period', '')),
-                    'company': str(exp.get('company', '')),
-                    'company_nature': str(exp.get('company_nature', '其他')),
-                    'company_scale': str(exp.get('company_scale', '未知')),
-                    'company_industry': str(exp.get('company_industry', '其他')),
-                    'position': str(exp.get('position', '')),
-                    'description': str(exp.get('description', ''))[:60]
-                }
-                valid_work_history.append(valid_exp)
-            work_history_str = '\n '.join([
-                f"{exp['period']} {exp['company']} ({exp['company_nature']}, "
-                f"{exp['company_scale']}, {exp['company_industry']}) {exp['position']}: {exp['description']}"
-                for exp in valid_work_history
-            ]) if valid_work_history else ''
-
-            # 项目经验
-            projects = info.get('projects', {'project_history': []})
-            if not isinstance(projects, dict):
-                logging.warning(f"项目经验格式错误 ({filename}): {projects}")
-                projects = {'project_history': []}
-            project_history = projects.get('project_history', [])
-            if not isinstance(project_history, list):
-                logging.warning(f"项目经验列表格式错误 ({filename}): {project_history}")
-                project_history = []
-            valid_project_history = []
-            for proj in project_history:
-                if not isinstance(proj, dict):
-                    logging.warning(f"项目经验项格式错误 ({filename}): {proj}")
-                    continue
-                valid_proj = {
-                    'period': str(proj.get('period', '')),
-                    'project_name': str(proj.get('project_name', '')),
-                    'role': str(proj.get('role', '')),
-                    'tech_stack': str(proj.get('tech_stack', '')),
-                    'outcomes': str(proj.get('outcomes', ''))[:60],
-                    'description': str(proj.get('description', ''))[:60]
-                }
-                valid_project_history.append(valid_proj)
-            project_history_str = '; '.join([
-                f"{proj['period']} {proj['project_name']} ({proj['role']}, 技术栈: {proj['tech_stack']}, "
-                f"成果: {proj['outcomes']}): {proj['description']}"
-                for proj in valid_project_history
-            ]) if valid_project_history else ''
-
-            # 教育背景
-            education = info.get('education', {
-                'original': {'degree': '', 'school': '', 'major': '', 'graduation_year': ''},
-                'highest': {'degree': '', 'school': '', 'major': '', 'graduation_year': ''}
-            })
-            if not isinstance(education, dict):
-                logging.warning(f"教育背景格式错误 ({filename}): {education}")
-                education = {
-                    'original': {'degree': '', 'school': '', 'major': '', 'graduation_year': ''},
-                    'highest': {'degree': '', 'school': '', 'major': '', 'graduation_year': ''}
-                }
-
-            # 构建结果
+            work_history_str = '\n '.join(
+                f"{exp.period} {exp.company} ({exp.company_nature}, "
+                f"{exp.company_scale}, {exp.company_industry}) {exp.position}: {exp.description}"
+                for exp in info.work_history
+            )
+            project_history_str = '; '.join(
+                f"{proj.period} {proj.project_name} ({proj.role}, 技术栈: {proj.tech_stack}, "
+                f"成果: {proj.outcomes}): {proj.description}"
+                for proj in info.project_history
+            )
             return {
-                '姓名': str(info.get('name', '')),
-                '应聘岗位': str(info.get('position', '')),
-                '性别': str(info.get('gender', '')),
-                '居住地': str(info.get('location', '')),
-                '年龄': str(info.get('age', '')),
-                '原生学历': f"{education.get('original', {}).get('degree', '')} - "
-                           f"{education.get('original', {}).get('school', '')} - "
-                           f"{education.get('original', {}).get('major', '')} "
-                           f"({education.get('original', {}).get('graduation_year', '')})",
-                '最高学历': f"{education.get('highest', {}).get('degree', '')} - "
-                           f"{education.get('highest', {}).get('school', '')} - "
-                           f"{education.get('highest', {}).get('major', '')} "
-                           f"({education.get('highest', {}).get('graduation_year', '')})",
+                '姓名': info.name,
+                '应聘岗位': info.position,
+                '性别': info.gender,
+                '居住地': info.location,
+                '年龄': info.age,
+                '原生学历': info.education_original.format(),
+                '最高学历': info.education_highest.format(),
                 '工作经历': work_history_str,
                 '项目经验': project_history_str,
-                '技能及优势': skills_str,
+                '技能及优势': info.skills.format(),
                 '评估结论': str(conclusion),
                 '处理时间': datetime.now().strftime('%Y-%m-%d %H:%M'),
-                '文件名': str(filename)
+                '文件名': str(filename),
+                # 非报表列：保留嵌套结构，供结果库和列式输出格式使用
+                '结构化信息': info.to_dict()
             }
         except Exception as e:
-            logging.error(f"构建结果字典失败 ({filename}): {str(e)}\ninfo结构: {str(info)[:1000]}...")
+            logging.error(f"构建结果字典失败 ({filename}): {str(e)}")
             return {}
     
     def _infer_gender_from_name(self, name: str) -> str:
@@ -710,103 +2681,207 @@ class DeepSeekEvaluator:
                 return '女'
         return ''
     
-    def evaluate_candidate(self, resume_info: Dict, job_content: str, filename: str) -> str:
-        """基于职位说明书内容评估候选人"""
-        skills = resume_info.get('skills_and_strengths', {'list': [], 'proficiency': {}})
-        skills_str = "; ".join([
-            f"{skill} ({skills['proficiency'].get(skill, '')})" if skills['proficiency'].get(skill) else skill
-            for skill in skills['list']
-        ]) if skills['list'] else ""
-        
-        prompt = """根据以下职位说明书和候选人简历信息，评估候选人是否适合该岗位。
-要求：
-1. 比较教育背景、工作经历、项目经验和技能与岗位要求。
-2. 输出简洁的评估结论（不超过100字）。
-3. 结论需明确指出匹配度及主要优劣势。
-
-职位说明书：
-{job_content}
-
-候选人信息：
-姓名：{name}
+    def _format_candidate_summary(self, resume_info: Candidate) -> str:
+        """格式化评估Prompt中的候选人信息（Prompt的可变后缀部分）"""
+        highest = resume_info.education_highest
+        return """姓名：{name}
 教育背景：{education}
 工作经历：{experience}
 项目经验：{projects}
-技能及优势：{skills}
+技能及优势：{skills}""".format(
+            name=resume_info.name,
+            education=f"{highest.degree} - {highest.school} - {highest.major}",
+            experience="; ".join(
+                f"{exp.period} {exp.company} ({exp.company_nature}, {exp.company_industry}) "
+                f"{exp.position}: {exp.description}"
+                for exp in resume_info.work_history
+            ),
+            projects="; ".join(
+                f"{proj.period} {proj.project_name} ({proj.role}): {proj.description}"
+                for proj in resume_info.project_history
+            ),
+            skills=resume_info.skills.format()
+        )
 
-返回格式：
-评估结论：[具体结论]
+    _SCORE_LINE_PATTERN = re.compile(r'^\s*(综合|学历|经验|技能)评分\s*[:：]\s*(\d+(?:\.\d+)?)', re.M)
+    _SCORE_LINE_FIELDS = {'综合': 'score', '学历': 'education', '经验': 'experience', '技能': 'skills'}
 
-示例返回：
-评估结论：候选人技能匹配度高，10年商务经验符合要求，但学历略低于预期。
-""".format(
-            job_content=job_content,
-            name=resume_info.get('name', ''),
-            education=f"{resume_info.get('education', {}).get('highest', {}).get('degree', '')} - "
-                      f"{resume_info.get('education', {}).get('highest', {}).get('school', '')} - "
-                      f"{resume_info.get('education', {}).get('highest', {}).get('major', '')}",
-            experience="; ".join([
-                f"{exp['period']} {exp['company']} ({exp['company_nature']}, {exp['company_industry']}) "
-                f"{exp['position']}: {exp['description']}"
-                for exp in resume_info.get('experience', {}).get('work_history', []) if isinstance(exp, dict)
-            ]),
-            projects="; ".join([
-                f"{proj['period']} {proj['project_name']} ({proj['role']}): {proj['description']}"
-                for proj in resume_info.get('projects', {}).get('project_history', []) if isinstance(proj, dict)
-            ]),
-            skills=skills_str
-        )
+    def _parse_evaluation(self, content: str) -> Evaluation:
+        """解析“评估结论：…”及各评分行；缺少评分行时仍返回结论（评分为None）"""
+        match = re.search(r'评估结论\s*[:：]\s*(.*)', content)
+        if not match or not match.group(1).strip():
+            return Evaluation(Evaluation.INVALID)
+        scores = {self._SCORE_LINE_FIELDS[label]: _clamp_score(value)
+                  for label, value in self._SCORE_LINE_PATTERN.findall(content)}
+        return Evaluation(match.group(1).strip(), **scores)
+
+    def evaluate_candidate(self, resume_info: Candidate, job_content: str, filename: str) -> Evaluation:
+        """基于职位说明书内容评估候选人，返回评估结论及综合/分项评分"""
+        if isinstance(resume_info, dict):
+            resume_info = Candidate.from_dict(resume_info)
+        # 布局：静态指令前缀 -> 职位说明书 -> 候选人信息
+        prompt = (f"{self.EVALUATION_PROMPT_PREFIX}职位说明书：\n{job_content}\n\n"
+                  f"候选人信息：\n{self._format_candidate_summary(resume_info)}\n")
 
         try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
+            response = self.llm.chat(
+                'evaluation',
                 messages=[
                     {"role": "system", "content": "你是一个专业的招聘评估专家。"},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
-                max_tokens=150
+                max_tokens=200
             )
-            content = response.choices[0].message.content.strip()
-            if content.startswith("评估结论："):
-                conclusion = content.replace("评估结论：", "").strip()
-                logging.info(f"评估结论生成: {conclusion[:50]}... ({filename})")
-                return conclusion
-            return "评估结论无效"
+            evaluation = self._parse_evaluation(response.choices[0].message.content.strip())
+            if evaluation.ok:
+                logging.info(f"评估结论生成 (评分 {evaluation.score}): {evaluation.conclusion[:50]}... ({filename})")
+            return evaluation
         except Exception as e:
             logging.error(f"候选人评估失败: {filename} - {str(e)}")
-            return "评估失败"
+            return Evaluation(Evaluation.FAILED)
     
-    def process_resume(self, resume_text: str, filename: str, job_cache: Dict[str, Dict[str, str]]) -> Dict:
-        """提取简历信息并评估候选人"""
+    def evaluate_candidate_multi(self, resume_info: Candidate, jd_files: List[str], job_cache: Dict[str, Dict[str, str]],
+                                 filename: str) -> List[Dict]:
+        """一次API调用评估候选人与多个岗位的匹配度，按评分从高到低返回"""
+        if isinstance(resume_info, dict):
+            resume_info = Candidate.from_dict(resume_info)
+        positions_text = "\n\n".join(
+            f"岗位{index}：{job_cache[jd_file]['position']}\n{job_cache[jd_file]['content']}"
+            for index, jd_file in enumerate(jd_files, start=1)
+        )
+        prompt = (f"{self.MULTI_EVALUATION_PROMPT_PREFIX}候选岗位：\n{positions_text}\n\n"
+                  f"候选人信息：\n{self._format_candidate_summary(resume_info)}\n")
+
+        try:
+            response = self.llm.chat(
+                'multi_evaluation',
+                messages=[
+                    {"role": "system", "content": "你是一个专业的招聘评估专家。"},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=100 + 150 * len(jd_files),
+                response_format={"type": "json_object"}
+            )
+            data = json.loads(response.choices[0].message.content.strip())
+            evaluations = data.get('evaluations', []) if isinstance(data, dict) else []
+        except Exception as e:
+            logging.error(f"多岗位评估失败: {filename} - {str(e)}")
+            return []
+
+        results = []
+        seen = set()
+        for item in evaluations:
+            if not isinstance(item, dict):
+                continue
+            try:
+                index = int(item.get('index', 0))
+            except (TypeError, ValueError):
+                logging.warning(f"多岗位评估项格式错误 ({filename}): {item}")
+                continue
+            # 缺少或无法解析综合评分的项不参与排序，避免按0分混入结果
+            score = _clamp_score(item.get('score'))
+            if score is None:
+                logging.warning(f"多岗位评估项缺少评分 ({filename}): {item}")
+                continue
+            if not 1 <= index <= len(jd_files) or index in seen:
+                continue
+            seen.add(index)
+            jd_file = jd_files[index - 1]
+            results.append({
+                'jd_file': jd_file,
+                'position': job_cache[jd_file]['position'],
+                'score': score,
+                'education': _clamp_score(item.get('education')),
+                'experience': _clamp_score(item.get('experience')),
+                'skills': _clamp_score(item.get('skills')),
+                'conclusion': str(item.get('conclusion', '')).strip()
+            })
+        results.sort(key=lambda r: r['score'], reverse=True)
+        logging.info(f"多岗位评估完成: {filename} - " +
+                     ", ".join(f"{r['position']}({r['score']})" for r in results))
+        return results
+
+    def _rank_positions_locally(self, resume_info: Candidate, resume_text: str,
+                                job_cache: Dict[str, Dict[str, str]], top_k: int) -> List[Tuple[str, float]]:
+        """本地相似度预筛选：按字符二元组余弦相似度选出最相关的top_k个岗位，不调用API"""
+        resume_vector = _char_bigram_vector(resume_text)
+        resume_position = resume_info.position
+        scored = []
+        for jd_file, data in job_cache.items():
+            jd_vector = self._jd_vectors.get(data['content'])
+            if jd_vector is None:
+                jd_vector = _char_bigram_vector(data['content'])
+                self._jd_vectors[data['content']] = jd_vector
+            similarity = _cosine_similarity(resume_vector, jd_vector)
+            if resume_position:
+                similarity += self._calculate_position_similarity(resume_position, data['position'])
+            scored.append((jd_file, similarity))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:top_k]
+
+    def process_resume(self, resume_text: str, filename: str, job_cache: Dict[str, Dict[str, str]],
+                       top_k: int = 0) -> Dict:
+        """提取简历信息并评估候选人；top_k > 0 时同时评估本地预筛选出的多个岗位"""
         try:
             info = self._extract_resume_info(resume_text, filename)
-            if not info or not info.get('name'):
+            if info is None or not info.name:
                 logging.warning(f"简历信息提取失败或姓名为空: {filename}")
                 return {}
 
             matched_jd_file, matched_position = self._match_position(
-                resume_position=info.get('position', ''),
+                resume_position=info.position,
                 filename=filename,
                 job_cache=job_cache
             )
 
             if matched_position:
-                info['position'] = matched_position
+                info.position = matched_position
                 logging.info(f"职位匹配成功: {matched_position} ({filename})")
             else:
                 logging.warning(f"未匹配到职位: {filename}")
 
-            if matched_jd_file and matched_jd_file in job_cache:
-                conclusion = self.evaluate_candidate(
+            multi_evaluations = []
+            if top_k > 0 and job_cache:
+                candidates = [jd_file for jd_file, _ in self._rank_positions_locally(info, resume_text, job_cache, top_k)]
+                if matched_jd_file in job_cache and matched_jd_file not in candidates:
+                    candidates = [matched_jd_file] + candidates[:top_k - 1]
+                multi_evaluations = self.evaluate_candidate_multi(info, candidates, job_cache, filename)
+
+            evaluated_jd_file = ''
+            if multi_evaluations:
+                chosen = next((r for r in multi_evaluations if r['jd_file'] == matched_jd_file), multi_evaluations[0])
+                if not matched_position:
+                    info.position = chosen['position']
+                    logging.info(f"按多岗位评估最高分确定职位: {chosen['position']} ({filename})")
+                evaluation = Evaluation(chosen['conclusion'] or Evaluation.INVALID, chosen['score'],
+                                        chosen['education'], chosen['experience'], chosen['skills'])
+                evaluated_jd_file = chosen['jd_file']
+            elif matched_jd_file and matched_jd_file in job_cache:
+                evaluation = self.evaluate_candidate(
                     resume_info=info,
                     job_content=job_cache[matched_jd_file]['content'],
                     filename=filename
                 )
+                evaluated_jd_file = matched_jd_file
             else:
-                conclusion = "未匹配到岗位，无法评估"
+                evaluation = Evaluation("未匹配到岗位，无法评估")
 
-            return self._build_result_dict(info, conclusion, filename)
+            result = self._build_result_dict(info, evaluation.conclusion, filename)
+            if result:
+                result.update(evaluation.score_fields())
+            if result and evaluated_jd_file:
+                # 记录评估所用的职位说明书版本，岗位变更后据此增量重新评估
+                result['评估职位说明书'] = os.path.basename(evaluated_jd_file)
+                result['职位说明书版本'] = job_cache[evaluated_jd_file].get('version', '')
+            if result and multi_evaluations:
+                result['多岗位评估'] = [
+                    dict({'岗位': r['position'], '匹配度评分': r['score'], '评估结论': r['conclusion']},
+                         **{key: r[slot] for slot, key in Evaluation.SCORE_KEYS[1:] if r[slot] is not None})
+                    for r in multi_evaluations
+                ]
+            return result
 
         except Exception as e:
             logging.error(f"处理简历失败: {filename} - {str(e)}")
@@ -822,13 +2897,11 @@ class DeepSeekEvaluator:
                 clean_positions.append(clean_position)
                 jd_file_mapping[clean_position] = jd_file
 
-            clean_filename = re.sub(r'^\d+_|_\d+$|_南宁\(\d+\)$|_桂林\(\d+\)$|_昆明.*$|_.*\(\d+\)$', '', filename)
-            clean_filename = re.sub(r'^51job_|^BOSS_|^zhilian_|^【|】$|\d+年以上|\d+-\d+K', '', clean_filename).strip()
+            parsed = self.filename_parser.parse(filename)
+            clean_filename = parsed.clean
+            position_from_filename = parsed.position or clean_filename
             logging.info(f"清理后的文件名: {clean_filename} ({filename})")
 
-            filename_parts = clean_filename.split('_')
-            position_from_filename = filename_parts[2] if len(filename_parts) >= 3 else clean_filename
-
             if resume_position.strip():
                 best_match = None
                 highest_similarity = 0.0
@@ -871,6 +2944,308 @@ class DeepSeekEvaluator:
             return len(common_words) / max(len(words1), len(words2)) * 0.7
         return 0.0
 
+class ScheduledResume:
+    """待调度的简历任务"""
+    __slots__ = ('file_path', 'filename', 'priority', 'deadline', 'jd_file', 'payload', 'resume_text')
+
+    def __init__(self, file_path: str, filename: str, priority: int, deadline: Optional[date], jd_file: str,
+                 payload: Any = None):
+        self.file_path = file_path
+        self.filename = filename
+        self.priority = priority
+        self.deadline = deadline
+        self.jd_file = jd_file
+        self.payload = payload
+        self.resume_text = ''
+
+class PriorityScheduler:
+    """优先级调度器：按文件名预匹配岗位分配优先级，通过优先队列向API工作线程派发任务。
+
+    优先级数值越小越紧急；同优先级按截止日期、再按入队顺序排列。
+    各岗位的优先级和截止日期保存在 config.ini 的 [JOB_PRIORITY] 中，
+    格式为 <职位说明书文件名> = <优先级>,<截止日期YYYY-MM-DD>。
+    """
+
+    DEFAULT_PRIORITY = 5
+    _STOP = object()
+
+    def __init__(self, job_cache: Dict[str, Dict[str, str]], jd_priorities: Dict[str, Tuple[int, Optional[date]]],
+                 filename_parser: FilenameParser, default_priority: int = DEFAULT_PRIORITY):
+        self.job_cache = job_cache
+        self.jd_priorities = jd_priorities
+        self.filename_parser = filename_parser
+        self.default_priority = default_priority
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._started_at = time.monotonic()
+        self._latencies = {}  # 优先级 -> [完成耗时(秒)]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse_priority(value: str) -> Tuple[Optional[int], Optional[date]]:
+        """解析配置值 "<优先级>,<截止日期>"，任一部分缺失或无效时返回 None"""
+        priority, deadline = None, None
+        parts = [part.strip() for part in (value or '').split(',')]
+        try:
+            priority = int(parts[0]) if parts and parts[0] else None
+        except ValueError:
+            logging.warning(f"岗位优先级配置无效: {value}")
+        if len(parts) > 1 and parts[1]:
+            try:
+                deadline = datetime.strptime(parts[1], '%Y-%m-%d').date()
+            except ValueError:
+                logging.warning(f"岗位截止日期配置无效: {value}")
+        return priority, deadline
+
+    @classmethod
+    def load_jd_priorities(cls, config: ConfigManager, jd_files: Iterable[str]) -> Dict[str, Tuple[int, Optional[date]]]:
+        priorities = {}
+        for jd_file in jd_files:
+            priority, deadline = cls.parse_priority(config.get('JOB_PRIORITY', os.path.basename(jd_file)))
+            if priority is not None or deadline is not None:
+                priorities[jd_file] = (priority if priority is not None else cls.DEFAULT_PRIORITY, deadline)
+        return priorities
+
+    def prematch(self, filename: str) -> str:
+        """仅根据文件名匹配岗位（不读取文件、不调用API）"""
+        parsed = self.filename_parser.parse(filename)
+        for jd_file, data in self.job_cache.items():
+            position = data['position']
+            if position and (position == parsed.position or position in parsed.clean
+                             or (parsed.position and parsed.position in position)):
+                return jd_file
+        return ''
+
+    def assign(self, file_path: str, filename: str, payload: Any = None) -> ScheduledResume:
+        jd_file = self.prematch(filename)
+        priority, deadline = self.jd_priorities.get(jd_file, (self.default_priority, None))
+        return ScheduledResume(file_path, filename, priority, deadline, jd_file, payload)
+
+    @staticmethod
+    def order(items: List[ScheduledResume]) -> List[ScheduledResume]:
+        return sorted(items, key=lambda item: (item.priority, item.deadline or date.max))
+
+    def submit(self, item: ScheduledResume):
+        self._queue.put((item.priority, item.deadline or date.max, next(self._sequence), item))
+
+    def close(self, worker_count: int):
+        """放入结束标记，排在所有任务之后"""
+        for _ in range(worker_count):
+            self._queue.put((float('inf'), date.max, next(self._sequence), self._STOP))
+
+    def next(self) -> Optional[ScheduledResume]:
+        item = self._queue.get()[3]
+        return None if item is self._STOP else item
+
+    def mark_done(self, item: ScheduledResume):
+        with self._lock:
+            self._latencies.setdefault(item.priority, []).append(time.monotonic() - self._started_at)
+
+    def log_latency_report(self):
+        """按优先级输出完成耗时（自本批次开始计时）"""
+        with self._lock:
+            latencies = {priority: sorted(values) for priority, values in self._latencies.items()}
+        for priority, values in sorted(latencies.items()):
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            logging.info(f"优先级 {priority}: 完成 {len(values)} 份, 平均 {sum(values) / len(values):.1f}s, "
+                         f"P95 {p95:.1f}s, 最晚 {values[-1]:.1f}s")
+
+_CJK_CHAR_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+
+def estimate_tokens(text: str) -> int:
+    """本地估算token数：按DeepSeek公布的换算比例，中文约0.6 token/字，其他字符约0.3 token/字"""
+    if not text:
+        return 0
+    cjk = len(_CJK_CHAR_PATTERN.findall(text))
+    return int(math.ceil(cjk * 0.6 + (len(text) - cjk) * 0.3))
+
+class ResumeCostEstimate:
+    """单份简历的预估token用量"""
+    __slots__ = ('filename', 'calls', 'input_tokens', 'cached_tokens', 'output_tokens', 'local_extraction')
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.calls = 0
+        self.input_tokens = 0
+        self.cached_tokens = 0  # 输入中预计命中上下文缓存的部分（静态前缀与重复的职位说明书）
+        self.output_tokens = 0
+        self.local_extraction = False
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add_call(self, input_tokens: int, cached_tokens: int, output_tokens: int):
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.cached_tokens += min(cached_tokens, input_tokens)
+        self.output_tokens += output_tokens
+
+class RunPlan:
+    """运行计划：预估费用与耗时，并按token预算划分本次处理和延后处理的简历"""
+
+    def __init__(self, planner: 'RunPlanner'):
+        self.planner = planner
+        self.job_descriptions = ResumeCostEstimate('职位说明书')
+        self.accepted = []  # type: List[ResumeCostEstimate]
+        self.deferred = []  # type: List[ResumeCostEstimate]
+
+    def _estimates(self) -> List[ResumeCostEstimate]:
+        return [self.job_descriptions] + self.accepted
+
+    def totals(self) -> Dict[str, int]:
+        estimates = self._estimates()
+        return {
+            'calls': sum(e.calls for e in estimates),
+            'input_tokens': sum(e.input_tokens for e in estimates),
+            'cached_tokens': sum(e.cached_tokens for e in estimates),
+            'output_tokens': sum(e.output_tokens for e in estimates),
+        }
+
+    def cost(self) -> float:
+        totals = self.totals()
+        return self.planner.cost_of(totals['input_tokens'], totals['cached_tokens'], totals['output_tokens'])
+
+    def duration_seconds(self) -> float:
+        return self.planner.duration_of(self.job_descriptions.calls, sum(e.calls for e in self.accepted))
+
+    def report(self) -> str:
+        totals = self.totals()
+        local_count = sum(1 for e in self.accepted if e.local_extraction)
+        lines = [
+            f"本次处理 {len(self.accepted)} 份简历（模板本地提取 {local_count} 份），"
+            f"超出预算延后 {len(self.deferred)} 份",
+            f"预计API调用 {totals['calls']} 次, 输入 {totals['input_tokens']} tokens "
+            f"(预计缓存命中 {totals['cached_tokens']}), 输出 {totals['output_tokens']} tokens",
+            f"预计费用 {self.cost():.2f} 元, 预计耗时 {self.duration_seconds() / 60:.1f} 分钟"
+            f"（并发 {self.planner.api_concurrency}）",
+        ]
+        if self.planner.max_run_tokens:
+            lines.append(f"单次运行token预算: {self.planner.max_run_tokens}")
+        if self.deferred:
+            preview = ", ".join(e.filename for e in self.deferred[:5])
+            lines.append(f"延后处理: {preview}{' 等' if len(self.deferred) > 5 else ''}")
+        return "\n".join(lines)
+
+class RunPlanner:
+    """运行预估：本地估算每次API调用的输入/输出token，计算费用和耗时，并执行单次运行token预算。
+
+    预估全程不调用API；输出token按各调用的典型返回长度估算，单价和预算在 config.ini 的 [BUDGET] 中配置。
+    """
+
+    EXTRACTION_SYSTEM_PROMPT = "你是一个专业的简历信息提取专家。请严格按照要求格式提取信息，保持客观准确。"
+    # 评估时候选人信息为提取后的摘要，约为简历原文的一半，且有上限
+    SUMMARY_RATIO = 0.5
+    SUMMARY_MAX_TOKENS = 800
+    # 多岗位评估的典型输出：JSON外壳约40 tokens，每个岗位（评分、三项分项评分和不超过60字的结论）约80 tokens
+    MULTI_EVALUATION_BASE_TOKENS = 40
+    MULTI_EVALUATION_TOKENS_PER_POSITION = 80
+
+    def __init__(self, evaluator: 'DeepSeekEvaluator', config: ConfigManager):
+        self.evaluator = evaluator
+        self.max_run_tokens = self._read_number(config, 'max_run_tokens', 0, int)
+        self.input_price = self._read_number(config, 'input_price_per_mtok', 2.0, float)
+        self.cache_hit_price = self._read_number(config, 'cache_hit_price_per_mtok', 0.5, float)
+        self.output_price = self._read_number(config, 'output_price_per_mtok', 8.0, float)
+        self.seconds_per_call = self._read_number(config, 'seconds_per_call', 8.0, float)
+        self.extraction_output_tokens = self._read_number(config, 'extraction_output_tokens', 900, int)
+        self.evaluation_output_tokens = self._read_number(config, 'evaluation_output_tokens', 110, int)
+        self.api_concurrency = max(1, self._read_number(config, 'api_concurrency', 4, int, 'SCHEDULING'))
+        self._extraction_prefix_tokens = estimate_tokens(
+            self.EXTRACTION_SYSTEM_PROMPT + evaluator.EXTRACTION_PROMPT_PREFIX)
+        self._evaluation_prefix_tokens = estimate_tokens(evaluator.EVALUATION_PROMPT_PREFIX)
+        self._multi_prefix_tokens = estimate_tokens(evaluator.MULTI_EVALUATION_PROMPT_PREFIX)
+        self._jd_tokens = {}  # 职位说明书内容 -> token数
+
+    @staticmethod
+    def _read_number(config: ConfigManager, key: str, default, cast, section: str = 'BUDGET'):
+        try:
+            return cast(config.get(section, key) or default)
+        except ValueError:
+            logging.warning(f"配置项 [{section}] {key} 无效，使用默认值 {default}")
+            return default
+
+    def cost_of(self, input_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+        return ((input_tokens - cached_tokens) * self.input_price + cached_tokens * self.cache_hit_price
+                + output_tokens * self.output_price) / 1000000
+
+    def duration_of(self, serial_calls: int, concurrent_calls: int) -> float:
+        """职位说明书串行处理，简历评估按并发线程数分摊"""
+        return (serial_calls + math.ceil(concurrent_calls / self.api_concurrency)) * self.seconds_per_call
+
+    def _job_tokens(self, content: str) -> int:
+        tokens = self._jd_tokens.get(content)
+        if tokens is None:
+            tokens = self._jd_tokens[content] = estimate_tokens(content)
+        return tokens
+
+    def estimate_job_descriptions(self, job_cache: Dict[str, Dict[str, str]]) -> ResumeCostEstimate:
+        """每份职位说明书一次调用，返回内容约等于原文长度"""
+        estimate = ResumeCostEstimate('职位说明书')
+        for data in job_cache.values():
+            jd_tokens = self._job_tokens(data['content'])
+            estimate.add_call(jd_tokens + 200, 0, jd_tokens + 20)
+        return estimate
+
+    def estimate(self, resume_text: str, filename: str, job_cache: Dict[str, Dict[str, str]],
+                 top_k: int = 0) -> ResumeCostEstimate:
+        """按 DeepSeekEvaluator.process_resume 的调用路径估算单份简历的token用量"""
+        evaluator = self.evaluator
+        estimate = ResumeCostEstimate(filename)
+        resume_tokens = estimate_tokens(resume_text)
+
+        if evaluator.template_fast_path:
+            local, confidence = evaluator.template_extractor.extract(resume_text, filename)
+            estimate.local_extraction = local is not None and all(
+                confidence.get(field, 0.0) >= evaluator.template_min_confidence
+                for field in TemplateResumeExtractor.REQUIRED_FIELDS
+            )
+        if not estimate.local_extraction:
+            estimate.add_call(self._extraction_prefix_tokens + estimate_tokens(filename) + resume_tokens,
+                              self._extraction_prefix_tokens,
+                              min(self.extraction_output_tokens, 3000))
+
+        if not job_cache:
+            return estimate
+        summary_tokens = min(int(resume_tokens * self.SUMMARY_RATIO), self.SUMMARY_MAX_TOKENS)
+        if top_k > 0:
+            ranked = evaluator._rank_positions_locally(Candidate(), resume_text, job_cache, top_k)
+            jd_tokens = sum(self._job_tokens(job_cache[jd_file]['content']) for jd_file, _ in ranked)
+            estimate.add_call(self._multi_prefix_tokens + jd_tokens + summary_tokens,
+                              self._multi_prefix_tokens + jd_tokens,
+                              self.MULTI_EVALUATION_BASE_TOKENS + self.MULTI_EVALUATION_TOKENS_PER_POSITION * len(ranked))
+        else:
+            parsed = evaluator.filename_parser.parse(filename)
+            matched = [data['content'] for data in job_cache.values()
+                       if data['position'] and (data['position'] == parsed.position or data['position'] in parsed.clean)]
+            # 文件名无法匹配时仍可能按简历内容匹配，按职位说明书平均长度估算
+            jd_tokens = (self._job_tokens(matched[0]) if matched else
+                         sum(self._job_tokens(d['content']) for d in job_cache.values()) // len(job_cache))
+            estimate.add_call(self._evaluation_prefix_tokens + jd_tokens + summary_tokens,
+                              self._evaluation_prefix_tokens + jd_tokens,
+                              min(self.evaluation_output_tokens, 200))
+        return estimate
+
+    def within_budget(self, used_tokens: int, estimate: ResumeCostEstimate) -> bool:
+        return not self.max_run_tokens or used_tokens + estimate.total_tokens <= self.max_run_tokens
+
+    def plan(self, job_cache: Dict[str, Dict[str, str]], parsed: Iterable[Tuple[str, str]],
+             top_k: int = 0) -> RunPlan:
+        """parsed 为按处理顺序排列的 (文件名, 简历文本)；超出预算的简历记入 deferred"""
+        run_plan = RunPlan(self)
+        run_plan.job_descriptions = self.estimate_job_descriptions(job_cache)
+        used_tokens = run_plan.job_descriptions.total_tokens
+        for filename, resume_text in parsed:
+            if not resume_text.strip():
+                continue
+            estimate = self.estimate(resume_text, filename, job_cache, top_k)
+            if run_plan.deferred or not self.within_budget(used_tokens, estimate):
+                run_plan.deferred.append(estimate)
+            else:
+                run_plan.accepted.append(estimate)
+                used_tokens += estimate.total_tokens
+        return run_plan
+
 class ExcelGenerator:
     """Excel生成器"""
     STANDARD_COLUMNS = [      
@@ -897,6 +3272,312 @@ class ExcelGenerator:
         headers = [cell.value for cell in worksheet[1] if cell.value]
         return headers == expected_headers
 
+    MULTI_POSITION_COLUMNS = ['姓名', '文件名', '岗位', '匹配度评分', '评估结论', '处理时间']
+
+    @staticmethod
+    def _append_multi_position_sheet(workbook, results: List[Dict], header_style: Dict, content_alignment):
+        """将多岗位评估结果追加到独立工作表，每个候选人-岗位一行"""
+        rows = [
+            [result.get('姓名', ''), result.get('文件名', ''), item['岗位'], item['匹配度评分'],
+             item['评估结论'], result.get('处理时间', '')]
+            for result in results for item in result.get('多岗位评估', [])
+        ]
+        if not rows:
+            return
+        sheet_name = '多岗位评估'
+        if sheet_name in workbook.sheetnames:
+            worksheet = workbook[sheet_name]
+        else:
+            worksheet = workbook.create_sheet(sheet_name)
+            for col_idx, header in enumerate(ExcelGenerator.MULTI_POSITION_COLUMNS, start=1):
+                cell = worksheet.cell(row=1, column=col_idx)
+                cell.value = header
+                cell.fill = header_style['fill']
+                cell.font = header_style['font']
+                cell.alignment = header_style['alignment']
+            for col_idx, width in enumerate([12, 30, 20, 12, 60, 18], start=1):
+                worksheet.column_dimensions[get_column_letter(col_idx)].width = width
+            worksheet.freeze_panes = 'A2'
+        start_row = worksheet.max_row + 1
+        for row_idx, row_data in enumerate(rows, start=start_row):
+            for col_idx, value in enumerate(row_data, start=1):
+                cell = worksheet.cell(row=row_idx, column=col_idx)
+                cell.value = value
+                cell.alignment = content_alignment
+        logging.info(f"多岗位评估已写入工作表 '{sheet_name}' (新增 {len(rows)} 行)")
+
+    INDEX_SUFFIX = '.index.json'
+    INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+    @staticmethod
+    def _index_path(output_path: str) -> str:
+        return output_path + ExcelGenerator.INDEX_SUFFIX
+
+    @staticmethod
+    def _load_index(output_path: str) -> Optional[Dict]:
+        """读取报表旁的索引文件；报表在索引写入后被外部修改过则视为失效"""
+        index_path = ExcelGenerator._index_path(output_path)
+        if not os.path.exists(index_path) or not os.path.exists(output_path):
+            return None
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            stat = os.stat(output_path)
+            if index.get('file_size') != stat.st_size or index.get('file_mtime') != stat.st_mtime:
+                logging.info(f"报表索引已失效，将重新扫描工作表: {output_path}")
+                return None
+            return index
+        except Exception as e:
+            logging.warning(f"读取报表索引失败: {index_path} - {str(e)}")
+            return None
+
+    @staticmethod
+    def _write_index(output_path: str, sheet_rows: Dict[str, int], last_files: List[str]):
+        """写入索引：各工作表数据行数与最近处理的文件，追加时无需扫描工作表"""
+        stat = os.stat(output_path)
+        index = {
+            'file_size': stat.st_size,
+            'file_mtime': stat.st_mtime,
+            'sheets': {name: {'rows': rows} for name, rows in sheet_rows.items()},
+            'last_processed_files': last_files[-50:],
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        index_path = ExcelGenerator._index_path(output_path)
+        temp_path = index_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, index_path)
+
+    @staticmethod
+    def _styles() -> Dict[str, Any]:
+        return {
+            'content_alignment': Alignment(horizontal='left', vertical='center', wrap_text=True),
+            'header_fill': PatternFill(start_color='CCE5FF', end_color='CCE5FF', fill_type='solid'),
+            'header_font': Font(bold=True),
+            'header_alignment': Alignment(horizontal='center', vertical='center', wrap_text=True)
+        }
+
+    @staticmethod
+    def _write_sheet(worksheet, results: List[Dict], styles: Dict[str, Any]):
+        """将一组结果完整写入空工作表（表头、数据、列宽、冻结窗格）"""
+        headers = [clean_col for _, clean_col in ExcelGenerator.STANDARD_COLUMNS]
+        for col_idx, header in enumerate(headers, start=1):
+            cell = worksheet.cell(row=1, column=col_idx)
+            cell.value = header
+            cell.fill = styles['header_fill']
+            cell.font = styles['header_font']
+            cell.alignment = styles['header_alignment']
+        max_lengths = [len(header) for header in headers]
+        for row_idx, result in enumerate(results, start=2):
+            for col_idx, header in enumerate(headers, start=1):
+                value = str(result.get(header, '') or '')
+                cell = worksheet.cell(row=row_idx, column=col_idx)
+                cell.value = value
+                cell.alignment = styles['content_alignment']
+                max_lengths[col_idx - 1] = max(max_lengths[col_idx - 1], len(value))
+        for col_idx, max_length in enumerate(max_lengths, start=1):
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = max(10, min(max_length * 2.5, 100))
+        worksheet.freeze_panes = 'B2'
+
+    @staticmethod
+    def _deduplicate(results: Iterable[Dict]) -> List[Dict]:
+        """按(姓名, 应聘岗位)去重，保留最后处理的一条；无姓名时按文件名去重"""
+        latest = {}
+        for result in results:
+            name = result.get('姓名', '')
+            key = (name, result.get('应聘岗位', '')) if name else ('', result.get('文件名', ''))
+            latest.pop(key, None)
+            latest[key] = result
+        return list(latest.values())
+
+    @staticmethod
+    def _sheet_title(name: str, used: set) -> str:
+        title = ExcelGenerator.INVALID_SHEET_CHARS.sub('', name).strip()[:31] or '未分类'
+        base, counter = title, 1
+        while title in used:
+            suffix = f"_{counter}"
+            title = base[:31 - len(suffix)] + suffix
+            counter += 1
+        used.add(title)
+        return title
+
+    @staticmethod
+    def _save_workbook_atomic(workbook, output_path: str):
+        temp_path = os.path.join(os.path.dirname(output_path) or '.', f".~{os.path.basename(output_path)}")
+        workbook.save(temp_path)
+        os.replace(temp_path, output_path)
+
+    @staticmethod
+    def _existing_rows(output_path: str) -> List[Dict]:
+        """读取现有报表中各标准表头工作表的数据行（只读模式）；报表不存在时返回空列表"""
+        if not os.path.exists(output_path):
+            return []
+        headers = [clean_col for _, clean_col in ExcelGenerator.STANDARD_COLUMNS]
+        rows = []
+        workbook = openpyxl.load_workbook(output_path, read_only=True)
+        try:
+            for worksheet in workbook.worksheets:
+                values = worksheet.iter_rows(values_only=True)
+                header_row = list(next(values, None) or [])
+                if header_row[:len(headers)] != headers:
+                    continue
+                for row in values:
+                    if any(value not in (None, '') for value in row[:len(headers)]):
+                        rows.append({header: '' if value is None else str(value)
+                                     for header, value in zip(headers, row)})
+        finally:
+            workbook.close()
+        logging.info(f"读取现有报表行 {len(rows)} 条: {output_path}")
+        return rows
+
+    @staticmethod
+    def compact(results: Iterable[Dict], output_path: str, split_by: str = 'none') -> List[str]:
+        """从结果库重建报表并去重；现有报表中结果库没有的行（结果库建立前写入的）一并保留。
+
+        split_by='none' 原子替换 output_path 为单表报表；'position' 生成按岗位分表的
+        <名称>_按岗位.xlsx；'month' 按处理月份生成 <名称>_YYYY-MM.xlsx。
+        每个输出文件都会写入索引。返回生成的文件路径列表。
+        """
+        if split_by not in ('none', 'position', 'month'):
+            raise ValueError(f"不支持的拆分方式: {split_by}")
+        # 结果库建立之前写入报表的行只存在于工作簿中，先并入再去重（结果库中的同一候选人优先）
+        rows = ExcelGenerator._deduplicate(itertools.chain(ExcelGenerator._existing_rows(output_path), results))
+        styles = ExcelGenerator._styles()
+        stem, ext = os.path.splitext(output_path)
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        last_files = [row.get('文件名', '') for row in rows]
+        written = []
+
+        if split_by == 'month':
+            groups = {}
+            for row in rows:
+                groups.setdefault(str(row.get('处理时间', ''))[:7] or '未知', []).append(row)
+            for month, month_rows in sorted(groups.items()):
+                path = f"{stem}_{month}{ext}"
+                workbook = openpyxl.Workbook()
+                worksheet = workbook.active
+                worksheet.title = '简历信息'
+                ExcelGenerator._write_sheet(worksheet, month_rows, styles)
+                ExcelGenerator._save_workbook_atomic(workbook, path)
+                ExcelGenerator._write_index(path, {'简历信息': len(month_rows)},
+                                            [row.get('文件名', '') for row in month_rows])
+                written.append(path)
+        else:
+            workbook = openpyxl.Workbook()
+            if split_by == 'position':
+                path = f"{stem}_按岗位{ext}"
+                groups = {}
+                for row in rows:
+                    groups.setdefault(row.get('应聘岗位', '') or '未分类', []).append(row)
+                workbook.remove(workbook.active)
+                used, sheet_rows = set(), {}
+                for position, position_rows in sorted(groups.items()):
+                    title = ExcelGenerator._sheet_title(position, used)
+                    ExcelGenerator._write_sheet(workbook.create_sheet(title), position_rows, styles)
+                    sheet_rows[title] = len(position_rows)
+            else:
+                path = output_path
+                worksheet = workbook.active
+                worksheet.title = '简历信息'
+                ExcelGenerator._write_sheet(worksheet, rows, styles)
+                sheet_rows = {'简历信息': len(rows)}
+            ExcelGenerator._append_multi_position_sheet(
+                workbook, rows,
+                {'fill': styles['header_fill'], 'font': styles['header_font'], 'alignment': styles['header_alignment']},
+                styles['content_alignment']
+            )
+            ExcelGenerator._save_workbook_atomic(workbook, path)
+            ExcelGenerator._write_index(path, sheet_rows, last_files)
+            written.append(path)
+
+        logging.info(f"报表重建完成 ({split_by}): 去重后 {len(rows)} 条, 输出 {written}")
+        return written
+
+    RANKING_COLUMNS = ['排名', '姓名', '综合评分', '学历评分', '经验评分', '技能评分', '评估结论', '处理时间', '文件名']
+    RANKING_SUFFIX = '_岗位排行'
+
+    @staticmethod
+    def ranking_path(output_path: str) -> str:
+        stem, ext = os.path.splitext(output_path)
+        return f"{stem}{ExcelGenerator.RANKING_SUFFIX}{ext}"
+
+    @staticmethod
+    def generate_rankings(leaderboards: Dict[str, List], output_path: str) -> str:
+        """将各岗位排行榜写入排名工作簿（每个岗位一个工作表，按综合评分降序），原子替换 output_path"""
+        styles = ExcelGenerator._styles()
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        workbook = openpyxl.Workbook()
+        workbook.remove(workbook.active)
+        used = set()
+        for position, rows in sorted(leaderboards.items()):
+            if rows:
+                ExcelGenerator._write_ranking_sheet(
+                    workbook.create_sheet(ExcelGenerator._sheet_title(position, used)), rows, styles)
+        if not workbook.sheetnames:
+            ExcelGenerator._write_ranking_sheet(workbook.create_sheet('岗位排行'), [], styles)
+        ExcelGenerator._save_workbook_atomic(workbook, output_path)
+        logging.info(f"岗位排行已导出: {output_path} ({len(used)} 个岗位)")
+        return output_path
+
+    @staticmethod
+    def _write_ranking_sheet(worksheet, rows: List, styles: Dict[str, Any]):
+        for col_idx, header in enumerate(ExcelGenerator.RANKING_COLUMNS, start=1):
+            cell = worksheet.cell(row=1, column=col_idx)
+            cell.value = header
+            cell.fill = styles['header_fill']
+            cell.font = styles['header_font']
+            cell.alignment = styles['header_alignment']
+        for rank, row in enumerate(rows, start=1):
+            values = [rank, row['name'] or '', row['score'], row['education'], row['experience'], row['skills'],
+                      row['verdict'] or '', row['processed_at'] or '', row['filename'] or '']
+            for col_idx, value in enumerate(values, start=1):
+                cell = worksheet.cell(row=rank + 1, column=col_idx)
+                cell.value = value
+                cell.alignment = styles['content_alignment']
+        for col_idx, width in enumerate([6, 12, 10, 10, 10, 10, 60, 18, 30], start=1):
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = width
+        worksheet.freeze_panes = 'C2'
+
+    @staticmethod
+    def update_rows(output_path: str, updates: Dict[str, Dict]) -> int:
+        """按文件名原位更新报表中已有行的评估结论（含多岗位评估工作表），返回更新的行数"""
+        if not updates or not os.path.exists(output_path):
+            return 0
+        headers = [clean_col for _, clean_col in ExcelGenerator.STANDARD_COLUMNS]
+        file_col, conclusion_col = headers.index('文件名'), headers.index('评估结论')
+        last_files = (ExcelGenerator._load_index(output_path) or {}).get('last_processed_files', [])
+        workbook = openpyxl.load_workbook(output_path)
+        updated = 0
+        sheet_rows = {}
+        for worksheet in workbook.worksheets:
+            header_row = [cell.value for cell in worksheet[1]]
+            if worksheet.title == '多岗位评估' and header_row[:len(ExcelGenerator.MULTI_POSITION_COLUMNS)] == \
+                    ExcelGenerator.MULTI_POSITION_COLUMNS:
+                for row in worksheet.iter_rows(min_row=2):
+                    result = updates.get(row[1].value)
+                    item = next((item for item in (result or {}).get('多岗位评估', [])
+                                 if item['岗位'] == row[2].value), None)
+                    if item is not None and row[4].value != item['评估结论']:
+                        row[4].value = item['评估结论']
+                        updated += 1
+                continue
+            if header_row[:len(headers)] != headers:
+                continue
+            sheet_rows[worksheet.title] = worksheet.max_row - 1
+            for row in worksheet.iter_rows(min_row=2):
+                result = updates.get(row[file_col].value)
+                if result is not None:
+                    row[conclusion_col].value = str(result.get('评估结论', ''))
+                    updated += 1
+        ExcelGenerator._save_workbook_atomic(workbook, output_path)
+        ExcelGenerator._write_index(output_path, sheet_rows, last_files)
+        logging.info(f"报表原位更新完成: {output_path} (更新 {updated} 行)")
+        return updated
+
     @staticmethod
     def generate(results: List[Dict], output_path: str) -> str:
         """追加结果到现有Excel文件或创建新文件"""
@@ -906,91 +3587,1838 @@ class ExcelGenerator:
                 logging.error(f"无效的Excel文件路径: {output_path} - 必须是.xlsx, .xlsm, .xltx或.xltm格式")
                 raise ValueError("输出Excel文件路径无效，必须是.xlsx格式")
 
-            # 确保输出目录存在
-            output_dir = os.path.dirname(output_path)
-            os.makedirs(output_dir, exist_ok=True)
+            # 确保输出目录存在
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+
+            # 准备数据
+            for result in results:
+                if '评估结论' not in result or not result['评估结论']:
+                    logging.warning(f"结果中缺失或空的评估结论: {result.get('文件名', '未知文件')}")
+
+            df = pd.DataFrame(results)
+            ordered_columns = [clean_col for _, clean_col in ExcelGenerator.STANDARD_COLUMNS]
+            df = df.reindex(columns=ordered_columns)
+            df.fillna('', inplace=True)
+
+            # Excel格式设置
+            min_width = 10
+            content_alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
+            header_fill = PatternFill(start_color='CCE5FF', end_color='CCE5FF', fill_type='solid')
+            header_font = Font(bold=True)
+            header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+
+            sheet_name = '简历信息'
+            expected_headers = ordered_columns
+
+            # 有效索引记录了工作表行数，无需再校验表头和扫描工作表
+            index = ExcelGenerator._load_index(output_path)
+            indexed_rows = (index or {}).get('sheets', {}).get(sheet_name, {}).get('rows')
+
+            # 检查文件是否存在
+            if os.path.exists(output_path):
+                try:
+                    # 加载现有Excel
+                    workbook = openpyxl.load_workbook(output_path)
+                    if sheet_name in workbook.sheetnames:
+                        worksheet = workbook[sheet_name]
+                        # 验证表头
+                        if indexed_rows is None and not ExcelGenerator._validate_excel_headers(worksheet, expected_headers):
+                            logging.error(f"Excel文件表头不匹配: {output_path}")
+                            raise ValueError(f"Excel文件 '{output_path}' 的表头与预期不匹配")
+                    else:
+                        # 创建新工作表
+                        worksheet = workbook.create_sheet(sheet_name)
+                        indexed_rows = 0
+                except Exception as e:
+                    logging.error(f"加载Excel文件失败: {output_path} - {str(e)}")
+                    raise
+            else:
+                # 创建新Excel
+                workbook = openpyxl.Workbook()
+                worksheet = workbook.active
+                worksheet.title = sheet_name
+                indexed_rows = 0
+
+            # 写入表头（仅在新文件或新工作表时）
+            if indexed_rows == 0 or (indexed_rows is None and worksheet.max_row == 1 and not worksheet['A1'].value):
+                for col_idx, header in enumerate(expected_headers, start=1):
+                    cell = worksheet.cell(row=1, column=col_idx)
+                    cell.value = header
+                    cell.fill = header_fill
+                    cell.font = header_font
+                    cell.alignment = header_alignment
+
+            # 追加数据
+            if indexed_rows is not None:
+                start_row = indexed_rows + 2
+            else:
+                start_row = worksheet.max_row + 1 if worksheet.max_row > 1 else 2
+            for row_idx, row_data in enumerate(df.values, start=start_row):
+                for col_idx, value in enumerate(row_data, start=1):
+                    cell = worksheet.cell(row=row_idx, column=col_idx)
+                    cell.value = str(value)
+                    cell.alignment = content_alignment
+
+            # 调整列宽
+            for col_idx, column in enumerate(df.columns, start=1):
+                max_length = max(
+                    df[column].astype(str).str.len().max(),
+                    len(str(column))
+                )
+                adjusted_width = max(min_width, min(max_length * 2.5, 100))
+                col_letter = get_column_letter(col_idx)
+                worksheet.column_dimensions[col_letter].width = adjusted_width
+
+            # 设置冻结窗格
+            worksheet.freeze_panes = 'B2'
+
+            # 多岗位评估明细
+            ExcelGenerator._append_multi_position_sheet(
+                workbook, results,
+                {'fill': header_fill, 'font': header_font, 'alignment': header_alignment},
+                content_alignment
+            )
+
+            # 保存文件并更新索引
+            workbook.save(output_path)
+            last_files = (index or {}).get('last_processed_files', []) + [str(r.get('文件名', '')) for r in results]
+            ExcelGenerator._write_index(output_path, {sheet_name: start_row - 2 + len(df)}, last_files)
+            logging.info(f"成功追加数据到Excel: {output_path} (新增 {len(results)} 行)")
+            return output_path
+
+        except Exception as e:
+            logging.error(f"生成或追加Excel失败: {str(e)}", exc_info=True)
+            raise
+
+class OutputWriter(ABC):
+    """输出写入器基类：所有格式共用 ExcelGenerator.STANDARD_COLUMNS 列定义"""
+    format_name = ''
+    extension = ''
+
+    def __init__(self, output_excel: str, config: Optional[ConfigManager] = None):
+        self.base_path = os.path.splitext(output_excel)[0]
+        self.config = config
+
+    @staticmethod
+    def columns() -> List[str]:
+        return [clean_col for _, clean_col in ExcelGenerator.STANDARD_COLUMNS]
+
+    def _ensure_dir(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @abstractmethod
+    def write(self, results: List[Dict]) -> str:
+        raise NotImplementedError
+
+class ExcelOutputWriter(OutputWriter):
+    format_name = 'xlsx'
+
+    def __init__(self, output_excel: str, config: Optional[ConfigManager] = None):
+        super().__init__(output_excel, config)
+        self.output_excel = output_excel
+
+    def write(self, results: List[Dict]) -> str:
+        return ExcelGenerator.generate(results, self.output_excel)
+
+class JsonlOutputWriter(OutputWriter):
+    """JSON Lines：每行一个候选人，追加写入，保留评分、多岗位评估与结构化信息"""
+    format_name = 'jsonl'
+    extension = '.jsonl'
+
+    def write(self, results: List[Dict]) -> str:
+        path = self.base_path + self.extension
+        self._ensure_dir(path)
+        columns = self.columns()
+        with open(path, 'a', encoding='utf-8') as f:
+            for result in results:
+                record = {column: result.get(column, '') for column in columns}
+                for extra in ('综合评分', '学历评分', '经验评分', '技能评分', '多岗位评估', '结构化信息'):
+                    if extra in result:
+                        record[extra] = result[extra]
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        logging.info(f"成功追加JSONL: {path} (新增 {len(results)} 行)")
+        return path
+
+class CsvOutputWriter(OutputWriter):
+    """分块CSV：追加到最新分块文件，超过大小上限时开启新分块（utf-8-sig 便于Excel打开）"""
+    format_name = 'csv'
+    extension = '.csv'
+
+    def _chunk_limit(self) -> int:
+        try:
+            megabytes = int(self.config.get('OUTPUT', 'csv_chunk_mb') or 64) if self.config else 64
+        except ValueError:
+            megabytes = 64
+        return max(1, megabytes) * 1024 * 1024
+
+    def _chunk_path(self, index: int) -> str:
+        return f"{self.base_path}_part{index:04d}{self.extension}"
+
+    def write(self, results: List[Dict]) -> str:
+        limit = self._chunk_limit()
+        index = 1
+        while os.path.exists(self._chunk_path(index + 1)):
+            index += 1
+        path = self._chunk_path(index)
+        if os.path.exists(path) and os.path.getsize(path) >= limit:
+            index += 1
+            path = self._chunk_path(index)
+        self._ensure_dir(path)
+
+        columns = self.columns()
+        written = 0
+        while written < len(results):
+            is_new = not os.path.exists(path)
+            with open(path, 'a', encoding='utf-8-sig' if is_new else 'utf-8', newline='') as f:
+                writer = csv.writer(f)
+                if is_new:
+                    writer.writerow(columns)
+                while written < len(results):
+                    writer.writerow([str(results[written].get(column, '') or '') for column in columns])
+                    written += 1
+                    if f.tell() >= limit:
+                        break
+            if written < len(results):
+                index += 1
+                path = self._chunk_path(index)
+        logging.info(f"成功追加CSV: {path} (新增 {len(results)} 行)")
+        return path
+
+class ParquetOutputWriter(OutputWriter):
+    """Parquet：每次写入一个分片文件到数据集目录；工作经历、项目经验、技能保留为列表列"""
+    format_name = 'parquet'
+    extension = '.parquet'
+
+    NESTED_COLUMNS = ('工作经历', '项目经验', '技能及优势')
+
+    @staticmethod
+    def _schema():
+        work_type = pa.struct([(slot, pa.string()) for slot in WorkItem.__slots__])
+        project_type = pa.struct([(slot, pa.string()) for slot in ProjectItem.__slots__])
+        skill_type = pa.struct([('skill', pa.string()), ('proficiency', pa.string())])
+        fields = []
+        for column in OutputWriter.columns():
+            if column == '工作经历':
+                fields.append(pa.field(column, pa.list_(work_type)))
+            elif column == '项目经验':
+                fields.append(pa.field(column, pa.list_(project_type)))
+            elif column == '技能及优势':
+                fields.append(pa.field(column, pa.list_(skill_type)))
+            else:
+                fields.append(pa.field(column, pa.string()))
+        return pa.schema(fields)
+
+    @staticmethod
+    def _nested_values(result: Dict) -> Dict[str, List]:
+        info = result.get('结构化信息') or {}
+        skills = info.get('skills_and_strengths', {})
+        proficiency = skills.get('proficiency', {})
+        return {
+            '工作经历': info.get('experience', {}).get('work_history', []),
+            '项目经验': info.get('projects', {}).get('project_history', []),
+            '技能及优势': [{'skill': skill, 'proficiency': proficiency.get(skill, '')}
+                       for skill in skills.get('list', [])]
+        }
+
+    def write(self, results: List[Dict]) -> str:
+        if pa is None:
+            raise RuntimeError("未安装pyarrow，无法输出Parquet格式")
+        dataset_dir = self.base_path + '_parquet'
+        os.makedirs(dataset_dir, exist_ok=True)
+        columns = {column: [] for column in self.columns()}
+        for result in results:
+            nested = self._nested_values(result)
+            for column in columns:
+                if column in self.NESTED_COLUMNS:
+                    columns[column].append(nested[column])
+                else:
+                    columns[column].append(str(result.get(column, '') or ''))
+        table = pa.table(columns, schema=self._schema())
+        # 同一秒内多次写入（如汇总端连续写出多批）不得互相覆盖，文件名附加随机后缀
+        path = os.path.join(dataset_dir, f"part-{datetime.now().strftime('%Y%m%d%H%M%S')}-{os.getpid()}-"
+                                         f"{uuid.uuid4().hex[:8]}.parquet")
+        temp_path = path + '.tmp'
+        pq.write_table(table, temp_path, compression='zstd')
+        os.replace(temp_path, path)
+        logging.info(f"成功写入Parquet分片: {path} ({len(results)} 行)")
+        return path
+
+OUTPUT_WRITERS = {
+    writer.format_name: writer
+    for writer in (ExcelOutputWriter, JsonlOutputWriter, CsvOutputWriter, ParquetOutputWriter)
+}
+
+def write_outputs(results: List[Dict], output_excel: str, formats: List[str],
+                  config: Optional[ConfigManager] = None) -> Dict[str, str]:
+    """按配置的格式写出结果；Excel失败时抛出异常，其他格式失败仅记录日志"""
+    written = {}
+    for format_name in ['xlsx'] + [f for f in formats if f != 'xlsx']:
+        writer_cls = OUTPUT_WRITERS.get(format_name)
+        if writer_cls is None:
+            logging.warning(f"未知的输出格式: {format_name}")
+            continue
+        try:
+            written[format_name] = writer_cls(output_excel, config).write(results)
+        except Exception as e:
+            if format_name == 'xlsx':
+                raise
+            logging.error(f"写出 {format_name} 格式失败: {str(e)}")
+    return written
+
+def _file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """分块计算文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+ARCHIVE_MEMBER_SEPARATOR = '::'
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+
+def split_archive_member(path: str) -> Tuple[str, Optional[str]]:
+    """拆分压缩包成员路径 “导出.zip::目录/简历.pdf”；普通文件返回 (路径, None)"""
+    marker = '.zip' + ARCHIVE_MEMBER_SEPARATOR
+    index = path.lower().find(marker)
+    if index < 0:
+        return path, None
+    return path[:index + 4], path[index + len(marker):]
+
+def is_archive_member(path: str) -> bool:
+    return split_archive_member(path)[1] is not None
+
+def _read_zip_member(archive: zipfile.ZipFile, member: str, max_bytes: int,
+                     chunk_size: int = 1024 * 1024, digest=None) -> Optional[bytes]:
+    """分块解压读取成员，超过 max_bytes 时放弃（不信任目录中声明的大小，防止压缩炸弹）；
+    传入 digest 时只计算哈希，不在内存中保留内容"""
+    buffer = None if digest is not None else bytearray()
+    total = 0
+    with archive.open(member) as stream:
+        for chunk in iter(lambda: stream.read(chunk_size), b''):
+            total += len(chunk)
+            if total > max_bytes:
+                logging.warning(f"压缩包成员超过大小上限 {max_bytes // (1024 * 1024)} MB，已跳过: {member}")
+                return None
+            if digest is not None:
+                digest.update(chunk)
+            else:
+                buffer.extend(chunk)
+    return bytes(buffer) if buffer is not None else b''
+
+class ResumeEntry:
+    """一份待处理简历（磁盘文件或压缩包成员）；st_size/st_mtime 与 os.stat_result 同名，可直接作为文件状态使用"""
+    __slots__ = ('path', 'filename', 'st_size', 'st_mtime')
+
+    def __init__(self, path: str, filename: str, st_size: int, st_mtime: float):
+        self.path = path
+        self.filename = filename
+        self.st_size = st_size
+        self.st_mtime = st_mtime
+
+class ResumeSource:
+    """简历来源：简历目录下的PDF/DOCX文件，以及招聘平台批量导出的ZIP压缩包。
+
+    压缩包不解压到磁盘：成员以 “压缩包路径::成员名” 作为路径在流水线中传递，
+    解析进程按需把单个成员读入内存（受 max_member_mb 限制）。成员的内容哈希用于去重
+    和结果库缓存，已处理的成员按 (文件名, 大小, 修改时间) 命中清单，无需再次解压。
+    """
+
+    def __init__(self, resume_dir: str, read_archives: bool = True, max_member_mb: float = 50):
+        self.resume_dir = resume_dir
+        self.read_archives = read_archives
+        self.max_member_bytes = int(max_member_mb * 1024 * 1024)
+        self._archive = None
+
+    @classmethod
+    def from_config(cls, config: ConfigManager, resume_dir: str) -> 'ResumeSource':
+        read_archives = (config.get('PARSING', 'archives') or 'true').lower() in ('1', 'true', 'yes', 'on')
+        try:
+            max_member_mb = float(config.get('PARSING', 'max_member_mb') or 50)
+        except ValueError:
+            logging.warning("max_member_mb 配置无效，使用默认值")
+            max_member_mb = 50
+        return cls(resume_dir, read_archives, max_member_mb)
+
+    @staticmethod
+    def member_filename(info: zipfile.ZipInfo) -> str:
+        """成员文件名；未设置UTF-8标志的中文文件名按GBK还原（Windows压缩工具的默认编码）"""
+        name = info.filename
+        if not info.flag_bits & 0x800:
+            try:
+                name = name.encode('cp437').decode('gbk')
+            except (UnicodeEncodeError, UnicodeDecodeError):
+                pass
+        return os.path.basename(name.rstrip('/'))
+
+    def entries(self) -> List[ResumeEntry]:
+        entries = []
+        for name in sorted(os.listdir(self.resume_dir)):
+            path = os.path.join(self.resume_dir, name)
+            lower = name.lower()
+            try:
+                if lower.endswith(RESUME_EXTENSIONS):
+                    file_stat = os.stat(path)
+                    entries.append(ResumeEntry(path, name, file_stat.st_size, file_stat.st_mtime))
+                elif lower.endswith('.zip') and self.read_archives:
+                    entries.extend(self._archive_entries(path))
+            except (OSError, zipfile.BadZipFile) as e:
+                logging.error(f"读取简历失败: {name} - {str(e)}")
+        return entries
+
+    def _archive_entries(self, archive_path: str) -> List[ResumeEntry]:
+        entries = []
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                filename = self.member_filename(info)
+                if info.is_dir() or filename.startswith('._') or '__MACOSX/' in info.filename:
+                    continue
+                if not filename.lower().endswith(RESUME_EXTENSIONS):
+                    continue
+                if info.file_size > self.max_member_bytes:
+                    logging.warning(f"压缩包成员超过大小上限，已跳过: {os.path.basename(archive_path)} - {filename}")
+                    continue
+                entries.append(ResumeEntry(
+                    archive_path + ARCHIVE_MEMBER_SEPARATOR + info.filename, filename, info.file_size,
+                    time.mktime(info.date_time + (0, 0, -1))
+                ))
+        return entries
+
+    def content_hash(self, entry: ResumeEntry) -> Optional[str]:
+        """内容哈希；压缩包成员流式解压计算，不在内存中保留内容（超过大小上限时返回None）"""
+        archive_path, member = split_archive_member(entry.path)
+        if member is None:
+            return _file_sha256(entry.path)
+        if self._archive is None or self._archive.filename != archive_path:
+            self.close()
+            self._archive = zipfile.ZipFile(archive_path)
+        digest = hashlib.sha256()
+        if _read_zip_member(self._archive, member, self.max_member_bytes, digest=digest) is None:
+            return None
+        return digest.hexdigest()
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+def relocate_resume_path(source_path: str, resume_dir: str) -> str:
+    """把汇总端记录的简历路径换到本机的简历目录下（压缩包成员保留成员名）"""
+    archive_path, member = split_archive_member(source_path)
+    local_path = os.path.join(resume_dir, os.path.basename(archive_path.replace('\\', '/')))
+    return local_path + ARCHIVE_MEMBER_SEPARATOR + member if member is not None else local_path
+
+class ResultStore:
+    """本地结果库（SQLite）：记录每份简历的内容哈希、处理结果、输出行及归档位置"""
+    DEFAULT_FILENAME = 'recruitment_store.db'
+
+    OUTCOME_SUCCESS = 'success'
+    OUTCOME_EMPTY = 'empty'
+    OUTCOME_FAILED = 'failed'
+    # 解析时超时、内存超限或崩溃而被隔离；内容未变时不再重试（压缩包成员无法移出简历目录，每次都会被扫描到）
+    OUTCOME_QUARANTINED = 'quarantined'
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=FULL')
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS manifest (
+                    content_hash TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    source_path TEXT,
+                    file_size INTEGER,
+                    file_mtime REAL,
+                    outcome TEXT NOT NULL,
+                    result_json TEXT,
+                    reported INTEGER NOT NULL DEFAULT 0,
+                    archived_path TEXT,
+                    processed_at TEXT NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_manifest_stat ON manifest(filename, file_size, file_mtime)"
+            )
+            # 结果浏览用的冗余列：排序和过滤直接走索引，无需逐行解析 result_json
+            columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(manifest)")}
+            added = [column for column in ('name', 'position', 'verdict') if column not in columns]
+            for column in added:
+                self.conn.execute(f"ALTER TABLE manifest ADD COLUMN {column} TEXT")
+            if added:
+                self.conn.execute("""
+                    UPDATE manifest SET name = json_extract(result_json, '$.姓名'),
+                                        position = json_extract(result_json, '$.应聘岗位'),
+                                        verdict = json_extract(result_json, '$.评估结论')
+                    WHERE result_json IS NOT NULL
+                """)
+            # 默认视图（按处理时间）的覆盖索引：过滤列在索引内，无需读取含 result_json 的整行
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_manifest_time ON manifest(outcome, processed_at, position, verdict)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_manifest_position ON manifest(outcome, position, processed_at)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_manifest_name ON manifest(outcome, name)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_manifest_verdict ON manifest(outcome, verdict)")
+            # 岗位排行榜：每个候选人-岗位评分一行，(岗位, 评分) 索引即有序结构，
+            # 每份简历入库时增量维护，查询某岗位前N名只需沿索引读取N行
+            scores_exist = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'position_scores'").fetchone()
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS position_scores (
+                    content_hash TEXT NOT NULL,
+                    position TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    education INTEGER,
+                    experience INTEGER,
+                    skills INTEGER,
+                    name TEXT,
+                    verdict TEXT,
+                    filename TEXT,
+                    processed_at TEXT,
+                    PRIMARY KEY (content_hash, position)
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_position_scores_rank ON position_scores(position, score, processed_at)"
+            )
+            if not scores_exist:
+                # 旧结果库：从已有结果（多岗位评估的匹配度评分）回填排行榜
+                rows = self.conn.execute(
+                    "SELECT content_hash, filename, processed_at, result_json FROM manifest "
+                    "WHERE outcome = ? AND result_json IS NOT NULL", (self.OUTCOME_SUCCESS,)
+                ).fetchall()
+                for row in rows:
+                    self._write_scores(row['content_hash'], json.loads(row['result_json']),
+                                       row['filename'], row['processed_at'])
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_descriptions (
+                    version TEXT PRIMARY KEY,
+                    jd_name TEXT NOT NULL,
+                    position TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    @staticmethod
+    def _score_rows(result: Dict) -> List[Tuple]:
+        """结果行中的岗位评分：评估岗位取综合评分，多岗位评估的其余岗位取匹配度评分"""
+        rows = {}
+        position = result.get('应聘岗位')
+        if position and result.get('综合评分') is not None:
+            rows[position] = (position, result['综合评分'], result.get('学历评分'), result.get('经验评分'),
+                              result.get('技能评分'), result.get('评估结论'))
+        for item in result.get('多岗位评估', []):
+            if item.get('岗位') and item.get('岗位') not in rows and item.get('匹配度评分') is not None:
+                rows[item['岗位']] = (item['岗位'], item['匹配度评分'], item.get('学历评分'), item.get('经验评分'),
+                                    item.get('技能评分'), item.get('评估结论'))
+        return list(rows.values())
+
+    def _write_scores(self, content_hash: str, result: Dict, filename: str, processed_at: str):
+        """替换该简历在排行榜中的全部评分（调用方持有锁并处于事务中）"""
+        self.conn.execute("DELETE FROM position_scores WHERE content_hash = ?", (content_hash,))
+        self.conn.executemany(
+            "INSERT INTO position_scores (content_hash, position, score, education, experience, skills, name, "
+            "verdict, filename, processed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(content_hash, position, score, education, experience, skills, result.get('姓名'), verdict,
+              filename, processed_at)
+             for position, score, education, experience, skills, verdict in self._score_rows(result)]
+        )
+
+    def find_by_stat(self, filename: str, file_size: int, file_mtime: float) -> Optional[sqlite3.Row]:
+        """按文件名、大小和修改时间查找记录，命中时无需重新读取文件"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT * FROM manifest WHERE filename = ? AND file_size = ? AND file_mtime = ?",
+                (filename, file_size, file_mtime)
+            ).fetchone()
+
+    def get(self, content_hash: str) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self.conn.execute("SELECT * FROM manifest WHERE content_hash = ?", (content_hash,)).fetchone()
+
+    def record(self, content_hash: str, filename: str, source_path: str, file_size: int, file_mtime: float,
+               outcome: str, result: Optional[Dict] = None):
+        """写入处理结果，事务提交后才视为已持久化"""
+        result = result or {}
+        processed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock, self.conn:
+            self.conn.execute("""
+                INSERT INTO manifest (content_hash, filename, source_path, file_size, file_mtime, outcome,
+                                      result_json, reported, archived_path, processed_at, name, position, verdict)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0, NULL, ?, ?, ?, ?)
+                ON CONFLICT(content_hash) DO UPDATE SET
+                    filename = excluded.filename, source_path = excluded.source_path,
+                    file_size = excluded.file_size, file_mtime = excluded.file_mtime,
+                    outcome = excluded.outcome, result_json = excluded.result_json,
+                    reported = 0, processed_at = excluded.processed_at,
+                    name = excluded.name, position = excluded.position, verdict = excluded.verdict
+            """, (content_hash, filename, source_path, file_size, file_mtime, outcome,
+                  json.dumps(result, ensure_ascii=False) if result else None, processed_at,
+                  result.get('姓名'), result.get('应聘岗位'), result.get('评估结论')))
+            self._write_scores(content_hash, result if outcome == self.OUTCOME_SUCCESS else {},
+                               filename, processed_at)
+
+    def mark_reported(self, content_hashes: List[str]):
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE manifest SET reported = 1 WHERE content_hash = ?",
+                                  [(h,) for h in content_hashes])
+
+    def unreported_results(self, content_hashes: Iterable[str]) -> List[Dict]:
+        """返回已成功处理但尚未写入报表的结果（例如上次运行在写报表前中断）"""
+        results = []
+        for content_hash in content_hashes:
+            row = self.get(content_hash)
+            if row and row['outcome'] == self.OUTCOME_SUCCESS and not row['reported'] and row['result_json']:
+                results.append(json.loads(row['result_json']))
+        return results
+
+    def iter_results(self) -> Iterator[Dict]:
+        """按处理时间顺序产出所有成功处理的结果行"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT result_json FROM manifest WHERE outcome = ? AND result_json IS NOT NULL ORDER BY processed_at",
+                (self.OUTCOME_SUCCESS,)
+            ).fetchall()
+        for row in rows:
+            yield json.loads(row['result_json'])
+
+    def iter_result_rows(self) -> Iterator[Tuple[str, Dict]]:
+        """产出所有成功处理的 (内容哈希, 结果行)"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT content_hash, result_json FROM manifest WHERE outcome = ? AND result_json IS NOT NULL "
+                "ORDER BY processed_at", (self.OUTCOME_SUCCESS,)
+            ).fetchall()
+        for row in rows:
+            yield row['content_hash'], json.loads(row['result_json'])
+
+    def update_result(self, content_hash: str, result: Dict):
+        """更新已有结果行（重新评估），不改变报表和归档状态"""
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE manifest SET result_json = ?, verdict = ? WHERE content_hash = ?",
+                              (json.dumps(result, ensure_ascii=False), result.get('评估结论'), content_hash))
+            row = self.conn.execute("SELECT filename, processed_at FROM manifest WHERE content_hash = ?",
+                                    (content_hash,)).fetchone()
+            if row is not None:
+                self._write_scores(content_hash, result, row['filename'], row['processed_at'])
+
+    def top_candidates(self, position: str, limit: int = 20) -> List[sqlite3.Row]:
+        """某岗位评分最高的前 limit 名（同分时较新的在前），沿排行榜索引逆序读取，不做额外排序。
+
+        每份简历（内容哈希）一行；重复内容已在入库时按哈希去除，同名候选人视为不同的人。
+        """
+        with self._lock:
+            return self.conn.execute(
+                "SELECT content_hash, position, score, education, experience, skills, name, verdict, filename, "
+                "processed_at FROM position_scores WHERE position = ? ORDER BY score DESC, processed_at DESC LIMIT ?",
+                (position, limit)
+            ).fetchall()
+
+    def ranked_positions(self) -> List[str]:
+        """有评分记录的岗位"""
+        with self._lock:
+            rows = self.conn.execute("SELECT DISTINCT position FROM position_scores ORDER BY position").fetchall()
+        return [row['position'] for row in rows]
+
+    def leaderboards(self, limit: int = 20) -> Dict[str, List[sqlite3.Row]]:
+        """各岗位的前 limit 名"""
+        return {position: self.top_candidates(position, limit) for position in self.ranked_positions()}
+
+    # 结果浏览：可排序列（报表列名 -> 数据库列）
+    BROWSE_SORT_COLUMNS = {'姓名': 'name', '应聘岗位': 'position', '处理时间': 'processed_at',
+                           '评估结论': 'verdict', '文件名': 'filename'}
+
+    def _browse_filter(self, position: str = '', verdict: str = '', since: Optional[str] = None) -> Tuple[str, list]:
+        clauses, params = ["outcome = ?"], [self.OUTCOME_SUCCESS]
+        if position:
+            clauses.append("position = ?")
+            params.append(position)
+        if verdict:
+            clauses.append("verdict LIKE ? ESCAPE '\\'")
+            params.append('%' + re.sub(r'([%_\\])', r'\\\1', verdict) + '%')
+        if since:
+            clauses.append("processed_at >= ?")
+            params.append(since)
+        return ' AND '.join(clauses), params
+
+    def count_results(self, **filters) -> int:
+        where, params = self._browse_filter(**filters)
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM manifest WHERE {where}", params).fetchone()[0]
+
+    def page_results(self, offset: int, limit: int, order_by: str = '处理时间', descending: bool = True,
+                     **filters) -> List[sqlite3.Row]:
+        """按排序和过滤条件返回一页结果（只取列表所需的列）"""
+        column = self.BROWSE_SORT_COLUMNS.get(order_by, 'processed_at')
+        direction = 'DESC' if descending else 'ASC'
+        where, params = self._browse_filter(**filters)
+        order = f"ORDER BY {column} {direction}, rowid {direction}"
+        # 先在索引上跳过 offset 行只取rowid，再回表读取这一页的列，深翻页时不读取被跳过的行
+        with self._lock:
+            return self.conn.execute(
+                f"SELECT content_hash, name, position, processed_at, verdict, filename FROM manifest "
+                f"WHERE rowid IN (SELECT rowid FROM manifest WHERE {where} {order} LIMIT ? OFFSET ?) {order}",
+                params + [limit, offset]
+            ).fetchall()
+
+    def positions(self) -> List[str]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT position FROM manifest WHERE outcome = ? AND position IS NOT NULL AND position != '' "
+                "ORDER BY position", (self.OUTCOME_SUCCESS,)
+            ).fetchall()
+        return [row['position'] for row in rows]
+
+    def data_version(self) -> int:
+        """其他连接每提交一次事务即变化，用于判断排行榜是否需要刷新"""
+        with self._lock:
+            return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def get_job_description(self, version: str) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self.conn.execute("SELECT * FROM job_descriptions WHERE version = ?", (version,)).fetchone()
+
+    def record_job_description(self, version: str, jd_name: str, position: str, content: str):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO job_descriptions (version, jd_name, position, content, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (version, jd_name, position, content, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+
+    def pending_archive(self) -> List[sqlite3.Row]:
+        """已成功处理并写入报表、但源文件尚未归档的记录"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT * FROM manifest WHERE outcome = ? AND reported = 1 AND archived_path IS NULL",
+                (self.OUTCOME_SUCCESS,)
+            ).fetchall()
+
+    def mark_archived(self, archived: List[Tuple[str, str]]):
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE manifest SET archived_path = ? WHERE content_hash = ?",
+                                  [(dest, content_hash) for content_hash, dest in archived])
+
+def _ranking_top_n(config: ConfigManager) -> int:
+    try:
+        return max(1, int(config.get('OUTPUT', 'ranking_top_n') or 20))
+    except ValueError:
+        logging.warning("配置项 [OUTPUT] ranking_top_n 无效，使用默认值 20")
+        return 20
+
+# 英文词允许带 + 和 # 后缀（C++、C#），其余标点作为分隔符忽略
+_SEARCH_TOKEN_PATTERN = re.compile(r'[\u4e00-\u9fff]+|[A-Za-z0-9]+[+#]*')
+
+def _search_tokens(text: str, for_index: bool = False) -> List[str]:
+    """中文按字符二元组切分，英文和数字按词切分并转小写（+、# 转写为 plus、sharp，FTS5分词器会丢弃符号）。
+
+    for_index=True 时在每段中文末尾追加末字单字，使每个汉字都是某个词元的首字，
+    单字查询的前缀匹配（如“三”）才能命中位于词尾的字（如“张三”）。
+    """
+    tokens = []
+    for run in _SEARCH_TOKEN_PATTERN.findall(text or ''):
+        if '\u4e00' <= run[0] <= '\u9fff':
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+                if for_index:
+                    tokens.append(run[-1])
+        else:
+            tokens.append(run.lower().replace('+', 'plus').replace('#', 'sharp'))
+    return tokens
+
+class CandidateSearchIndex:
+    """候选人全文检索索引（SQLite FTS5，与结果库同一数据库文件）。
+
+    文本在写入前按字符二元组预切分，查询词按同样方式切分后做短语匹配，
+    结果按 BM25 排序（姓名、岗位权重高于经历和技能，简历原文最低）。
+    每份简历成功处理后增量写入；也可从结果库整体重建。
+    """
+    COLUMN_WEIGHTS = (10.0, 6.0, 3.0, 3.0, 1.0)  # name, position, experience, skills, resume_text
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.available = True
+        try:
+            self._init_schema()
+        except sqlite3.OperationalError as e:
+            # 部分Python发行版的SQLite未编译FTS5
+            logging.warning(f"SQLite不支持FTS5，候选人检索不可用: {str(e)}")
+            self.available = False
+
+    def _init_schema(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_docs (
+                    docid INTEGER PRIMARY KEY,
+                    content_hash TEXT NOT NULL UNIQUE,
+                    name TEXT,
+                    position TEXT,
+                    filename TEXT,
+                    processed_at TEXT
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_search_docs_time ON search_docs(processed_at)")
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS candidate_fts USING fts5(
+                    name, position, experience, skills, resume_text, tokenize = 'unicode61'
+                )
+            """)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    @staticmethod
+    def _document(result: Dict, resume_text: str) -> Tuple[str, ...]:
+        def tokenized(*values) -> str:
+            return ' '.join(_search_tokens(' '.join(str(v or '') for v in values), for_index=True))
+        return (
+            tokenized(result.get('姓名')),
+            tokenized(result.get('应聘岗位')),
+            tokenized(result.get('工作经历'), result.get('项目经验')),
+            tokenized(result.get('技能及优势'), result.get('原生学历'), result.get('最高学历'), result.get('居住地')),
+            tokenized(resume_text),
+        )
+
+    def _upsert(self, content_hash: str, result: Dict, resume_text: str):
+        row = self.conn.execute("SELECT docid FROM search_docs WHERE content_hash = ?", (content_hash,)).fetchone()
+        if row is not None:
+            self.conn.execute("DELETE FROM candidate_fts WHERE rowid = ?", (row['docid'],))
+            self.conn.execute("DELETE FROM search_docs WHERE docid = ?", (row['docid'],))
+        cursor = self.conn.execute(
+            "INSERT INTO search_docs (content_hash, name, position, filename, processed_at) VALUES (?, ?, ?, ?, ?)",
+            (content_hash, result.get('姓名', ''), result.get('应聘岗位', ''), result.get('文件名', ''),
+             result.get('处理时间', ''))
+        )
+        self.conn.execute(
+            "INSERT INTO candidate_fts (rowid, name, position, experience, skills, resume_text) VALUES (?, ?, ?, ?, ?, ?)",
+            (cursor.lastrowid,) + self._document(result, resume_text)
+        )
+
+    def add(self, content_hash: str, result: Dict, resume_text: str = ''):
+        """增量写入一份简历（同一内容哈希重复写入时覆盖）"""
+        if not self.available:
+            return
+        try:
+            with self._lock, self.conn:
+                self._upsert(content_hash, result, resume_text)
+        except sqlite3.Error as e:
+            logging.warning(f"写入检索索引失败: {result.get('文件名', '')} - {str(e)}")
+
+    def rebuild(self, store: 'ResultStore') -> int:
+        """从结果库重建索引（结果库不保存简历原文，仅索引结构化字段）"""
+        if not self.available:
+            return 0
+        count = 0
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM candidate_fts")
+            self.conn.execute("DELETE FROM search_docs")
+            for content_hash, result in store.iter_result_rows():
+                self._upsert(content_hash, result, '')
+                count += 1
+        logging.info(f"检索索引重建完成: {count} 份简历")
+        return count
+
+    @staticmethod
+    def build_match_query(query: str) -> str:
+        """空格分隔的各检索词之间为“与”关系，每个词按二元组切分后做短语匹配"""
+        clauses = []
+        for term in query.split():
+            tokens = _search_tokens(term)
+            if not tokens:
+                logging.info(f"检索词不含可检索的文字，已忽略: {term}")
+                continue
+            if len(tokens) == 1 and len(tokens[0]) == 1 and '\u4e00' <= tokens[0] <= '\u9fff':
+                clauses.append(f'{tokens[0]}*')  # 单个汉字按前缀匹配二元组
+            else:
+                clauses.append('"' + ' '.join(tokens) + '"')
+        return ' AND '.join(clauses)
+
+    def search(self, query: str, limit: int = 50, since: Optional[str] = None,
+               position: Optional[str] = None) -> List[Dict]:
+        """检索候选人，按相关度返回 [{姓名, 应聘岗位, 文件名, 处理时间, 评估结论, 相关度}]；
+        since 为 YYYY-MM-DD，按处理时间过滤；position 按应聘岗位包含匹配"""
+        match = self.build_match_query(query)
+        if not self.available or not match:
+            return []
+        sql = (f"SELECT d.content_hash, d.name, d.position, d.filename, d.processed_at, "
+               f"bm25(candidate_fts, {', '.join(str(w) for w in self.COLUMN_WEIGHTS)}) AS score "
+               f"FROM candidate_fts JOIN search_docs d ON d.docid = candidate_fts.rowid "
+               f"WHERE candidate_fts MATCH ?")
+        params = [match]
+        if since:
+            sql += " AND d.processed_at >= ?"
+            params.append(since)
+        if position:
+            sql += " AND d.position LIKE ?"
+            params.append(f"%{position}%")
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            try:
+                rows = self.conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                logging.warning(f"检索语句无效: {query} - {str(e)}")
+                return []
+            conclusions = {}
+            for row in rows:
+                manifest = self.conn.execute("SELECT result_json FROM manifest WHERE content_hash = ?",
+                                             (row['content_hash'],)).fetchone()
+                if manifest is not None and manifest['result_json']:
+                    conclusions[row['content_hash']] = json.loads(manifest['result_json']).get('评估结论', '')
+        return [{
+            '姓名': row['name'],
+            '应聘岗位': row['position'],
+            '文件名': row['filename'],
+            '处理时间': row['processed_at'],
+            '评估结论': conclusions.get(row['content_hash'], ''),
+            '相关度': round(-row['score'], 3),
+        } for row in rows]
+
+class ResumeArchiver:
+    """批量归档已处理的简历：同文件系统内原子重命名，目标重名时自动避让"""
+
+    def __init__(self, processed_dir: str):
+        self.processed_dir = processed_dir
+        os.makedirs(processed_dir, exist_ok=True)
+
+    def _unique_destination(self, filename: str, content_hash: str) -> str:
+        dest_path = os.path.join(self.processed_dir, filename)
+        if not os.path.exists(dest_path):
+            return dest_path
+        stem, ext = os.path.splitext(filename)
+        dest_path = os.path.join(self.processed_dir, f"{stem}_{content_hash[:8]}{ext}")
+        counter = 1
+        while os.path.exists(dest_path):
+            dest_path = os.path.join(self.processed_dir, f"{stem}_{content_hash[:8]}_{counter}{ext}")
+            counter += 1
+        return dest_path
+
+    def _move(self, source_path: str, dest_path: str):
+        try:
+            os.replace(source_path, dest_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # 跨文件系统：先复制到目标目录的临时文件，再原子重命名，最后删除源文件
+            temp_path = dest_path + '.part'
+            try:
+                shutil.copy2(source_path, temp_path)
+                os.replace(temp_path, dest_path)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            os.remove(source_path)
+
+    def archive(self, entries: List[sqlite3.Row]) -> List[Tuple[str, str]]:
+        """归档一批记录，返回 [(content_hash, 归档路径)]；源文件不存在的记录跳过"""
+        archived = []
+        for entry in entries:
+            source_path = entry['source_path']
+            if not source_path or not os.path.exists(source_path):
+                continue
+            try:
+                dest_path = self._unique_destination(entry['filename'], entry['content_hash'])
+                self._move(source_path, dest_path)
+                archived.append((entry['content_hash'], dest_path))
+            except Exception as e:
+                logging.error(f"归档简历文件失败: {entry['filename']} - {str(e)}")
+        if archived:
+            logging.info(f"已批量归档 {len(archived)} 份简历到: {self.processed_dir}")
+        return archived
+
+    def archive_duplicate(self, source_path: str, filename: str, content_hash: str) -> str:
+        """归档与已处理简历内容相同的文件（文件名不同），避免其留在简历目录中每次扫描都重新计算哈希；
+        压缩包成员无法单独移动，返回空字符串"""
+        if is_archive_member(source_path) or not os.path.exists(source_path):
+            return ''
+        try:
+            dest_path = self._unique_destination(filename, content_hash)
+            self._move(source_path, dest_path)
+        except Exception as e:
+            logging.error(f"归档重复简历失败: {filename} - {str(e)}")
+            return ''
+        logging.info(f"内容与已处理简历相同，已归档: {filename} -> {dest_path}")
+        return dest_path
+
+class ResumeQuarantine(ResumeArchiver):
+    """隔离导致解析超时、内存超限或进程崩溃的简历，原因追加记录到隔离目录下的日志"""
+    LOG_FILENAME = '隔离原因.jsonl'
+
+    def quarantine(self, file_path: str, reason: str) -> str:
+        """移动文件到隔离目录并记录原因，返回隔离后的路径（移动失败时返回空字符串）"""
+        filename = os.path.basename(file_path)
+        dest_path = ''
+        try:
+            if os.path.exists(file_path):
+                dest_path = self._unique_destination(filename, _file_sha256(file_path))
+                self._move(file_path, dest_path)
+        except Exception as e:
+            logging.error(f"隔离简历文件失败: {filename} - {str(e)}")
+        with open(os.path.join(self.processed_dir, self.LOG_FILENAME), 'a', encoding='utf-8') as log_file:
+            log_file.write(json.dumps({
+                'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'filename': filename,
+                'source_path': file_path, 'quarantined_path': dest_path, 'reason': reason,
+            }, ensure_ascii=False) + '\n')
+        logging.warning(f"已隔离简历: {filename} - {reason}" + (f" -> {dest_path}" if dest_path else ""))
+        return dest_path
+
+class JobQueue:
+    """多机共享任务队列（SQLite，可放在各机器都能访问的共享目录）。
+
+    工作机以限时租约领取简历，处理完成后回写结果；租约过期未完成的任务重新入队，
+    超过最大尝试次数则标记失败。只有汇总进程读取结果并写入结果库和报表。
+    网络共享上的SQLite不支持WAL，这里使用默认的回滚日志并以 BEGIN IMMEDIATE 串行化领取。
+    """
+    DEFAULT_FILENAME = 'recruitment_queue.db'
+
+    STATUS_QUEUED = 'queued'
+    STATUS_LEASED = 'leased'
+    STATUS_DONE = 'done'
+    STATUS_EMPTY = 'empty'
+    STATUS_FAILED = 'failed'
+
+    def __init__(self, db_path: str, max_attempts: int = 3):
+        self.db_path = db_path
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=DELETE')
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._lock:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    content_hash TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    source_path TEXT,
+                    file_size INTEGER,
+                    file_mtime REAL,
+                    priority INTEGER NOT NULL DEFAULT 5,
+                    deadline INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result_json TEXT,
+                    collected INTEGER NOT NULL DEFAULT 0,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, priority, deadline)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS run_settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def publish_settings(self, job_cache: Dict[str, Dict[str, str]], top_k: int):
+        """发布本批次的职位说明书与评估参数，所有工作机使用相同的岗位版本，无需各自调用API处理职位说明书"""
+        with self._transaction() as conn:
+            conn.executemany("INSERT OR REPLACE INTO run_settings (key, value) VALUES (?, ?)", [
+                ('job_cache', json.dumps(job_cache, ensure_ascii=False)),
+                ('top_k', str(top_k)),
+            ])
+
+    def load_settings(self) -> Tuple[Dict[str, Dict[str, str]], int]:
+        with self._lock:
+            rows = dict(self.conn.execute("SELECT key, value FROM run_settings").fetchall())
+        return json.loads(rows.get('job_cache', '{}')), int(rows.get('top_k', '0'))
+
+    def enqueue(self, items: Iterable[ScheduledResume]) -> int:
+        """入队并返回新增/重新入队的任务数（内容哈希相同的任务不会重复入队）；ScheduledResume.payload 为 (内容哈希, 文件状态)"""
+        rows = []
+        for item in items:
+            content_hash, file_stat = item.payload
+            rows.append((content_hash, item.filename, item.file_path, file_stat.st_size, file_stat.st_mtime,
+                         item.priority, item.deadline.toordinal() if item.deadline else date.max.toordinal(),
+                         self.STATUS_QUEUED, self._now()))
+        with self._transaction() as conn:
+            before = conn.total_changes
+            # 已在队列中的任务保持原状；已汇总的失败/空内容任务重新入队
+            conn.executemany("""
+                INSERT INTO jobs (content_hash, filename, source_path, file_size, file_mtime,
+                                  priority, deadline, status, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(content_hash) DO UPDATE SET
+                    filename = excluded.filename, source_path = excluded.source_path,
+                    priority = excluded.priority, deadline = excluded.deadline, status = excluded.status,
+                    worker_id = NULL, lease_expires = NULL, attempts = 0, result_json = NULL, collected = 0,
+                    updated_at = excluded.updated_at
+                WHERE jobs.status IN ('failed', 'empty') AND jobs.collected = 1
+            """, rows)
+            return conn.total_changes - before
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[sqlite3.Row]:
+        """领取优先级最高的一个任务；顺带回收已过期的租约"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("""
+                UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                                worker_id = NULL, lease_expires = NULL, updated_at = ?
+                WHERE status = ? AND lease_expires < ?
+            """, (self.max_attempts, self.STATUS_FAILED, self.STATUS_QUEUED, self._now(), self.STATUS_LEASED, now))
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY priority, deadline, rowid LIMIT 1",
+                (self.STATUS_QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("""
+                UPDATE jobs SET status = ?, worker_id = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ?
+                WHERE content_hash = ?
+            """, (self.STATUS_LEASED, worker_id, now + lease_seconds, self._now(), row['content_hash']))
+            return row
+
+    def renew(self, content_hashes: List[str], worker_id: str, lease_seconds: float):
+        """为仍在处理中的任务续约"""
+        if not content_hashes:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE jobs SET lease_expires = ? WHERE content_hash = ? AND worker_id = ? AND status = ?",
+                [(time.time() + lease_seconds, content_hash, worker_id, self.STATUS_LEASED)
+                 for content_hash in content_hashes]
+            )
+
+    def complete(self, content_hash: str, worker_id: str, status: str, result: Optional[Dict] = None) -> bool:
+        """回写结果；租约已过期并被其他工作机领取时放弃本次结果，避免重复计入"""
+        with self._transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET status = ?, result_json = ?, worker_id = ?, lease_expires = NULL, updated_at = ?
+                WHERE content_hash = ? AND worker_id = ? AND status = ?
+            """, (status, json.dumps(result, ensure_ascii=False) if result else None, worker_id, self._now(),
+                  content_hash, worker_id, self.STATUS_LEASED))
+            return cursor.rowcount == 1
+
+    def uncollected(self, limit: int = 500) -> List[sqlite3.Row]:
+        """已结束但尚未被汇总进程写入结果库的任务"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?, ?) AND collected = 0 ORDER BY updated_at LIMIT ?",
+                (self.STATUS_DONE, self.STATUS_EMPTY, self.STATUS_FAILED, limit)
+            ).fetchall()
+
+    def mark_collected(self, content_hashes: List[str]):
+        with self._transaction() as conn:
+            conn.executemany("UPDATE jobs SET collected = 1 WHERE content_hash = ?", [(h,) for h in content_hashes])
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def has_open_jobs(self) -> bool:
+        counts = self.counts()
+        return bool(counts.get(self.STATUS_QUEUED, 0) or counts.get(self.STATUS_LEASED, 0))
+
+def _scan_pending_resumes(store: ResultStore, source: ResumeSource, entries: List[ResumeEntry],
+                          archiver: Optional[ResumeArchiver] = None
+                          ) -> Tuple[Dict[str, Tuple[str, str, ResumeEntry]], List[str]]:
+    """对照结果库清单筛选待处理简历，返回 (路径 -> (文件名, 内容哈希, 简历条目), 已处理但未写入报表的哈希)；
+    内容相同的文件或压缩包成员只处理一份。传入 archiver 时，与已处理并写入报表的简历内容相同、
+    文件名不同的文件直接归档（试运行不传，不移动文件）"""
+    pending = {}
+    resumed_hashes = []
+    seen_hashes = set()
+    try:
+        for resume in entries:
+            try:
+                entry = store.find_by_stat(resume.filename, resume.st_size, resume.st_mtime)
+                if entry is None:
+                    content_hash = source.content_hash(resume)
+                    if content_hash is None:
+                        continue
+                    entry = store.get(content_hash)
+                else:
+                    content_hash = entry['content_hash']
+                processed = entry is not None and entry['outcome'] == ResultStore.OUTCOME_SUCCESS
+                if (archiver is not None and processed and entry['reported']
+                        and resume.path != entry['source_path'] and resume.path != entry['archived_path']):
+                    archiver.archive_duplicate(resume.path, resume.filename, content_hash)
+                if content_hash in seen_hashes:
+                    logging.info(f"内容重复的简历，跳过: {resume.filename}")
+                    continue
+                seen_hashes.add(content_hash)
+                if entry is not None and entry['outcome'] == ResultStore.OUTCOME_QUARANTINED:
+                    logging.info(f"已隔离的简历（内容未变），跳过: {resume.filename}")
+                    continue
+                if processed:
+                    if not entry['reported']:
+                        resumed_hashes.append(content_hash)
+                    logging.info(f"清单中已有处理结果，跳过: {resume.filename}")
+                    continue
+                pending[resume.path] = (resume.filename, content_hash, resume)
+            except Exception as e:
+                logging.error(f"读取简历文件失败: {resume.filename} - {str(e)}")
+    finally:
+        source.close()
+    return pending, resumed_hashes
+
+def plan_run(config: ConfigManager, evaluator: 'DeepSeekEvaluator', resume_dir: str, job_desc_files: List[str],
+             top_k: int = 0, store: Optional[ResultStore] = None, on_idle=None) -> RunPlan:
+    """试运行：本地解析简历文本并预估本次运行的token用量、费用和耗时，不调用API"""
+    source = ResumeSource.from_config(config, resume_dir)
+    resume_entries = source.entries()
+    if store is not None:
+        pending, _ = _scan_pending_resumes(store, source, resume_entries)
+        file_paths = {path: filename for path, (filename, _, _) in pending.items()}
+    else:
+        file_paths = {resume.path: resume.filename for resume in resume_entries}
+
+    job_processor = JobDescriptionProcessor(metrics=evaluator.metrics, llm=evaluator.llm)
+    try:
+        job_cache = job_processor.load_job_descriptions_locally(job_desc_files)
+    finally:
+        job_processor.close()
+    try:
+        default_priority = int(config.get('SCHEDULING', 'default_priority') or PriorityScheduler.DEFAULT_PRIORITY)
+    except ValueError:
+        default_priority = PriorityScheduler.DEFAULT_PRIORITY
+    scheduler = PriorityScheduler(job_cache, PriorityScheduler.load_jd_priorities(config, job_desc_files),
+                                  evaluator.filename_parser, default_priority)
+    scheduled = scheduler.order([scheduler.assign(path, filename) for path, filename in file_paths.items()])
+
+    texts = {}
+    with ParsingStage.from_config(config) as parsing_stage:
+        for file_path, resume_text in parsing_stage.parse([item.file_path for item in scheduled], on_idle=on_idle):
+            texts[file_path] = resume_text
+    # 按调度顺序计入预算，与实际运行时延后的简历一致
+    return RunPlanner(evaluator, config).plan(
+        job_cache, ((item.filename, texts.get(item.file_path, '')) for item in scheduled), top_k)
+
+def reevaluate_stale_results(store: ResultStore, evaluator: 'DeepSeekEvaluator', job_cache: Dict[str, Dict[str, str]],
+                             output_excel: str = '', include_unversioned: bool = False, dry_run: bool = False,
+                             on_progress=None) -> List[str]:
+    """职位说明书变更后的增量重新评估。
+
+    仅对评估时所用职位说明书版本与当前版本不一致的候选人，基于结果库中的结构化信息
+    重新调用 evaluate_candidate（不重新解析简历、不重新提取信息），并原位更新结果库和报表。
+    include_unversioned=True 时，旧版本程序生成的无版本记录按应聘岗位匹配后一并重新评估。
+    返回需要（dry_run）或已经重新评估的文件名列表。
+    """
+    by_name = {os.path.basename(jd_file): jd_file for jd_file in job_cache}
+    by_position = {data['position']: jd_file for jd_file, data in job_cache.items()}
+    stale = []
+    for content_hash, result in store.iter_result_rows():
+        jd_name = result.get('评估职位说明书')
+        if jd_name:
+            jd_file = by_name.get(jd_name)
+            if jd_file is None or result.get('职位说明书版本') == job_cache[jd_file].get('version'):
+                continue
+        elif include_unversioned:
+            jd_file = by_position.get(result.get('应聘岗位', ''))
+            if jd_file is None:
+                continue
+        else:
+            continue
+        if not result.get('结构化信息'):
+            logging.warning(f"结果库中缺少结构化信息，无法重新评估: {result.get('文件名', '')}")
+            continue
+        stale.append((content_hash, result, jd_file))
+
+    logging.info(f"职位说明书版本变更，需重新评估 {len(stale)} 份简历")
+    if dry_run:
+        return [result.get('文件名', '') for _, result, _ in stale]
+
+    updates = {}
+    for i, (content_hash, result, jd_file) in enumerate(stale):
+        filename = result.get('文件名', '')
+        if on_progress is not None:
+            on_progress(i, len(stale), filename)
+        data = job_cache[jd_file]
+        with log_context(correlation_id_for(filename)):
+            evaluation = evaluator.evaluate_candidate(
+                resume_info=Candidate.from_dict(result['结构化信息']),
+                job_content=data['content'],
+                filename=filename
+            )
+        if not evaluation.ok:
+            logging.warning(f"重新评估失败，保留原结论: {filename}")
+            continue
+        result['评估结论'] = evaluation.conclusion
+        for _, key in Evaluation.SCORE_KEYS:
+            result.pop(key, None)
+        result.update(evaluation.score_fields())
+        result['评估职位说明书'] = os.path.basename(jd_file)
+        result['职位说明书版本'] = data.get('version', '')
+        for item in result.get('多岗位评估', []):
+            if item.get('岗位') == data['position']:
+                item['评估结论'] = evaluation.conclusion
+                if evaluation.score is not None:
+                    item['匹配度评分'] = evaluation.score
+                for slot, key in Evaluation.SCORE_KEYS[1:]:
+                    if getattr(evaluation, slot) is not None:
+                        item[key] = getattr(evaluation, slot)
+        store.update_result(content_hash, result)
+        updates[filename] = result
+        logging.info(f"重新评估完成: {filename} - {evaluation.conclusion[:50]}...")
+
+    if updates and output_excel:
+        ExcelGenerator.update_rows(output_excel, updates)
+    return list(updates)
+
+def _queue_path(config: ConfigManager, work_dir: str) -> str:
+    return config.get('DISTRIBUTED', 'queue_path') or os.path.join(work_dir, JobQueue.DEFAULT_FILENAME)
+
+def _distributed_setting(config: ConfigManager, key: str, default, cast=float):
+    try:
+        return cast(config.get('DISTRIBUTED', key) or default)
+    except ValueError:
+        logging.warning(f"配置项 [DISTRIBUTED] {key} 无效，使用默认值 {default}")
+        return default
+
+def submit_queue_jobs(config: ConfigManager, job_queue: JobQueue, store: ResultStore, resume_dir: str,
+                      job_desc_files: List[str], top_k: int = 0) -> int:
+    """汇总端：处理职位说明书并发布到队列，把结果库中尚未处理的简历按岗位优先级入队"""
+    metrics = RunMetrics()
+    job_processor = JobDescriptionProcessor(metrics=metrics)
+    try:
+        job_cache = job_processor.process_job_descriptions(job_desc_files, store)
+    finally:
+        job_processor.close()
+    if not job_cache:
+        raise ValueError("未成功处理任何职位说明书")
+    job_queue.publish_settings(job_cache, top_k)
+    source = ResumeSource.from_config(config, resume_dir)
+    archiver = ResumeArchiver(os.path.join(os.path.dirname(os.path.abspath(store.db_path)), '已处理简历'))
+    pending, _ = _scan_pending_resumes(store, source, source.entries(), archiver)
+    try:
+        default_priority = int(config.get('SCHEDULING', 'default_priority') or PriorityScheduler.DEFAULT_PRIORITY)
+    except ValueError:
+        default_priority = PriorityScheduler.DEFAULT_PRIORITY
+    scheduler = PriorityScheduler(job_cache, PriorityScheduler.load_jd_priorities(config, job_desc_files),
+                                  FilenameParser.from_config(config), default_priority)
+    added = job_queue.enqueue(
+        scheduler.assign(file_path, filename, (content_hash, file_stat))
+        for file_path, (filename, content_hash, file_stat) in pending.items()
+    )
+    logging.info(f"已入队 {added} 份简历（待处理 {len(pending)} 份），职位说明书 {len(job_cache)} 个")
+    return added
+
+def run_queue_worker(config: ConfigManager, job_queue: JobQueue, worker_id: str, resume_dir: str = '',
+                     threads: int = 0, wait_for_jobs: bool = False) -> int:
+    """工作端：多线程领取任务，解析简历并调用 process_resume，结果回写队列；返回完成的任务数"""
+    lease_seconds = _distributed_setting(config, 'lease_seconds', 300)
+    poll_seconds = _distributed_setting(config, 'poll_seconds', 5)
+    if threads <= 0:
+        try:
+            threads = max(1, int(config.get('SCHEDULING', 'api_concurrency') or 4))
+        except ValueError:
+            threads = 4
+    job_cache, top_k = job_queue.load_settings()
+    if not job_cache:
+        raise ValueError("队列中没有发布职位说明书，请先在汇总端提交任务")
+
+    metrics = RunMetrics()
+    evaluator = DeepSeekEvaluator(metrics=metrics)
+    # 单个任务的续约上限：解析超时 + 一次提取 + 至多两次评估（多岗位评估失败时回退单岗位评估）的调用时限。
+    # 超过后不再续约，租约到期由其他工作机重新领取，卡死的任务最终按 max_attempts 标记失败
+    try:
+        file_timeout = float(config.get('PARSING', 'file_timeout') or 180)
+    except ValueError:
+        file_timeout = 180.0
+    job_ceiling = ((file_timeout or 180) + evaluator.llm.timeouts['extraction']
+                   + 2 * evaluator.llm.timeouts['evaluation'])
+    held = {}
+    held_lock = threading.Lock()
+    stop = threading.Event()
+    completed = [0]
+
+    def heartbeat():
+        # 每三分之一租约时长续约一次，处理耗时较长的简历不会被其他工作机抢走
+        while not stop.wait(lease_seconds / 3):
+            now = time.monotonic()
+            with held_lock:
+                hashes = []
+                for content_hash, entry in held.items():
+                    if now - entry['started'] <= job_ceiling:
+                        hashes.append(content_hash)
+                    elif not entry['expired']:
+                        entry['expired'] = True
+                        logging.warning(f"任务处理超过 {job_ceiling:g} 秒，停止续约，租约到期后重新入队: "
+                                        f"{entry['filename']}")
+            try:
+                job_queue.renew(hashes, worker_id, lease_seconds)
+            except sqlite3.Error as e:
+                logging.warning(f"续约失败: {str(e)}")
+
+    def work():
+        processor = ResumeProcessor()
+        while not stop.is_set():
+            job = job_queue.claim(worker_id, lease_seconds)
+            if job is None:
+                if wait_for_jobs or job_queue.has_open_jobs():
+                    stop.wait(poll_seconds)
+                    continue
+                return
+            with held_lock:
+                held[job['content_hash']] = {'started': time.monotonic(), 'filename': job['filename'],
+                                             'expired': False}
+            # 各机器挂载共享目录的路径可能不同，指定简历目录时按文件名定位
+            file_path = relocate_resume_path(job['source_path'], resume_dir) if resume_dir else job['source_path']
+            with log_context(correlation_id_for(job['filename'])):
+                try:
+                    resume_text = processor.extract_resume_text(file_path) or ""
+                    if not resume_text.strip():
+                        logging.warning(f"简历内容为空: {job['filename']}")
+                        status, info = JobQueue.STATUS_EMPTY, None
+                    else:
+                        info = evaluator.process_resume(resume_text, job['filename'], job_cache, top_k=top_k)
+                        status = JobQueue.STATUS_DONE if info else JobQueue.STATUS_FAILED
+                except Exception as e:
+                    logging.error(f"处理简历失败: {job['filename']} - {str(e)}")
+                    status, info = JobQueue.STATUS_FAILED, None
+                with held_lock:
+                    held.pop(job['content_hash'], None)
+                if job_queue.complete(job['content_hash'], worker_id, status, info):
+                    completed[0] += 1
+                else:
+                    logging.warning(f"租约已失效，放弃本次结果: {job['filename']}")
+
+    heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+    heartbeat_thread.start()
+    workers = [threading.Thread(target=work, daemon=True) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    try:
+        for thread in workers:
+            while thread.is_alive():
+                thread.join(timeout=1)
+    finally:
+        stop.set()
+        evaluator.close()
+    metrics.log_summary()
+    logging.info(f"工作机 {worker_id} 完成 {completed[0]} 个任务")
+    return completed[0]
+
+def aggregate_queue_results(config: ConfigManager, job_queue: JobQueue, store: ResultStore, output_excel: str,
+                            archiver: Optional['ResumeArchiver'] = None, follow: bool = True,
+                            search_index: Optional[CandidateSearchIndex] = None) -> int:
+    """汇总端：唯一写报表的进程。批量收取工作机的结果，写入结果库、报表并归档源文件"""
+    interval = _distributed_setting(config, 'aggregate_interval', 30)
+    extra_formats = [f.strip() for f in config.get('OUTPUT', 'extra_formats').split(',') if f.strip()]
+    total = 0
+    while True:
+        open_jobs = job_queue.has_open_jobs()
+        rows = job_queue.uncollected()
+        if rows:
+            results, reported_hashes = [], []
+            for row in rows:
+                outcome = {JobQueue.STATUS_DONE: ResultStore.OUTCOME_SUCCESS,
+                           JobQueue.STATUS_EMPTY: ResultStore.OUTCOME_EMPTY}.get(row['status'], ResultStore.OUTCOME_FAILED)
+                result = json.loads(row['result_json']) if row['result_json'] else None
+                store.record(row['content_hash'], row['filename'], row['source_path'], row['file_size'],
+                             row['file_mtime'], outcome, result)
+                if outcome == ResultStore.OUTCOME_SUCCESS and result:
+                    results.append(result)
+                    reported_hashes.append(row['content_hash'])
+                    if search_index is not None:
+                        search_index.add(row['content_hash'], result)
+            if results:
+                write_outputs(results, output_excel, extra_formats, config)
+                store.mark_reported(reported_hashes)
+                if archiver is not None:
+                    store.mark_archived(archiver.archive(store.pending_archive()))
+            job_queue.mark_collected([row['content_hash'] for row in rows])
+            total += len(results)
+            logging.info(f"汇总 {len(rows)} 个任务结果，写入报表 {len(results)} 条；队列状态: {job_queue.counts()}")
+            continue
+        if not open_jobs and not follow:
+            break
+        time.sleep(interval)
+    return total
+
+class GuiLogHandler(logging.Handler):
+    """GUI日志输出：emit 只把记录放入有界队列，由Tk主线程定时批量格式化并写入文本框。
+
+    队列和文本框都只保留最近 max_lines 行（完整日志仍写入日志文件），
+    自动滚动仅在视图位于末尾时进行，避免逐条刷新拖慢处理。
+    """
+
+    LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+
+    def __init__(self, text_widget, max_lines: int = 2000, flush_ms: int = 200, level: str = 'INFO'):
+        super().__init__(level=getattr(logging, level.upper(), logging.INFO))
+        self.text_widget = text_widget
+        self.max_lines = max(100, max_lines)
+        self.flush_ms = max(50, flush_ms)
+        self.pending = deque(maxlen=self.max_lines)
+        self.dropped = 0
+
+    def emit(self, record):
+        # 不在调用线程格式化，也不触碰Tk控件
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append(record)
+
+    def start(self):
+        self.text_widget.after(self.flush_ms, self._flush_loop)
+
+    def _flush_loop(self):
+        try:
+            self.flush_pending()
+        finally:
+            self.text_widget.after(self.flush_ms, self._flush_loop)
+
+    def flush_pending(self):
+        records = []
+        while self.pending:
+            try:
+                records.append(self.pending.popleft())
+            except IndexError:
+                break
+        if not records:
+            return
+        lines = []
+        if self.dropped:
+            lines.append(f"... 已省略 {self.dropped} 条日志，完整内容见日志文件")
+            self.dropped = 0
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        at_bottom = self.text_widget.yview()[1] >= 0.999
+        widget = self.text_widget
+        widget.configure(state='normal')
+        widget.insert(tk.END, '\n'.join(lines) + '\n')
+        excess = int(widget.index('end-1c').split('.')[0]) - 1 - self.max_lines
+        if excess > 0:
+            widget.delete('1.0', f'{excess + 1}.0')
+        widget.configure(state='disabled')
+        if at_bottom:
+            widget.see(tk.END)
+
+    def set_level_name(self, level: str):
+        self.setLevel(getattr(logging, level.upper(), logging.INFO))
+
+def open_path(path: str):
+    """用系统默认程序打开文件（Windows、macOS、Linux）"""
+    if os.name == 'nt':
+        os.startfile(path)
+    elif sys.platform == 'darwin':
+        subprocess.Popen(['open', path])
+    else:
+        subprocess.Popen(['xdg-open', path])
+
+class ResultBrowser:
+    """结果浏览窗口：虚拟化列表，只渲染可见的若干行，数据按页从结果库读取。
+
+    排序和过滤在SQLite中完成（冗余列上有索引），窗口只缓存最近访问的几页，
+    十万级候选人时滚动和排序仍然流畅；双击行查看完整结果。
+    """
+    COLUMNS = (('姓名', 90), ('应聘岗位', 140), ('处理时间', 130), ('评估结论', 420), ('文件名', 220))
+    PAGE_SIZE = 200
+    CACHED_PAGES = 8
+    DATE_RANGES = {'全部': 0, '近7天': 7, '近30天': 30, '近90天': 90, '近一年': 365}
+
+    def __init__(self, parent, db_path: str, output_excel: str = ''):
+        self.store = ResultStore(db_path)
+        self.output_excel = output_excel
+        self.order_by = '处理时间'
+        self.descending = True
+        self.offset = 0
+        self.total = 0
+        self.visible_rows = 25
+        self._pages = OrderedDict()
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("候选人结果浏览")
+        self.window.geometry("1100x650")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.position_var = tk.StringVar(value='全部')
+        self.verdict_var = tk.StringVar()
+        self.range_var = tk.StringVar(value='全部')
+        self.status_var = tk.StringVar()
+
+        filter_frame = ttk.Frame(self.window, padding="5")
+        filter_frame.pack(fill=tk.X)
+        ttk.Label(filter_frame, text="岗位:").pack(side=tk.LEFT)
+        ttk.Combobox(filter_frame, textvariable=self.position_var, values=['全部'] + self.store.positions(),
+                     width=18, state='readonly').pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="评估结论包含:").pack(side=tk.LEFT)
+        verdict_entry = ttk.Entry(filter_frame, textvariable=self.verdict_var, width=20)
+        verdict_entry.pack(side=tk.LEFT, padx=5)
+        verdict_entry.bind('<Return>', lambda event: self.refresh())
+        ttk.Label(filter_frame, text="处理时间:").pack(side=tk.LEFT)
+        ttk.Combobox(filter_frame, textvariable=self.range_var, values=list(self.DATE_RANGES),
+                     width=8, state='readonly').pack(side=tk.LEFT, padx=5)
+        ttk.Button(filter_frame, text="查询", command=self.refresh).pack(side=tk.LEFT, padx=5)
+        if output_excel:
+            ttk.Button(filter_frame, text="打开Excel报表", command=self.open_excel).pack(side=tk.RIGHT)
+        ttk.Label(self.window, textvariable=self.status_var, padding=(5, 0)).pack(anchor=tk.W)
+
+        table_frame = ttk.Frame(self.window)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        columns = tuple(column for column, _ in self.COLUMNS)
+        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings', selectmode='browse')
+        for column, width in self.COLUMNS:
+            self.tree.heading(column, text=column, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=width, anchor=tk.W, stretch=column == '评估结论')
+        # 滚动条不绑定Treeview（其中始终只有可见的几行），而是映射到结果总数上的偏移
+        self.scrollbar = ttk.Scrollbar(table_frame, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll(-3 if event.delta > 0 else 3))
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll(3))
+        self.tree.bind('<Prior>', lambda event: self.scroll(-self.visible_rows))
+        self.tree.bind('<Next>', lambda event: self.scroll(self.visible_rows))
+        self.tree.bind('<Double-1>', self._show_detail)
+        self.refresh()
+
+    def _filters(self) -> Dict:
+        days = self.DATE_RANGES.get(self.range_var.get(), 0)
+        position = self.position_var.get()
+        return {
+            'position': '' if position == '全部' else position,
+            'verdict': self.verdict_var.get().strip(),
+            'since': (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d') if days else None,
+        }
+
+    def refresh(self):
+        """重新统计总数并回到第一行（过滤或排序条件变化后调用）"""
+        start = time.perf_counter()
+        self._pages.clear()
+        self.total = self.store.count_results(**self._filters())
+        self.offset = 0
+        self.render()
+        order = '降序' if self.descending else '升序'
+        self.status_var.set(f"共 {self.total} 条结果，按{self.order_by}{order}，"
+                            f"查询耗时 {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def sort_by(self, column: str):
+        if column == self.order_by:
+            self.descending = not self.descending
+        else:
+            self.order_by, self.descending = column, column == '处理时间'
+        for name, _ in self.COLUMNS:
+            arrow = (' ▼' if self.descending else ' ▲') if name == self.order_by else ''
+            self.tree.heading(name, text=name + arrow)
+        self.refresh()
+
+    def _row(self, index: int) -> sqlite3.Row:
+        page_no = index // self.PAGE_SIZE
+        page = self._pages.get(page_no)
+        if page is None:
+            page = self.store.page_results(page_no * self.PAGE_SIZE, self.PAGE_SIZE, self.order_by,
+                                           self.descending, **self._filters())
+            self._pages[page_no] = page
+            if len(self._pages) > self.CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_no)
+        offset = index % self.PAGE_SIZE
+        return page[offset] if offset < len(page) else None
+
+    def render(self):
+        """只把 [offset, offset + visible_rows) 范围内的行写入Treeview，复用已有条目"""
+        self.offset = max(0, min(self.offset, self.total - self.visible_rows))
+        count = min(self.visible_rows, self.total - self.offset)
+        items = self.tree.get_children()
+        for iid in items[count:]:
+            self.tree.delete(iid)
+        for i in range(count):
+            row = self._row(self.offset + i)
+            values = ('', '', '', '', '') if row is None else (
+                row['name'] or '', row['position'] or '', row['processed_at'],
+                (row['verdict'] or '').replace('\n', ' '), row['filename'])
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert('', tk.END, iid=str(i), values=values)
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, (self.offset + count) / self.total)
+        else:
+            self.scrollbar.set(0, 1)
 
-            # 准备数据
-            for result in results:
-                if '评估结论' not in result or not result['评估结论']:
-                    logging.warning(f"结果中缺失或空的评估结论: {result.get('文件名', '未知文件')}")
+    def scroll(self, rows: int):
+        self.offset += rows
+        self.tree.selection_remove(self.tree.selection())
+        self.render()
 
-            df = pd.DataFrame(results)
-            ordered_columns = [clean_col for _, clean_col in ExcelGenerator.STANDARD_COLUMNS]
-            df = df.reindex(columns=ordered_columns)
-            df.fillna('', inplace=True)
+    def _on_scrollbar(self, action: str, amount: str, unit: str = ''):
+        if action == 'moveto':
+            self.offset = int(float(amount) * self.total)
+            self.tree.selection_remove(self.tree.selection())
+            self.render()
+        elif action == 'scroll':
+            self.scroll(int(amount) * (self.visible_rows if unit == 'pages' else 1))
 
-            # Excel格式设置
-            min_width = 10
-            content_alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-            header_fill = PatternFill(start_color='CCE5FF', end_color='CCE5FF', fill_type='solid')
-            header_font = Font(bold=True)
-            header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    def _on_resize(self, event):
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        visible = max(1, (event.height - row_height - 4) // row_height)
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            self.render()
 
-            sheet_name = '简历信息'
-            expected_headers = ordered_columns
+    def _show_detail(self, event):
+        iid = self.tree.identify_row(event.y)
+        if not iid:
+            return
+        row = self._row(self.offset + int(iid))
+        manifest = self.store.get(row['content_hash']) if row is not None else None
+        if manifest is None or not manifest['result_json']:
+            return
+        result = json.loads(manifest['result_json'])
+        detail = tk.Toplevel(self.window)
+        detail.title(f"{result.get('姓名', '')} - {result.get('应聘岗位', '')}")
+        detail.geometry("700x500")
+        text = tk.Text(detail, wrap=tk.WORD)
+        for key, value in result.items():
+            if key != '结构化信息':
+                text.insert(tk.END, f"{key}: {value}\n")
+        text.configure(state='disabled')
+        text.pack(fill=tk.BOTH, expand=True)
 
-            # 检查文件是否存在
-            if os.path.exists(output_path):
-                try:
-                    # 加载现有Excel
-                    workbook = openpyxl.load_workbook(output_path)
-                    if sheet_name in workbook.sheetnames:
-                        worksheet = workbook[sheet_name]
-                        # 验证表头
-                        if not ExcelGenerator._validate_excel_headers(worksheet, expected_headers):
-                            logging.error(f"Excel文件表头不匹配: {output_path}")
-                            raise ValueError(f"Excel文件 '{output_path}' 的表头与预期不匹配")
-                    else:
-                        # 创建新工作表
-                        worksheet = workbook.create_sheet(sheet_name)
-                except Exception as e:
-                    logging.error(f"加载Excel文件失败: {output_path} - {str(e)}")
-                    raise
-            else:
-                # 创建新Excel
-                workbook = openpyxl.Workbook()
-                worksheet = workbook.active
-                worksheet.title = sheet_name
+    def open_excel(self):
+        if not os.path.exists(self.output_excel):
+            messagebox.showinfo("提示", "报表文件不存在", parent=self.window)
+            return
+        try:
+            open_path(self.output_excel)
+        except Exception as e:
+            messagebox.showerror("错误", f"无法打开报表: {str(e)}", parent=self.window)
 
-            # 写入表头（仅在新文件或新工作表时）
-            if worksheet.max_row == 1 and not worksheet['A1'].value:
-                for col_idx, header in enumerate(expected_headers, start=1):
-                    cell = worksheet.cell(row=1, column=col_idx)
-                    cell.value = header
-                    cell.fill = header_fill
-                    cell.font = header_font
-                    cell.alignment = header_alignment
+    def close(self):
+        self.store.close()
+        self.window.destroy()
 
-            # 追加数据
-            start_row = worksheet.max_row + 1 if worksheet.max_row > 1 else 2
-            for row_idx, row_data in enumerate(df.values, start=start_row):
-                for col_idx, value in enumerate(row_data, start=1):
-                    cell = worksheet.cell(row=row_idx, column=col_idx)
-                    cell.value = str(value)
-                    cell.alignment = content_alignment
+class LeaderboardView:
+    """岗位排行窗口：显示某岗位评分前N名，结果库有新提交（每完成一份简历）时自动刷新"""
+    COLUMNS = (('排名', 50), ('姓名', 90), ('综合评分', 70), ('学历评分', 70), ('经验评分', 70),
+               ('技能评分', 70), ('评估结论', 420), ('处理时间', 130))
+    POLL_MS = 1000
 
-            # 调整列宽
-            for col_idx, column in enumerate(df.columns, start=1):
-                max_length = max(
-                    df[column].astype(str).str.len().max(),
-                    len(str(column))
-                )
-                adjusted_width = max(min_width, min(max_length * 2.5, 100))
-                col_letter = get_column_letter(col_idx)
-                worksheet.column_dimensions[col_letter].width = adjusted_width
+    def __init__(self, parent, db_path: str, output_excel: str = '', top_n: int = 20):
+        self.store = ResultStore(db_path)
+        self.output_excel = output_excel
+        self._data_version = None
+        self._poll_job = None
 
-            # 设置冻结窗格
-            worksheet.freeze_panes = 'B2'
+        self.window = tk.Toplevel(parent)
+        self.window.title("岗位排行")
+        self.window.geometry("1050x600")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        positions = self.store.ranked_positions()
+        self.position_var = tk.StringVar(value=positions[0] if positions else '')
+        self.top_n_var = tk.IntVar(value=top_n)
+        self.status_var = tk.StringVar()
 
-            # 保存文件
-            workbook.save(output_path)
-            logging.info(f"成功追加数据到Excel: {output_path} (新增 {len(results)} 行)")
-            return output_path
+        control_frame = ttk.Frame(self.window, padding="5")
+        control_frame.pack(fill=tk.X)
+        ttk.Label(control_frame, text="岗位:").pack(side=tk.LEFT)
+        self.position_box = ttk.Combobox(control_frame, textvariable=self.position_var, values=positions,
+                                         width=20, state='readonly')
+        self.position_box.pack(side=tk.LEFT, padx=5)
+        self.position_box.bind('<<ComboboxSelected>>', lambda event: self.refresh())
+        ttk.Label(control_frame, text="前").pack(side=tk.LEFT)
+        ttk.Spinbox(control_frame, from_=1, to=500, textvariable=self.top_n_var, width=5,
+                    command=self.refresh).pack(side=tk.LEFT, padx=2)
+        ttk.Label(control_frame, text="名").pack(side=tk.LEFT)
+        if output_excel:
+            ttk.Button(control_frame, text="导出排行", command=self.export).pack(side=tk.RIGHT)
+        ttk.Label(self.window, textvariable=self.status_var, padding=(5, 0)).pack(anchor=tk.W)
+
+        columns = tuple(column for column, _ in self.COLUMNS)
+        self.tree = ttk.Treeview(self.window, columns=columns, show='headings', selectmode='browse')
+        for column, width in self.COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=width, anchor=tk.W, stretch=column == '评估结论')
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        self._poll()
+
+    def _top_n(self) -> int:
+        try:
+            return max(1, int(self.top_n_var.get()))
+        except (tk.TclError, ValueError):
+            return 20
+
+    def refresh(self):
+        start = time.perf_counter()
+        position = self.position_var.get()
+        rows = self.store.top_candidates(position, self._top_n()) if position else []
+        self.tree.delete(*self.tree.get_children())
+        for rank, row in enumerate(rows, start=1):
+            self.tree.insert('', tk.END, values=(
+                rank, row['name'] or '', row['score'],
+                '' if row['education'] is None else row['education'],
+                '' if row['experience'] is None else row['experience'],
+                '' if row['skills'] is None else row['skills'],
+                (row['verdict'] or '').replace('\n', ' '), row['processed_at'] or ''))
+        self.status_var.set(f"{position or '暂无评分记录'}：前 {len(rows)} 名，"
+                            f"查询耗时 {(time.perf_counter() - start) * 1000:.0f} ms，"
+                            f"更新于 {datetime.now().strftime('%H:%M:%S')}")
 
+    def _poll(self):
+        """处理过程中每提交一份简历 data_version 即变化，此时刷新岗位列表和排行"""
+        version = self.store.data_version()
+        if version != self._data_version:
+            self._data_version = version
+            positions = self.store.ranked_positions()
+            self.position_box.configure(values=positions)
+            if not self.position_var.get() and positions:
+                self.position_var.set(positions[0])
+            self.refresh()
+        self._poll_job = self.window.after(self.POLL_MS, self._poll)
+
+    def export(self):
+        try:
+            path = ExcelGenerator.generate_rankings(self.store.leaderboards(self._top_n()),
+                                                    ExcelGenerator.ranking_path(self.output_excel))
+            messagebox.showinfo("导出完成", f"岗位排行已导出到:\n{path}", parent=self.window)
         except Exception as e:
-            logging.error(f"生成或追加Excel失败: {str(e)}", exc_info=True)
-            raise
+            logging.error(f"导出岗位排行失败: {str(e)}", exc_info=True)
+            messagebox.showerror("错误", f"导出岗位排行失败：{str(e)}", parent=self.window)
+
+    def close(self):
+        if self._poll_job is not None:
+            self.window.after_cancel(self._poll_job)
+        self.store.close()
+        self.window.destroy()
 
 class RecruitmentSystemGUI:
     """招聘系统GUI界面"""
@@ -999,9 +5427,10 @@ class RecruitmentSystemGUI:
         self.root.title("招聘管理系统")
         self.root.geometry("1000x800")
         
+        self.metrics = RunMetrics()
         self.resume_processor = ResumeProcessor()
-        self.evaluator = DeepSeekEvaluator()
-        self.job_desc_processor = JobDescriptionProcessor()
+        self.evaluator = DeepSeekEvaluator(metrics=self.metrics)
+        self.job_desc_processor = JobDescriptionProcessor(metrics=self.metrics, llm=self.evaluator.llm)
         self.config = ConfigManager()
         
         self.main_frame = ttk.Frame(root, padding="10")
@@ -1017,6 +5446,20 @@ class RecruitmentSystemGUI:
             default_excel = os.path.join(work_dir, '简历信息一览表.xlsx')
         self.output_excel = tk.StringVar(value=self.config.get('PATHS', 'output_excel') or default_excel)
         self.job_desc_files = []
+        try:
+            top_k = int(self.config.get('EVALUATION', 'multi_jd_top_k') or 0)
+        except ValueError:
+            top_k = 0
+        self.multi_jd_top_k = tk.IntVar(value=top_k)
+        extra_formats = [f.strip() for f in self.config.get('OUTPUT', 'extra_formats').split(',') if f.strip()]
+        self.extra_format_vars = {
+            format_name: tk.BooleanVar(value=format_name in extra_formats)
+            for format_name in ('jsonl', 'csv', 'parquet')
+        }
+        gui_level = (self.config.get('LOGGING', 'gui_level') or 'INFO').upper()
+        self.log_level = tk.StringVar(value=gui_level if gui_level in GuiLogHandler.LEVELS else 'INFO')
+        self.search_query = tk.StringVar()
+        self.search_range = tk.StringVar(value='全部')
         self.progress_var = tk.DoubleVar()
         self.status_var = tk.StringVar(value="准备就绪")
         self.running = False
@@ -1048,6 +5491,15 @@ class RecruitmentSystemGUI:
         ttk.Label(dir_frame, text="输出Excel文件:").grid(row=3, column=0, sticky=tk.W)
         ttk.Entry(dir_frame, textvariable=self.output_excel, width=70).grid(row=3, column=1, padx=5)
         ttk.Button(dir_frame, text="浏览", command=self.browse_output_excel).grid(row=3, column=2)
+
+        # 附加输出格式
+        ttk.Label(dir_frame, text="附加输出格式:").grid(row=4, column=0, sticky=tk.W)
+        format_frame = ttk.Frame(dir_frame)
+        format_frame.grid(row=4, column=1, sticky=tk.W, padx=5)
+        for format_name, label in (('jsonl', 'JSONL'), ('csv', 'CSV'), ('parquet', 'Parquet')):
+            ttk.Checkbutton(
+                format_frame, text=label, variable=self.extra_format_vars[format_name]
+            ).pack(side=tk.LEFT, padx=(0, 10))
         
         job_desc_frame = ttk.LabelFrame(self.main_frame, text="职位说明书", padding="10")
         job_desc_frame.pack(fill=tk.X, pady=(0, 10))
@@ -1062,6 +5514,22 @@ class RecruitmentSystemGUI:
         
         ttk.Button(button_frame, text="添加", command=self.add_job_description).pack(fill=tk.X, pady=2)
         ttk.Button(button_frame, text="移除", command=self.remove_job_description).pack(fill=tk.X, pady=2)
+        ttk.Button(button_frame, text="设置优先级", command=self.set_job_priority).pack(fill=tk.X, pady=2)
+
+        ttk.Label(job_desc_frame, text="多岗位评估Top-K (0=关闭):").grid(row=2, column=0, sticky=tk.W)
+        ttk.Spinbox(
+            job_desc_frame, from_=0, to=10, width=5, textvariable=self.multi_jd_top_k
+        ).grid(row=2, column=1, sticky=tk.W, padx=5)
+        
+        search_frame = ttk.LabelFrame(self.main_frame, text="候选人检索", padding="10")
+        search_frame.pack(fill=tk.X, pady=(0, 10))
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_query, width=50)
+        search_entry.pack(side=tk.LEFT, padx=(0, 5))
+        search_entry.bind('<Return>', lambda event: self.search_candidates())
+        ttk.Combobox(
+            search_frame, textvariable=self.search_range, values=list(self.SEARCH_RANGES), width=10, state='readonly'
+        ).pack(side=tk.LEFT, padx=5)
+        ttk.Button(search_frame, text="检索", command=self.search_candidates).pack(side=tk.LEFT, padx=5)
         
         progress_frame = ttk.Frame(self.main_frame)
         progress_frame.pack(fill=tk.X, pady=(0, 10))
@@ -1072,6 +5540,14 @@ class RecruitmentSystemGUI:
         log_frame = ttk.LabelFrame(self.main_frame, text="系统日志", padding="10")
         log_frame.pack(fill=tk.BOTH, expand=True)
         
+        level_frame = ttk.Frame(log_frame)
+        level_frame.pack(side=tk.TOP, fill=tk.X)
+        ttk.Label(level_frame, text="显示级别:").pack(side=tk.LEFT)
+        level_box = ttk.Combobox(level_frame, textvariable=self.log_level, values=GuiLogHandler.LEVELS,
+                                 width=10, state='readonly')
+        level_box.pack(side=tk.LEFT, padx=5)
+        level_box.bind('<<ComboboxSelected>>', self._on_log_level_changed)
+
         self.log_text = tk.Text(log_frame, height=20, state='disabled')
         scrollbar = ttk.Scrollbar(log_frame, command=self.log_text.yview)
         self.log_text.configure(yscrollcommand=scrollbar.set)
@@ -1089,6 +5565,36 @@ class RecruitmentSystemGUI:
             style='Accent.TButton'
         ).pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(
+            button_frame, 
+            text="浏览结果", 
+            command=self.open_results_browser
+        ).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(
+            button_frame, 
+            text="岗位排行", 
+            command=self.open_leaderboard
+        ).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(
+            button_frame, 
+            text="预估费用(试运行)", 
+            command=self.plan_dry_run
+        ).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(
+            button_frame, 
+            text="岗位变更重新评估", 
+            command=self.reevaluate_changed_jobs
+        ).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(
+            button_frame, 
+            text="重建报表(去重)", 
+            command=self.compact_report
+        ).pack(side=tk.LEFT, padx=5)
+        
         ttk.Button(
             button_frame, 
             text="查看日志文件", 
@@ -1103,22 +5609,21 @@ class RecruitmentSystemGUI:
         ).pack(side=tk.RIGHT)
 
     def _redirect_logging(self):
-        """重定向日志到GUI文本框"""
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                super().__init__()
-                self.text_widget = text_widget
-            
-            def emit(self, record):
-                msg = self.format(record)
-                self.text_widget.configure(state='normal')
-                self.text_widget.insert(tk.END, msg + '\n')
-                self.text_widget.configure(state='disabled')
-                self.text_widget.see(tk.END)
-        
-        text_handler = TextHandler(self.log_text)
-        text_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        logging.getLogger().addHandler(text_handler)
+        """重定向日志到GUI文本框（批量、非阻塞）"""
+        try:
+            max_lines = int(self.config.get('LOGGING', 'gui_max_lines') or 2000)
+            flush_ms = int(self.config.get('LOGGING', 'gui_flush_ms') or 200)
+        except ValueError:
+            max_lines, flush_ms = 2000, 200
+        self.log_handler = GuiLogHandler(self.log_text, max_lines, flush_ms, self.log_level.get())
+        self.log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logging.getLogger().addHandler(self.log_handler)
+        self.log_handler.start()
+
+    def _on_log_level_changed(self, event=None):
+        level = self.log_level.get()
+        self.log_handler.set_level_name(level)
+        self.config.set('LOGGING', 'gui_level', level)
 
     def browse_work_dir(self):
         """浏览选择工作目录"""
@@ -1182,7 +5687,7 @@ class RecruitmentSystemGUI:
         for file in files:
             if file not in self.job_desc_files:
                 self.job_desc_files.append(file)
-                self.job_desc_listbox.insert(tk.END, os.path.basename(file))
+                self.job_desc_listbox.insert(tk.END, self._job_desc_label(file))
         self.status_var.set(f"已添加 {len(files)} 个职位说明书")
         logging.info(f"添加职位说明书: {files}")
 
@@ -1196,15 +5701,211 @@ class RecruitmentSystemGUI:
                 logging.info(f"移除职位说明书: {removed_file}")
             self.status_var.set(f"已移除 {len(selections)} 个职位说明书")
 
+    def _job_desc_label(self, file: str) -> str:
+        basename = os.path.basename(file)
+        priority, deadline = PriorityScheduler.parse_priority(self.config.get('JOB_PRIORITY', basename))
+        if priority is None and deadline is None:
+            return basename
+        label = f"{basename}  [优先级 {priority if priority is not None else '-'}"
+        return label + (f", 截止 {deadline.isoformat()}]" if deadline else "]")
+
+    def set_job_priority(self):
+        """为选中的职位说明书设置优先级和截止日期"""
+        selections = self.job_desc_listbox.curselection()
+        if not selections:
+            messagebox.showwarning("警告", "请先选择职位说明书")
+            return
+        first = os.path.basename(self.job_desc_files[selections[0]])
+        priority, deadline = PriorityScheduler.parse_priority(self.config.get('JOB_PRIORITY', first))
+        value = simpledialog.askstring(
+            "设置优先级",
+            "输入 <优先级>,<截止日期>（数值越小越紧急，日期格式 YYYY-MM-DD，可省略）:",
+            initialvalue=f"{priority if priority is not None else ''}"
+                         f"{',' + deadline.isoformat() if deadline else ''}",
+            parent=self.root
+        )
+        if value is None:
+            return
+        priority, deadline = PriorityScheduler.parse_priority(value)
+        if value.strip() and priority is None and deadline is None:
+            messagebox.showerror("错误", "优先级格式无效")
+            return
+        for index in selections:
+            file = self.job_desc_files[index]
+            self.config.set('JOB_PRIORITY', os.path.basename(file), value.strip())
+            self.job_desc_listbox.delete(index)
+            self.job_desc_listbox.insert(index, self._job_desc_label(file))
+            logging.info(f"职位说明书优先级设置为: {os.path.basename(file)} -> {value.strip() or '默认'}")
+
+    def plan_dry_run(self):
+        """试运行：本地解析简历并预估token用量、费用和耗时，不调用API"""
+        if self.running:
+            return
+        work_dir = self.work_dir.get()
+        resume_dir = self.resume_dir.get()
+        if not resume_dir or not os.path.isdir(resume_dir):
+            messagebox.showerror("错误", "请先选择有效的简历目录")
+            return
+        if not self.job_desc_files:
+            messagebox.showerror("错误", "请先添加职位说明书")
+            return
+        try:
+            top_k = max(0, int(self.multi_jd_top_k.get()))
+        except (tk.TclError, ValueError):
+            top_k = 0
+        self.running = True
+        self.status_var.set("正在预估本次运行费用...")
+        store = None
+        try:
+            store_path = os.path.join(work_dir, ResultStore.DEFAULT_FILENAME) if work_dir else ''
+            if store_path and os.path.exists(store_path):
+                store = ResultStore(store_path)
+            run_plan = plan_run(self.config, self.evaluator, resume_dir, self.job_desc_files, top_k,
+                                store=store, on_idle=self.root.update)
+            report = run_plan.report()
+            logging.info(f"运行预估:\n{report}")
+            messagebox.showinfo("运行预估", report)
+        except Exception as e:
+            logging.error(f"运行预估失败: {str(e)}", exc_info=True)
+            messagebox.showerror("错误", f"运行预估失败：{str(e)}")
+        finally:
+            if store is not None:
+                store.close()
+            self.running = False
+            self.status_var.set("准备就绪")
+
+    SEARCH_RANGES = {'全部': 0, '近30天': 30, '近90天': 90, '近一年': 365}
+
+    def search_candidates(self):
+        """全文检索候选人并在新窗口中按相关度列出"""
+        query = self.search_query.get().strip()
+        work_dir = self.work_dir.get()
+        if not query:
+            return
+        if not work_dir or not os.path.exists(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME)):
+            messagebox.showerror("错误", "工作目录中没有结果库，请先处理简历")
+            return
+        days = self.SEARCH_RANGES.get(self.search_range.get(), 0)
+        since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d') if days else None
+        search_index = CandidateSearchIndex(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME))
+        try:
+            start = time.perf_counter()
+            hits = search_index.search(query, limit=200, since=since)
+            elapsed = (time.perf_counter() - start) * 1000
+        finally:
+            search_index.close()
+        self.status_var.set(f"检索“{query}”: {len(hits)} 条结果, 耗时 {elapsed:.1f} ms")
+
+        window = tk.Toplevel(self.root)
+        window.title(f"检索结果 - {query}")
+        window.geometry("900x500")
+        columns = ('相关度', '姓名', '应聘岗位', '处理时间', '评估结论', '文件名')
+        tree = ttk.Treeview(window, columns=columns, show='headings')
+        for column, width in zip(columns, (70, 80, 120, 140, 320, 200)):
+            tree.heading(column, text=column)
+            tree.column(column, width=width, anchor=tk.W)
+        for hit in hits:
+            tree.insert('', tk.END, values=tuple(hit[column] for column in columns))
+        scrollbar = ttk.Scrollbar(window, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def reevaluate_changed_jobs(self):
+        """职位说明书变更后，仅重新评估使用旧版本评估的候选人并原位更新报表"""
+        if self.running:
+            return
+        work_dir = self.work_dir.get()
+        output_excel = self.output_excel.get()
+        if not work_dir or not os.path.exists(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME)):
+            messagebox.showerror("错误", "工作目录中没有结果库，请先处理简历")
+            return
+        if not self.job_desc_files:
+            messagebox.showerror("错误", "请先添加职位说明书")
+            return
+        self.running = True
+        store = ResultStore(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME))
+        try:
+            self.metrics.reset()
+            job_cache = self.job_desc_processor.process_job_descriptions(self.job_desc_files, store)
+            stale = reevaluate_stale_results(store, self.evaluator, job_cache, dry_run=True)
+            if not stale:
+                messagebox.showinfo("提示", "没有使用旧版本职位说明书评估的候选人")
+                return
+            if not messagebox.askyesno("确认", f"共 {len(stale)} 份简历需要重新评估，并原位更新报表：\n"
+                                               f"{output_excel}\n是否继续？"):
+                return
+
+            def on_progress(index, total, filename):
+                self.progress_var.set(index / total * 100)
+                self.status_var.set(f"正在重新评估 {filename} ({index + 1}/{total})")
+                self.root.update()
+
+            updated = reevaluate_stale_results(store, self.evaluator, job_cache, output_excel,
+                                               on_progress=on_progress)
+            self.metrics.log_summary()
+            messagebox.showinfo("完成", f"已重新评估 {len(updated)}/{len(stale)} 份简历\n{self.metrics.summary()}")
+        except Exception as e:
+            logging.error(f"重新评估失败: {str(e)}", exc_info=True)
+            messagebox.showerror("错误", f"重新评估失败：{str(e)}\n请确保报表文件未被占用")
+        finally:
+            store.close()
+            self.running = False
+            self.progress_var.set(100)
+            self.status_var.set("准备就绪")
+
+    def compact_report(self):
+        """从结果库重建输出Excel报表（按姓名+岗位去重）"""
+        if self.running:
+            return
+        work_dir = self.work_dir.get()
+        output_excel = self.output_excel.get()
+        if not work_dir or not os.path.exists(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME)):
+            messagebox.showerror("错误", "工作目录中没有结果库，请先处理简历")
+            return
+        if not messagebox.askyesno("确认", f"将根据结果库重建并覆盖报表：\n{output_excel}\n是否继续？"):
+            return
+        store = ResultStore(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME))
+        try:
+            written = ExcelGenerator.compact(store.iter_results(), output_excel, 'none')
+            messagebox.showinfo("完成", "报表已重建:\n" + "\n".join(written))
+        except Exception as e:
+            logging.error(f"重建报表失败: {str(e)}", exc_info=True)
+            messagebox.showerror("错误", f"重建报表失败：{str(e)}\n请确保文件未被占用且路径有效")
+        finally:
+            store.close()
+
+    def open_results_browser(self):
+        """在程序内分页浏览结果库中的全部候选人"""
+        work_dir = self.work_dir.get()
+        if not work_dir or not os.path.exists(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME)):
+            messagebox.showerror("错误", "工作目录中没有结果库，请先处理简历")
+            return
+        try:
+            ResultBrowser(self.root, os.path.join(work_dir, ResultStore.DEFAULT_FILENAME), self.output_excel.get())
+        except Exception as e:
+            logging.error(f"打开结果浏览失败: {str(e)}", exc_info=True)
+            messagebox.showerror("错误", f"打开结果浏览失败：{str(e)}")
+
+    def open_leaderboard(self):
+        """各岗位评分排行，处理简历时可保持打开，每完成一份简历自动刷新"""
+        work_dir = self.work_dir.get()
+        if not work_dir or not os.path.exists(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME)):
+            messagebox.showerror("错误", "工作目录中没有结果库，请先处理简历")
+            return
+        try:
+            LeaderboardView(self.root, os.path.join(work_dir, ResultStore.DEFAULT_FILENAME),
+                            self.output_excel.get(), _ranking_top_n(self.config))
+        except Exception as e:
+            logging.error(f"打开岗位排行失败: {str(e)}", exc_info=True)
+            messagebox.showerror("错误", f"打开岗位排行失败：{str(e)}")
+
     def view_logs(self):
         """查看日志文件"""
-        log_file = 'recruitment_system.log'
+        log_file = self.config.get('LOGGING', 'log_file') or DEFAULT_LOG_FILE
         if os.path.exists(log_file):
             try:
-                if os.name == 'nt':
-                    os.startfile(log_file)
-                else:
-                    subprocess.run(['open', log_file])
+                open_path(log_file)
             except Exception as e:
                 messagebox.showerror("错误", f"无法打开日志文件: {str(e)}")
         else:
@@ -1238,80 +5939,207 @@ class RecruitmentSystemGUI:
             self.running = False
             return
     
+        store = None
+        search_index = None
         try:
             if not os.path.exists(resume_dir):
                 messagebox.showerror("错误", "简历目录不存在")
                 self.running = False
                 return
         
-            resume_files = [f for f in os.listdir(resume_dir) if f.endswith(('.pdf', '.docx'))]
+            resume_source = ResumeSource.from_config(self.config, resume_dir)
+            resume_files = resume_source.entries()
             if not resume_files:
                 messagebox.showerror("错误", "简历目录中没有简历文件")
                 self.running = False
                 return
         
-            processed_dir = os.path.join(work_dir, '已处理简历')
-            os.makedirs(processed_dir, exist_ok=True)
+            archiver = ResumeArchiver(os.path.join(work_dir, '已处理简历'))
+            store = ResultStore(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME))
+            search_index = CandidateSearchIndex(store.db_path)
+
+            try:
+                top_k = max(0, int(self.multi_jd_top_k.get()))
+            except (tk.TclError, ValueError):
+                top_k = 0
+            self.config.set('EVALUATION', 'multi_jd_top_k', str(top_k))
+            if top_k:
+                logging.info(f"多岗位评估已启用: 每份简历评估前 {top_k} 个岗位")
+
+            self.metrics.reset()
+            logging.info(f"Prompt版本: 提取 v{DeepSeekEvaluator.EXTRACTION_PROMPT_VERSION}, "
+                         f"评估 v{DeepSeekEvaluator.EVALUATION_PROMPT_VERSION}")
         
-            job_cache = self.job_desc_processor.process_job_descriptions(self.job_desc_files)
+            job_cache = self.job_desc_processor.process_job_descriptions(self.job_desc_files, store)
             if not job_cache:
                 messagebox.showerror("错误", "未成功处理任何职位说明书")
                 self.running = False
                 return
         
             results = []
+            reported_hashes = []
             total_files = len(resume_files)
-            for i, filename in enumerate(resume_files):
-                try:
-                    self.progress_var.set((i + 1) / total_files * 100)
-                    self.status_var.set(f"正在处理 {filename} ({i+1}/{total_files})")
-                    self.root.update()
-                
-                    file_path = os.path.join(resume_dir, filename)
-                    resume_text = self.resume_processor.extract_resume_text(file_path)
-                
-                    if not resume_text.strip():
-                        logging.warning(f"简历内容为空: {filename}")
-                        continue
-                
-                    info = self.evaluator.process_resume(
-                        resume_text=resume_text,
-                        filename=filename,
-                        job_cache=job_cache
-                    )
-                
-                    if info:
-                        results.append(info)
-                        logging.info(f"成功处理简历: {filename} - 评估结论: {info['评估结论'][:50]}...")
-                
+            pending, resumed_hashes = _scan_pending_resumes(store, resume_source, resume_files, archiver)
+
+            try:
+                api_concurrency = max(1, int(self.config.get('SCHEDULING', 'api_concurrency') or 4))
+            except ValueError:
+                api_concurrency = 4
+            try:
+                default_priority = int(self.config.get('SCHEDULING', 'default_priority')
+                                       or PriorityScheduler.DEFAULT_PRIORITY)
+            except ValueError:
+                default_priority = PriorityScheduler.DEFAULT_PRIORITY
+            scheduler = PriorityScheduler(
+                job_cache, PriorityScheduler.load_jd_priorities(self.config, self.job_desc_files),
+                self.evaluator.filename_parser, default_priority
+            )
+            # 按文件名预匹配岗位排序，紧急岗位的简历优先解析
+            scheduled = scheduler.order([
+                scheduler.assign(file_path, filename, (content_hash, file_stat))
+                for file_path, (filename, content_hash, file_stat) in pending.items()
+            ])
+            scheduled_by_path = {item.file_path: item for item in scheduled}
+            completed = queue.Queue()
+            planner = RunPlanner(self.evaluator, self.config)
+            jd_totals = self.metrics.totals()
+            planned_tokens = jd_totals['prompt_tokens'] + jd_totals['completion_tokens']
+            deferred = []
+
+            def api_worker():
+                while True:
+                    item = scheduler.next()
+                    if item is None:
+                        return
+                    with log_context(correlation_id_for(item.filename)):
+                        try:
+                            info = self.evaluator.process_resume(
+                                resume_text=item.resume_text,
+                                filename=item.filename,
+                                job_cache=job_cache,
+                                top_k=top_k
+                            )
+                        except Exception as e:
+                            logging.error(f"处理简历失败: {item.filename} - {str(e)}")
+                            info = None
+                    scheduler.mark_done(item)
+                    completed.put((item, info))
+
+            done_count = 0
+
+            def drain_completed():
+                # 结果库连接属于主线程，API线程只负责评估，写库与界面更新在此处完成
+                nonlocal done_count
+                while True:
                     try:
-                        dest_path = os.path.join(processed_dir, filename)
-                        shutil.move(file_path, dest_path)
-                        logging.info(f"已移动简历文件到: {dest_path}")
-                    except Exception as e:
-                        logging.error(f"移动简历文件失败: {filename} - {str(e)}")
-                except Exception as e:
-                    logging.error(f"处理简历失败: {filename} - {str(e)}")
-                    continue
+                        item, info = completed.get_nowait()
+                    except queue.Empty:
+                        break
+                    content_hash, file_stat = item.payload
+                    done_count += 1
+                    self.progress_var.set(done_count / len(pending) * 100)
+                    self.status_var.set(f"已完成 {item.filename} ({done_count}/{len(pending)}, 优先级 {item.priority})")
+                    with log_context(correlation_id_for(item.filename)):
+                        try:
+                            if info:
+                                store.record(content_hash, item.filename, item.file_path, file_stat.st_size,
+                                             file_stat.st_mtime, ResultStore.OUTCOME_SUCCESS, info)
+                                results.append(info)
+                                reported_hashes.append(content_hash)
+                                search_index.add(content_hash, info, item.resume_text)
+                                logging.info(f"成功处理简历: {item.filename} - 评估结论: {info['评估结论'][:50]}...")
+                            else:
+                                store.record(content_hash, item.filename, item.file_path, file_stat.st_size,
+                                             file_stat.st_mtime, ResultStore.OUTCOME_FAILED)
+                        except Exception as e:
+                            logging.error(f"记录处理结果失败: {item.filename} - {str(e)}")
+                    item.resume_text = ''
+                self.root.update()
+
+            api_threads = [threading.Thread(target=api_worker, daemon=True) for _ in range(api_concurrency)]
+            for thread in api_threads:
+                thread.start()
+            try:
+                with ParsingStage.from_config(self.config, os.path.join(work_dir, '隔离简历')) as parsing_stage:
+                    parsed = parsing_stage.parse([item.file_path for item in scheduled], on_idle=drain_completed)
+                    for file_path, resume_text in parsed:
+                        item = scheduled_by_path[file_path]
+                        if file_path in parsing_stage.quarantined:
+                            # 已移入隔离目录（压缩包成员留在原处）；按内容哈希记为已隔离，之后扫描时跳过，
+                            # 文件修复后内容哈希改变，放回简历目录会重新处理
+                            content_hash, file_stat = item.payload
+                            store.record(content_hash, item.filename, file_path, file_stat.st_size,
+                                         file_stat.st_mtime, ResultStore.OUTCOME_QUARANTINED)
+                            done_count += 1
+                            continue
+                        if not resume_text.strip():
+                            logging.warning(f"简历内容为空: {item.filename}")
+                            content_hash, file_stat = item.payload
+                            store.record(content_hash, item.filename, file_path, file_stat.st_size,
+                                         file_stat.st_mtime, ResultStore.OUTCOME_EMPTY)
+                            done_count += 1
+                            continue
+                        estimate = planner.estimate(resume_text, item.filename, job_cache, top_k)
+                        if deferred or not planner.within_budget(planned_tokens, estimate):
+                            # 未写入结果库，下次运行时自动重新处理
+                            deferred.append(item.filename)
+                            logging.warning(f"超出单次运行token预算，延后处理: {item.filename}")
+                            done_count += 1
+                            continue
+                        planned_tokens += estimate.total_tokens
+                        item.resume_text = resume_text
+                        scheduler.submit(item)
+                        drain_completed()
+            finally:
+                scheduler.close(len(api_threads))
+                while any(thread.is_alive() for thread in api_threads):
+                    drain_completed()
+                    for thread in api_threads:
+                        thread.join(timeout=0.1)
+                drain_completed()
+            scheduler.log_latency_report()
+            run_totals = self.metrics.totals()
+            logging.info(f"预估 {planned_tokens} tokens, 实际 {run_totals['prompt_tokens'] + run_totals['completion_tokens']} tokens")
+            if deferred:
+                logging.warning(f"共 {len(deferred)} 份简历因token预算延后到下次运行")
+
+            if resumed_hashes:
+                resumed_results = store.unreported_results(resumed_hashes)
+                results = resumed_results + results
+                reported_hashes = resumed_hashes + reported_hashes
+                logging.info(f"恢复上次未写入报表的结果 {len(resumed_results)} 条")
+        
+            self.metrics.log_summary()
         
             if results:
                 try:
-                    output_path = ExcelGenerator.generate(results, output_excel)
+                    extra_formats = [name for name, var in self.extra_format_vars.items() if var.get()]
+                    self.config.set('OUTPUT', 'extra_formats', ','.join(extra_formats))
+                    written = write_outputs(results, output_excel, extra_formats, self.config)
+                    output_path = written['xlsx']
+                    for format_name, path in written.items():
+                        if format_name != 'xlsx':
+                            logging.info(f"附加输出 ({format_name}): {path}")
+                    store.mark_reported(reported_hashes)
+                    if (self.config.get('OUTPUT', 'ranking_export') or 'true').lower() in ('1', 'true', 'yes', 'on'):
+                        try:
+                            ExcelGenerator.generate_rankings(store.leaderboards(_ranking_top_n(self.config)),
+                                                             ExcelGenerator.ranking_path(output_path))
+                        except Exception as e:
+                            logging.error(f"导出岗位排行失败: {str(e)}")
+                    # 结果已写入清单和报表后再批量归档源文件
+                    store.mark_archived(archiver.archive(store.pending_archive()))
                 
                     messagebox.showinfo(
                         "处理完成",
                         f"成功处理 {len(results)}/{total_files} 份简历\n"
-                        f"数据已追加到:\n{output_path}"
+                        f"数据已追加到:\n{output_path}\n"
+                        f"{self.metrics.summary()}"
+                        + (f"\n{len(deferred)} 份简历超出token预算，已延后到下次运行" if deferred else "")
                     )
                 
-                    try:
-                        if os.name == 'nt':
-                            os.startfile(output_path)
-                        else:
-                            subprocess.run(['open', output_path])
-                    except Exception as e:
-                        logging.warning(f"无法打开结果文件: {str(e)}")
-                        messagebox.showwarning("警告", f"无法自动打开结果文件，请手动打开：\n{output_path}")
+                    # 大报表用Excel打开很慢，改为在程序内分页浏览结果库
+                    self.open_results_browser()
                 except ValueError as e:
                     messagebox.showerror("错误", str(e))
                     self.running = False
@@ -1321,17 +6149,314 @@ class RecruitmentSystemGUI:
                     self.running = False
                     return
             else:
+                store.mark_archived(archiver.archive(store.pending_archive()))
                 messagebox.showerror("错误", "没有成功处理任何简历")
     
         except Exception as e:
             messagebox.showerror("系统错误", f"处理过程中发生错误:\n{str(e)}")
             logging.error(f"系统错误: {str(e)}", exc_info=True)
         finally:
+            if search_index is not None:
+                search_index.close()
+            if store is not None:
+                store.close()
             self.running = False
             self.progress_var.set(100)
             self.status_var.set("处理完成")
 
-def main():
+def _resolve_work_dir(args_work_dir: Optional[str]) -> str:
+    work_dir = args_work_dir or ConfigManager().get('PATHS', 'work_dir')
+    if not work_dir or not os.path.isdir(work_dir):
+        raise SystemExit(f"工作目录无效: {work_dir!r}，请通过 --work-dir 指定或在GUI中设置")
+    return work_dir
+
+def _cmd_compact(args) -> int:
+    """命令行：从结果库重建/拆分Excel报表"""
+    work_dir = _resolve_work_dir(args.work_dir)
+    output_path = args.output or ConfigManager().get('PATHS', 'output_excel')
+    store = ResultStore(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME))
+    try:
+        written = ExcelGenerator.compact(store.iter_results(), output_path, args.split_by)
+    finally:
+        store.close()
+    for path in written:
+        print(path)
+    return 0
+
+def _resolve_job_desc_files(args_jd: Optional[List[str]], config: ConfigManager) -> List[str]:
+    job_desc_files = args_jd
+    if not job_desc_files:
+        job_desc_dir = config.get('PATHS', 'job_desc_dir')
+        job_desc_files = sorted(
+            os.path.join(job_desc_dir, f) for f in os.listdir(job_desc_dir) if f.endswith('.docx')
+        ) if job_desc_dir and os.path.isdir(job_desc_dir) else []
+    if not job_desc_files:
+        raise SystemExit("未找到职位说明书，请通过 --jd 指定")
+    return job_desc_files
+
+def _cmd_reevaluate(args) -> int:
+    """命令行：职位说明书变更后，基于结果库中的结构化信息重新评估并原位更新报表"""
+    config = ConfigManager()
+    work_dir = _resolve_work_dir(args.work_dir)
+    output_path = args.output or config.get('PATHS', 'output_excel')
+    job_desc_files = _resolve_job_desc_files(args.jd, config)
+    metrics = RunMetrics()
+    store = ResultStore(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME))
+    evaluator = DeepSeekEvaluator(metrics=metrics)
+    job_processor = JobDescriptionProcessor(metrics=metrics, llm=evaluator.llm)
+    try:
+        job_cache = job_processor.process_job_descriptions(job_desc_files, store)
+        filenames = reevaluate_stale_results(
+            store, evaluator, job_cache, output_path,
+            include_unversioned=args.include_unversioned, dry_run=args.dry_run
+        )
+    finally:
+        job_processor.close()
+        evaluator.close()
+        store.close()
+    for filename in filenames:
+        print(filename)
+    print(f"{'需重新评估' if args.dry_run else '已重新评估'} {len(filenames)} 份简历")
+    if not args.dry_run:
+        print(metrics.summary())
+    return 0
+
+def _open_job_queue(config: ConfigManager, work_dir: str, queue_path: Optional[str]) -> JobQueue:
+    try:
+        max_attempts = int(config.get('DISTRIBUTED', 'max_attempts') or 3)
+    except ValueError:
+        max_attempts = 3
+    return JobQueue(queue_path or _queue_path(config, work_dir), max_attempts)
+
+def _cmd_queue_submit(args) -> int:
+    """命令行（汇总端）：发布职位说明书并将待处理简历入队"""
+    config = ConfigManager()
+    work_dir = _resolve_work_dir(args.work_dir)
+    resume_dir = args.resume_dir or config.get('PATHS', 'resume_dir')
+    if not resume_dir or not os.path.isdir(resume_dir):
+        raise SystemExit(f"简历目录无效: {resume_dir!r}，请通过 --resume-dir 指定或在GUI中设置")
+    job_queue = _open_job_queue(config, work_dir, args.queue)
+    store = ResultStore(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME))
+    try:
+        added = submit_queue_jobs(config, job_queue, store, resume_dir,
+                                  _resolve_job_desc_files(args.jd, config), args.top_k)
+        print(f"入队 {added} 份简历, 队列状态: {job_queue.counts()}")
+    finally:
+        store.close()
+        job_queue.close()
+    return 0
+
+def _cmd_queue_worker(args) -> int:
+    """命令行（工作机）：领取任务并处理，直到队列清空（--wait 时持续等待新任务）"""
+    config = ConfigManager()
+    if not args.queue and not args.work_dir:
+        raise SystemExit("请通过 --queue 指定共享队列文件")
+    job_queue = _open_job_queue(config, args.work_dir or '', args.queue)
+    worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    try:
+        completed = run_queue_worker(config, job_queue, worker_id, args.resume_dir or '', args.threads, args.wait)
+    finally:
+        job_queue.close()
+    print(f"工作机 {worker_id} 完成 {completed} 个任务")
+    return 0
+
+def _cmd_queue_aggregate(args) -> int:
+    """命令行（汇总端）：收取结果，写入结果库和报表（唯一写报表的进程）"""
+    config = ConfigManager()
+    work_dir = _resolve_work_dir(args.work_dir)
+    output_path = args.output or config.get('PATHS', 'output_excel')
+    job_queue = _open_job_queue(config, work_dir, args.queue)
+    store = ResultStore(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME))
+    search_index = CandidateSearchIndex(store.db_path)
+    try:
+        total = aggregate_queue_results(config, job_queue, store, output_path,
+                                        ResumeArchiver(os.path.join(work_dir, '已处理简历')), follow=args.follow,
+                                        search_index=search_index)
+        print(f"写入报表 {total} 条, 队列状态: {job_queue.counts()}")
+    finally:
+        search_index.close()
+        store.close()
+        job_queue.close()
+    return 0
+
+def _cmd_search(args) -> int:
+    """命令行：全文检索候选人"""
+    work_dir = _resolve_work_dir(args.work_dir)
+    store = ResultStore(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME))
+    search_index = CandidateSearchIndex(store.db_path)
+    try:
+        if args.rebuild:
+            print(f"索引重建完成: {search_index.rebuild(store)} 份简历")
+        if args.query:
+            start = time.perf_counter()
+            hits = search_index.search(' '.join(args.query), args.limit, args.since, args.position)
+            elapsed = (time.perf_counter() - start) * 1000
+            for hit in hits:
+                print(f"{hit['相关度']:>8.3f}  {hit['姓名']}  {hit['应聘岗位']}  {hit['处理时间']}  {hit['文件名']}")
+            print(f"共 {len(hits)} 条, 耗时 {elapsed:.1f} ms")
+    finally:
+        search_index.close()
+        store.close()
+    return 0
+
+def _cmd_leaderboard(args) -> int:
+    """命令行：查看各岗位评分排行，可导出为排名工作簿"""
+    config = ConfigManager()
+    work_dir = _resolve_work_dir(args.work_dir)
+    top_n = args.top or _ranking_top_n(config)
+    store = ResultStore(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME))
+    try:
+        start = time.perf_counter()
+        positions = [args.position] if args.position else store.ranked_positions()
+        leaderboards = {position: store.top_candidates(position, top_n) for position in positions}
+        elapsed = (time.perf_counter() - start) * 1000
+        for position, rows in leaderboards.items():
+            print(f"== {position} (前 {len(rows)} 名) ==")
+            for rank, row in enumerate(rows, start=1):
+                sub_scores = '/'.join('-' if value is None else str(value)
+                                      for value in (row['education'], row['experience'], row['skills']))
+                print(f"{rank:>4}  {row['score']:>3}  学历/经验/技能 {sub_scores:<11}  {row['name'] or ''}  "
+                      f"{row['processed_at']}  {row['filename']}")
+        print(f"共 {len(leaderboards)} 个岗位, 耗时 {elapsed:.1f} ms")
+        if args.export:
+            output_path = args.output or config.get('PATHS', 'output_excel')
+            print(ExcelGenerator.generate_rankings(leaderboards, ExcelGenerator.ranking_path(output_path)))
+    finally:
+        store.close()
+    return 0
+
+def _cmd_plan(args) -> int:
+    """命令行：试运行预估token用量、费用和耗时（不调用API）"""
+    config = ConfigManager()
+    resume_dir = args.resume_dir or config.get('PATHS', 'resume_dir')
+    if not resume_dir or not os.path.isdir(resume_dir):
+        raise SystemExit(f"简历目录无效: {resume_dir!r}，请通过 --resume-dir 指定或在GUI中设置")
+    job_desc_files = _resolve_job_desc_files(args.jd, config)
+    top_k = args.top_k
+    if top_k is None:
+        try:
+            top_k = max(0, int(config.get('EVALUATION', 'multi_jd_top_k') or 0))
+        except ValueError:
+            top_k = 0
+
+    store = None
+    work_dir = args.work_dir or config.get('PATHS', 'work_dir')
+    if work_dir and os.path.exists(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME)):
+        store = ResultStore(os.path.join(work_dir, ResultStore.DEFAULT_FILENAME))
+    evaluator = DeepSeekEvaluator()
+    try:
+        run_plan = plan_run(config, evaluator, resume_dir, job_desc_files, top_k, store=store)
+    finally:
+        evaluator.close()
+        if store is not None:
+            store.close()
+    print(run_plan.report())
+    if args.verbose:
+        for status, estimates in (('处理', run_plan.accepted), ('延后', run_plan.deferred)):
+            for estimate in estimates:
+                print(f"[{status}] {estimate.filename}: 调用 {estimate.calls} 次, 输入 {estimate.input_tokens}, "
+                      f"输出 {estimate.output_tokens}{' (模板本地提取)' if estimate.local_extraction else ''}")
+    return 0
+
+def _synthetic_resume_filenames(count: int, seed: int = 42) -> List[str]:
+    """生成用于基准测试的招聘平台风格文件名"""
+    rng = random.Random(seed)
+    platforms = ['51job', 'BOSS', 'zhilian', '']
+    surnames = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何林罗高'
+    given = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂'
+    positions = ['销售经理', '软件工程师', '商务经理', '行政专员', '财务主管', '人力资源经理', '产品经理', '运维工程师']
+    suffixes = ['', '_南宁(2)', '_桂林(3)', '_昆明市五华区', '_20240501', '_副本(1)']
+    names = []
+    for i in range(count):
+        parts = [rng.choice(platforms), rng.choice(surnames) + ''.join(rng.choice(given) for _ in range(rng.randint(1, 2))),
+                 rng.choice(positions) + rng.choice(['', '5年以上', '8-15K'])]
+        stem = '_'.join(p for p in parts if p) + rng.choice(suffixes)
+        names.append(f"{stem}_{i}.{rng.choice(['pdf', 'docx'])}" if i % 7 == 0 else f"{stem}.{rng.choice(['pdf', 'docx'])}")
+    return names
+
+def _cmd_bench_filenames(args) -> int:
+    """命令行：对比旧版逐次正则清理与 FilenameParser（冷启动/缓存命中）的耗时"""
+    filenames = _synthetic_resume_filenames(args.count)
+
+    def legacy(filename: str) -> Tuple[str, str]:
+        clean = re.sub(r'^\d+_|_\d+$|_南宁\(\d+\)$|_桂林\(\d+\)$|_昆明.*$|_.*\(\d+\)$', '', filename)
+        clean = re.sub(r'^51job_|^BOSS_|^zhilian_|^【|】$|\d+年以上|\d+-\d+K', '', clean).strip()
+        parts = os.path.splitext(filename)[0].split('_')
+        return clean, parts[1] if len(parts) > 1 else ''
+
+    parser = FilenameParser(cache_size=len(filenames))
+    timings = []
+    start = time.perf_counter()
+    for filename in filenames:
+        legacy(filename)
+        legacy(filename)  # 旧代码在职位匹配和字段补充中各解析一次
+    timings.append(('旧版正则(每份两次)', time.perf_counter() - start))
+    start = time.perf_counter()
+    for filename in filenames:
+        parser.parse(filename)
+        parser.parse(filename)
+    timings.append(('FilenameParser(每份两次，首次解析+缓存)', time.perf_counter() - start))
+    start = time.perf_counter()
+    for filename in filenames:
+        parser.parse(filename)
+    timings.append(('FilenameParser(重复扫描，全部命中缓存)', time.perf_counter() - start))
+
+    print(f"文件名数量: {len(filenames)}")
+    for label, seconds in timings:
+        print(f"{label}: {seconds * 1000:.1f} ms ({seconds / len(filenames) * 1e6:.2f} us/个)")
+    print(f"缓存: {parser.parse.cache_info()}")
+    return 0
+
+def _cmd_bench_ocr(args) -> int:
+    """命令行：对比旧版固定DPI/固定阈值与预处理流水线的逐页OCR耗时"""
+    processor = ResumeProcessor()
+    try:
+        pytesseract.get_tesseract_version()
+        run_ocr = True
+    except Exception:
+        run_ocr = False
+        print("未找到tesseract，仅统计渲染与预处理耗时")
+    if run_ocr:
+        print(f"预处理流水线使用的OCR引擎: {processor.ocr_engine.name}")
+
+    def legacy(pdf_path: str, page_no: int):
+        image = processor._render_page(pdf_path, page_no, processor.ocr_dpi)
+        if image.mode != 'L':
+            image = image.convert('L')
+        return image.point(lambda x: 0 if x < 140 else 255)
+
+    totals = {'旧版': [0.0, 0], '预处理': [0.0, 0]}
+    for pdf_path in args.pdf:
+        page_count = int(pdfinfo_from_path(pdf_path).get('Pages', 0))
+        page_sizes = []
+        try:
+            with open(pdf_path, 'rb') as file:
+                page_sizes = processor._page_sizes(PyPDF2.PdfReader(file))
+        except Exception as e:
+            logging.warning(f"读取页面尺寸失败，使用默认DPI: {pdf_path} - {str(e)}")
+        for page_no in range(1, min(page_count, args.max_pages) + 1):
+            page_size = page_sizes[page_no - 1] if page_no <= len(page_sizes) else None
+            row = []
+            for label, prepare, recognize in (
+                    ('旧版', lambda: legacy(pdf_path, page_no),
+                     lambda image: pytesseract.image_to_string(image, lang='chi_sim+eng')),
+                    ('预处理', lambda: processor._prepare_ocr_image(pdf_path, page_no, page_size),
+                     lambda image: processor.ocr_engine.recognize(image))):
+                start = time.perf_counter()
+                image = prepare()
+                chars = len(recognize(image).strip()) if run_ocr else 0
+                seconds = time.perf_counter() - start
+                totals[label][0] += seconds
+                totals[label][1] += 1
+                row.append(f"{label} {seconds:.2f}s {image.width}x{image.height}" + (f" {chars}字" if run_ocr else ""))
+            print(f"{os.path.basename(pdf_path)} 第{page_no}页: " + " | ".join(row))
+    for label, (seconds, pages) in totals.items():
+        if pages:
+            print(f"{label}: 共 {pages} 页, 平均 {seconds / pages:.2f} s/页")
+    processor.close()
+    return 0
+
+def _run_gui():
     root = tk.Tk()
     try:
         root.iconbitmap('icon.ico')
@@ -1345,6 +6470,93 @@ def main():
     
     app = RecruitmentSystemGUI(root)
     root.mainloop()
+    app.job_desc_processor.close()
+    app.evaluator.close()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="招聘管理系统（不带子命令时启动图形界面）")
+    subparsers = parser.add_subparsers(dest='command')
+
+    compact_parser = subparsers.add_parser('compact', help="从结果库重建报表（去重，可按岗位或月份拆分）")
+    compact_parser.add_argument('--work-dir', help="工作目录（默认读取config.ini）")
+    compact_parser.add_argument('--output', help="输出Excel路径（默认读取config.ini）")
+    compact_parser.add_argument('--split-by', choices=['none', 'position', 'month'], default='none',
+                                help="none: 原位重建单表报表; position: 按岗位分表; month: 按月份分文件")
+    compact_parser.set_defaults(func=_cmd_compact)
+
+    plan_parser = subparsers.add_parser('plan', help="试运行：预估token用量、费用和耗时（不调用API）")
+    plan_parser.add_argument('--work-dir', help="工作目录，用于跳过结果库中已处理的简历（默认读取config.ini）")
+    plan_parser.add_argument('--resume-dir', help="简历目录（默认读取config.ini）")
+    plan_parser.add_argument('--jd', nargs='+', help="职位说明书文件（默认为职位说明书目录下全部.docx）")
+    plan_parser.add_argument('--top-k', type=int, help="多岗位评估Top-K（默认读取config.ini）")
+    plan_parser.add_argument('--verbose', action='store_true', help="逐份列出预估结果")
+    plan_parser.set_defaults(func=_cmd_plan)
+
+    reevaluate_parser = subparsers.add_parser('reevaluate', help="职位说明书变更后增量重新评估并原位更新报表")
+    reevaluate_parser.add_argument('--work-dir', help="工作目录（默认读取config.ini）")
+    reevaluate_parser.add_argument('--output', help="需原位更新的Excel报表（默认读取config.ini）")
+    reevaluate_parser.add_argument('--jd', nargs='+', help="当前职位说明书文件（默认为职位说明书目录下全部.docx）")
+    reevaluate_parser.add_argument('--include-unversioned', action='store_true',
+                                   help="同时重新评估旧版本生成的、未记录职位说明书版本的结果")
+    reevaluate_parser.add_argument('--dry-run', action='store_true', help="仅列出需重新评估的简历")
+    reevaluate_parser.set_defaults(func=_cmd_reevaluate)
+
+    submit_parser = subparsers.add_parser('queue-submit', help="多机模式（汇总端）：发布职位说明书并将待处理简历入队")
+    submit_parser.add_argument('--work-dir', help="工作目录（默认读取config.ini）")
+    submit_parser.add_argument('--queue', help="共享队列文件（默认为 [DISTRIBUTED] queue_path 或工作目录下的队列文件）")
+    submit_parser.add_argument('--resume-dir', help="简历目录（默认读取config.ini）")
+    submit_parser.add_argument('--jd', nargs='+', help="职位说明书文件（默认为职位说明书目录下全部.docx）")
+    submit_parser.add_argument('--top-k', type=int, default=0, help="多岗位评估Top-K（默认0）")
+    submit_parser.set_defaults(func=_cmd_queue_submit)
+
+    worker_parser = subparsers.add_parser('queue-worker', help="多机模式（工作机）：领取并处理队列中的简历")
+    worker_parser.add_argument('--queue', help="共享队列文件")
+    worker_parser.add_argument('--work-dir', help="工作目录（未指定 --queue 时使用其中的队列文件）")
+    worker_parser.add_argument('--resume-dir', help="本机访问共享简历目录的路径（各机器挂载路径不同时指定）")
+    worker_parser.add_argument('--threads', type=int, default=0, help="处理线程数（默认 [SCHEDULING] api_concurrency）")
+    worker_parser.add_argument('--worker-id', help="工作机标识（默认 主机名-进程号）")
+    worker_parser.add_argument('--wait', action='store_true', help="队列清空后继续等待新任务")
+    worker_parser.set_defaults(func=_cmd_queue_worker)
+
+    aggregate_parser = subparsers.add_parser('queue-aggregate', help="多机模式（汇总端）：收取结果并写入报表")
+    aggregate_parser.add_argument('--work-dir', help="工作目录（默认读取config.ini）")
+    aggregate_parser.add_argument('--queue', help="共享队列文件")
+    aggregate_parser.add_argument('--output', help="输出Excel路径（默认读取config.ini）")
+    aggregate_parser.add_argument('--follow', action='store_true', help="队列清空后继续等待新结果")
+    aggregate_parser.set_defaults(func=_cmd_queue_aggregate)
+
+    search_parser = subparsers.add_parser('search', help="全文检索候选人（中文按二元组匹配，空格分隔多个检索词）")
+    search_parser.add_argument('query', nargs='*', help="检索词，如：5G基站 华为")
+    search_parser.add_argument('--work-dir', help="工作目录（默认读取config.ini）")
+    search_parser.add_argument('--since', help="仅检索该日期之后处理的简历（YYYY-MM-DD）")
+    search_parser.add_argument('--position', help="按应聘岗位过滤（包含匹配）")
+    search_parser.add_argument('--limit', type=int, default=50, help="返回条数（默认50）")
+    search_parser.add_argument('--rebuild', action='store_true', help="从结果库重建索引（仅结构化字段）")
+    search_parser.set_defaults(func=_cmd_search)
+
+    leaderboard_parser = subparsers.add_parser('leaderboard', help="各岗位评分排行（综合评分及学历/经验/技能分项）")
+    leaderboard_parser.add_argument('--work-dir', help="工作目录（默认读取config.ini）")
+    leaderboard_parser.add_argument('--position', help="只显示该岗位（默认全部岗位）")
+    leaderboard_parser.add_argument('--top', type=int, help="每个岗位显示前N名（默认 [OUTPUT] ranking_top_n）")
+    leaderboard_parser.add_argument('--export', action='store_true', help="导出为 <报表名>_岗位排行.xlsx")
+    leaderboard_parser.add_argument('--output', help="报表路径，决定导出文件位置（默认读取config.ini）")
+    leaderboard_parser.set_defaults(func=_cmd_leaderboard)
+
+    bench_parser = subparsers.add_parser('bench-filenames', help="文件名解析基准测试（合成文件名）")
+    bench_parser.add_argument('--count', type=int, default=100000, help="合成文件名数量（默认100000）")
+    bench_parser.set_defaults(func=_cmd_bench_filenames)
+
+    bench_ocr_parser = subparsers.add_parser('bench-ocr', help="OCR基准测试：对比旧版与预处理流水线的逐页耗时")
+    bench_ocr_parser.add_argument('pdf', nargs='+', help="扫描版PDF文件")
+    bench_ocr_parser.add_argument('--max-pages', type=int, default=5, help="每个文件最多测试的页数（默认5）")
+    bench_ocr_parser.set_defaults(func=_cmd_bench_ocr)
+
+    args = parser.parse_args(argv)
+    setup_logging(ConfigManager())
+    if args.command is None:
+        _run_gui()
+        return 0
+    return args.func(args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())